@@ -1,68 +1,295 @@
+import signal
+import sys
+import time
+from typing import Any, Callable, Iterator
+
 import click
-from flask import Flask, jsonify, make_response, Response
+from flask import Flask, jsonify, make_response, request, Response
 from flask_cors import CORS
 
-from chopsticks.chopstick_controller import get_board_state, get_current_player, get_player_hand, init_game, init_model_and_view, move, swap
-from chopsticks.chopstick_view import ChopstickView
+from chopsticks import LOG_LEVELS, configure_logging
+from chopsticks.chopstick_controller import apply_actions, configure_engine, configure_eviction, configure_locks, end_game, engine_move, forget_game, get_best_move, get_board_state, get_current_player, get_legal_moves, get_player_hand, get_state_version, init_game, init_model_and_view, move, subscribe_events, swap, unsubscribe_events
+from chopsticks.chopstick_model import ConcurrentUpdateError
+from chopsticks.chopstick_view import VIEWS, ChopstickView
+from chopsticks.dao.sqlite_pool import PRAGMA_PROFILES
+from chopsticks.game_locks import DEFAULT_STRIPES
+from chopsticks.game_registry import DEFAULT_GAME_ID, GameNotFoundError
+from chopsticks.metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, HTTP_REQUESTS, METRICS
+from chopsticks.profiling import DEFAULT_PATTERN, DEFAULT_TOP, PROFILE_MODES, SORT_KEYS, ProfilingMiddleware
+from chopsticks.spill_store import DEFAULT_SPILL_PATH
+
+EVENTS_KEEPALIVE_SECONDS = 15
+INVALID_BATCH_ERROR_MSG = "Request body must be a JSON object with a list of actions."
+PROFILING_DISABLED_ERROR_MSG = "Profiling is off; start the server with --profile header or --profile always."
+INVALID_PROFILE_QUERY_ERROR_MSG = "top must be a positive integer and sort one of: {sort_keys}."
 
 app = Flask(__name__)
 CORS(app)  # This will allow the React front-end to communicate with the Flask back-end
+# setup() wraps this in a ProfilingMiddleware when profiling is on.
+UNPROFILED_WSGI_APP = app.wsgi_app
 
 
 VIEW = ChopstickView()
 
 
+REQUEST_START_KEY = "chopsticks.request_start"
+
+@app.before_request
+def start_timer() -> None:
+    if METRICS.enabled:
+        request.environ[REQUEST_START_KEY] = time.perf_counter()
+
+@app.after_request
+def record_request(response: Response) -> Response:
+    if METRICS.enabled:
+        # One proxy lookup instead of one per attribute: this runs on every request.
+        current = request._get_current_object()
+        start = current.environ.get(REQUEST_START_KEY)
+        if start is not None:
+            # Label by route template rather than path, so that game ids do not multiply the series.
+            route = current.url_rule.rule if current.url_rule is not None else "<unmatched>"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, route, current.method)
+            HTTP_REQUESTS.inc(route, current.method, str(response.status_code))
+    return response
+
+@app.errorhandler(GameNotFoundError)
+def game_not_found(e: GameNotFoundError) -> Response:
+    # The game may have been deleted by another worker; do not keep serving its stale model.
+    forget_game(e.game_id)
+    return VIEW.not_found(str(e))
+
+@app.errorhandler(ConcurrentUpdateError)
+def concurrent_update(e: ConcurrentUpdateError) -> Response:
+    return VIEW.conflict(str(e))
+
+def conditional_get(game_id: str, representation: str, build: Callable[[], Response]) -> Response:
+    """
+    Answer a read with 304 if the client already has the current state.
+
+    The ETag is derived from the game's state version, so a revalidation
+    that matches costs one version lookup in the DAO and never reaches the view.
+
+    Args:
+        game_id (str): The id of the game.
+        representation (str): Name of the route's representation of the state.
+        build (Callable[[], Response]): Builds the full response.
+
+    Returns:
+        Response: A 304 response, or the full response with its ETag.
+    """
+    etag = f"{game_id}-{get_state_version(game_id)}-{representation}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = build()
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
 @app.route("/chopsticks/health", methods=["GET"])
 @app.route("/chopsticks/healthcheck", methods=["GET"])
 def health_check() -> Response:
     app.logger.info('Health check')
     return make_response(jsonify({"status": "OK"}), 200)
 
+@app.route("/chopsticks/metrics", methods=["GET"])
+def metrics() -> Response:
+    return Response(METRICS.render(), content_type=CONTENT_TYPE)
+
+@app.route("/chopsticks/profile", methods=["GET"])
+def profile_summary() -> Response:
+    if not isinstance(app.wsgi_app, ProfilingMiddleware):
+        return VIEW.not_found(PROFILING_DISABLED_ERROR_MSG)
+    top = request.args.get("top", str(DEFAULT_TOP))
+    sort = request.args.get("sort", "tottime")
+    if not top.isdigit() or int(top) == 0 or sort not in SORT_KEYS:
+        return VIEW.error(INVALID_PROFILE_QUERY_ERROR_MSG.format(sort_keys=", ".join(SORT_KEYS)))
+    return make_response(jsonify(app.wsgi_app.summary(int(top), sort)), 200)
+
 @app.route("/chopsticks/get_board_state", methods=["GET"])
-def board_state() -> Response:
+@app.route("/chopsticks/<game_id>/get_board_state", methods=["GET"])
+def board_state(game_id: str = DEFAULT_GAME_ID) -> Response:
     app.logger.info('Get board state')
-    return get_board_state()
+    return conditional_get(game_id, "board", lambda: get_board_state(game_id))
 
 @app.route("/chopsticks/get_current_player", methods=["GET"])
-def current_player() -> Response:
+@app.route("/chopsticks/<game_id>/get_current_player", methods=["GET"])
+def current_player(game_id: str = DEFAULT_GAME_ID) -> Response:
     app.logger.info('Get current player')
-    return get_current_player()
+    return conditional_get(game_id, "player", lambda: get_current_player(game_id))
+
+@app.route("/chopsticks/best_move", methods=["GET"])
+@app.route("/chopsticks/<game_id>/best_move", methods=["GET"])
+def best_move(game_id: str = DEFAULT_GAME_ID) -> Response:
+    app.logger.info('Get best move')
+    return get_best_move(game_id)
+
+@app.route("/chopsticks/legal_moves", methods=["GET"])
+@app.route("/chopsticks/<game_id>/legal_moves", methods=["GET"])
+def legal_moves(game_id: str = DEFAULT_GAME_ID) -> Response:
+    app.logger.info('Get legal moves')
+    return conditional_get(game_id, "legal_moves", lambda: get_legal_moves(game_id))
+
+@app.route("/chopsticks/events", methods=["GET"])
+@app.route("/chopsticks/<game_id>/events", methods=["GET"])
+def events(game_id: str = DEFAULT_GAME_ID) -> Response:
+    app.logger.info('Subscribe to events')
+    subscription, current_state = subscribe_events(game_id)
+
+    def stream() -> Iterator[bytes]:
+        try:
+            yield current_state
+            while True:
+                yield subscription.get(timeout=EVENTS_KEEPALIVE_SECONDS) or b": keepalive\n\n"
+        finally:
+            unsubscribe_events(subscription, game_id)
+
+    return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 @app.route("/chopsticks/get_player_hand/<player>/<hand>", methods=["GET"])
-def player_hand(player: str, hand: str) -> Response:
+@app.route("/chopsticks/<game_id>/get_player_hand/<player>/<hand>", methods=["GET"])
+def player_hand(player: str, hand: str, game_id: str = DEFAULT_GAME_ID) -> Response:
     app.logger.info('Get player hand')
-    return get_player_hand(player, hand)
+    return get_player_hand(player, hand, game_id)
 
 @app.route('/chopsticks/move/<player>/<from_hand>/<to_hand>', methods=['GET'])
-def make_move(player: str, from_hand: str, to_hand: str) -> Response:
+@app.route('/chopsticks/<game_id>/move/<player>/<from_hand>/<to_hand>', methods=['GET'])
+def make_move(player: str, from_hand: str, to_hand: str, game_id: str = DEFAULT_GAME_ID) -> Response:
     app.logger.info('Make move')
     try:
-        move(player, from_hand, to_hand)
+        move(player, from_hand, to_hand, game_id)
     except ValueError as e:
         return VIEW.error(str(e))
     return make_response(jsonify({"message": "Move successful"}), 200)
 
+@app.route("/chopsticks/actions", methods=["POST"])
+@app.route("/chopsticks/<game_id>/actions", methods=["POST"])
+def batch_actions(game_id: str = DEFAULT_GAME_ID) -> Response:
+    app.logger.info('Apply actions')
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get("actions"), list):
+        return VIEW.error(INVALID_BATCH_ERROR_MSG)
+    try:
+        return apply_actions(body["actions"], game_id)
+    except ValueError as e:
+        return VIEW.error(str(e))
+
 @app.route("/chopsticks/reset", methods=["GET"])
-def reset_game() -> Response:
+@app.route("/chopsticks/<game_id>/reset", methods=["GET"])
+def reset_game(game_id: str = DEFAULT_GAME_ID) -> Response:
     app.logger.info('Reset game')
-    init_game()
+    init_game(game_id)
     return make_response(jsonify({"message": "Game reset"}), 200)
 
+@app.route("/chopsticks/<game_id>", methods=["DELETE"])
+def delete_game(game_id: str) -> Response:
+    app.logger.info('Delete game')
+    end_game(game_id)
+    return make_response(jsonify({"message": "Game deleted"}), 200)
+
 @app.route("/chopsticks/swap/<player>/<hand>/<fingers>", methods=["GET"])
-def swap_fingers(player: str, hand: str, fingers: str) -> Response:
+@app.route("/chopsticks/<game_id>/swap/<player>/<hand>/<fingers>", methods=["GET"])
+def swap_fingers(player: str, hand: str, fingers: str, game_id: str = DEFAULT_GAME_ID) -> Response:
     app.logger.info('Swap fingers')
     try:
-        swap(player, hand, fingers)
+        swap(player, hand, fingers, game_id)
     except ValueError as e:
         return VIEW.error(str(e))
     return make_response(jsonify({"message": "Swap successful"}), 200)
 
+@app.route("/chopsticks/engine_move", methods=["GET"])
+@app.route("/chopsticks/<game_id>/engine_move", methods=["GET"])
+def make_engine_move(game_id: str = DEFAULT_GAME_ID) -> Response:
+    app.logger.info('Engine move')
+    try:
+        action = engine_move(game_id)
+    except ValueError as e:
+        return VIEW.error(str(e))
+    return make_response(jsonify({"message": "Engine move successful", "engine_move": action.to_dict()}), 200)
+
+CONTROLLER_OPTIONS = [
+    click.option('--dao-id' , default='passthrough', help='DAO ID'),
+    click.option('--sqlite-db-path', default='chopsticks.db', help='sqlite Database path'),
+    click.option('--sqlite-pragma-profile', default='default', type=click.Choice(list(PRAGMA_PROFILES)),
+                 help='PRAGMA profile for pooled sqlite connections'),
+    click.option('--caching-backend', default='sqlite', help='DAO ID the caching DAO writes back to'),
+    click.option('--flush-interval-ms', default=100,
+                 help='Caching DAO: milliseconds between write-back flushes'),
+    click.option('--max-unflushed', default=100,
+                 help='Caching DAO: pending writes of a game that force a flush'),
+    click.option('--engine-budget-ms', default=50, help='Search time per computer opponent move, in milliseconds'),
+    click.option('--lock-stripes', default=DEFAULT_STRIPES, type=click.IntRange(min=1),
+                 help='Locks the games are shared out among; actions on one game are always serialized'),
+    click.option('--max-games', default=0, type=click.IntRange(min=0),
+                 help='Games kept in memory; the least recently used are spilled to disk. 0 for no limit'),
+    click.option('--game-idle-ttl-s', default=0.0, type=click.FloatRange(min=0),
+                 help='Seconds without a request after which a game is spilled to disk. 0 to never'),
+    click.option('--spill-path', default=DEFAULT_SPILL_PATH,
+                 help='sqlite database evicted games are spilled to; one per worker process'),
+    click.option('--metrics/--no-metrics', default=True, help='Record the metrics served at /chopsticks/metrics'),
+    click.option('--profile', default='off', type=click.Choice(PROFILE_MODES),
+                 help='Profile requests with cProfile: never, when they carry an X-Chopsticks-Profile: 1 header, '
+                      'or always'),
+    click.option('--profile-dir', default='profiles', help='Directory profiled requests are written to'),
+    click.option('--profile-pattern', default=DEFAULT_PATTERN,
+                 help='Regular expression of the paths that may be profiled'),
+    click.option('--log-level', default='DEBUG', type=click.Choice(LOG_LEVELS), help='Lowest level logged'),
+    click.option('--log-debug-sample-rate', default=1.0, type=click.FloatRange(0, 1),
+                 help='Share of DEBUG records kept'),
+    click.option('--log-queue/--no-log-queue', default=False,
+                 help='Write log records from a background thread instead of the request threads'),
+    click.option('--view', default='dynamic', type=click.Choice(list(VIEWS)),
+                 help='Build the JSON bodies per request, or serve bodies encoded once at startup'),
+]
+
+def controller_options(fn: Callable) -> Callable:
+    """Add the options of setup() to a command."""
+    for option in reversed(CONTROLLER_OPTIONS):
+        fn = option(fn)
+    return fn
+
+def setup(dao_id: str, sqlite_db_path: str, sqlite_pragma_profile: str, caching_backend: str,
+          flush_interval_ms: int, max_unflushed: int, engine_budget_ms: int, metrics: bool = True,
+          profile: str = "off", profile_dir: str = "profiles", profile_pattern: str = DEFAULT_PATTERN,
+          log_level: str = "DEBUG", log_debug_sample_rate: float = 1.0, log_queue: bool = False,
+          view: str = "dynamic", lock_stripes: int = DEFAULT_STRIPES, max_games: int = 0,
+          game_idle_ttl_s: float = 0.0, spill_path: str = DEFAULT_SPILL_PATH) -> None:
+    """Initialize logging and the controller; shared by every serving mode.
+
+    In production, --log-level INFO --log-queue keeps log I/O off the request
+    threads; add --log-level DEBUG --log-debug-sample-rate 0.01 to keep a
+    sample of the DEBUG records as well. --view precomputed serves the board,
+    player and hand bodies from tables encoded at startup. --max-games and
+    --game-idle-ttl-s bound the games held in memory.
+    """
+    global VIEW
+    configure_logging(log_level, log_debug_sample_rate, log_queue)
+    METRICS.enabled = metrics
+    if type(VIEW) is not VIEWS[view]:
+        VIEW = VIEWS[view]()
+    if profile == "off":
+        app.wsgi_app = UNPROFILED_WSGI_APP
+    else:
+        app.wsgi_app = ProfilingMiddleware(UNPROFILED_WSGI_APP, profile, profile_dir, profile_pattern)
+    dao_kwargs = {"sqlite_db_path": sqlite_db_path, "sqlite_pragma_profile": sqlite_pragma_profile}
+    if dao_id == "caching":
+        dao_kwargs.update(caching_backend=caching_backend, flush_interval=flush_interval_ms / 1000,
+                          max_unflushed=max_unflushed)
+    init_model_and_view(VIEW, dao_identifier=dao_id, **dao_kwargs)
+    configure_engine(engine_budget_ms / 1000)
+    configure_locks(lock_stripes)
+    configure_eviction(max_games, game_idle_ttl_s, spill_path)
+
 @click.command()
-@click.option('--dao-id' , default='passthrough', help='DAO ID')
-@click.option('--sqlite-db-path', default='chopsticks.db', help='sqlite Database path')
-def run(dao_id: str, sqlite_db_path:str) -> None:
-    init_model_and_view(VIEW, dao_identifier=dao_id, sqlite_db_path=sqlite_db_path)
-    app.run(host="0.0.0.0", debug=True)
+@controller_options
+@click.option('--host', default='0.0.0.0', help='Interface to listen on')
+@click.option('--port', default=5000, help='Port to listen on')
+@click.option('--debug/--no-debug', default=True, help='Run the Flask debugger and reloader')
+def run(host: str, port: int, debug: bool, **settings: Any) -> None:
+    setup(**settings)
+    # Exit normally on SIGTERM so that write-behind caches are flushed.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    app.run(host=host, port=port, debug=debug)
 
 if __name__ == '__main__':
     run()
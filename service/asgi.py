@@ -0,0 +1,238 @@
+"""asyncio serving mode.
+
+Exposes the same /chopsticks/* routes as app.py on an ASGI server (uvicorn).
+Request handling is the Flask app's: every request runs app.wsgi_app, and
+with it the controller, model and view, on a bounded thread pool, so a
+blocking DAO call (SQLite) ties up a pool thread and never the event loop.
+Event streams are the exception: they are served natively on the loop from an
+AsyncSubscription, so an idle subscriber holds no thread at all.
+
+With a DAO whose store is shared between processes (SQLite), --workers runs
+several server processes over the same games.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import logging
+import os
+import re
+import sys
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import click
+import uvicorn
+
+from app import app, controller_options, EVENTS_KEEPALIVE_SECONDS, setup
+from chopsticks import stop_logging
+from chopsticks.chopstick_controller import subscribe_events, unsubscribe_events
+from chopsticks.dao import DAO
+from chopsticks.dao.caching_dao import close_flushers
+from chopsticks.events import AsyncSubscription
+from chopsticks.game_registry import DEFAULT_GAME_ID, GameNotFoundError
+
+DEFAULT_MAX_WORKERS = 16
+
+SETTINGS_ENV = "CHOPSTICKS_ASGI_SETTINGS"
+UNSHARED_DAO_ERROR_MSG = "DAO {dao_id} keeps games in process memory; it cannot serve several workers."
+
+EVENTS_PATH = re.compile(r"^/chopsticks/(?:(?P<game_id>[^/]+)/)?events$")
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class ChopsticksASGI:
+    """ASGI application wrapping the Flask app.
+
+    Attributes:
+        wsgi_app (Callable): The WSGI application that handles requests.
+        executor (ThreadPoolExecutor): Pool that runs the WSGI application.
+        keepalive (float): Seconds between keepalive comments on idle event streams.
+    """
+
+    def __init__(self, wsgi_app: Callable = app, max_workers: int = DEFAULT_MAX_WORKERS,
+                 keepalive: float = EVENTS_KEEPALIVE_SECONDS):
+        """
+        Initialize the application.
+
+        Args:
+            wsgi_app (Callable): The WSGI application that handles requests.
+            max_workers (int): Maximum number of requests handled at once.
+            keepalive (float): Seconds between keepalive comments on idle event streams.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chopsticks")
+        self.keepalive = keepalive
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        match = EVENTS_PATH.match(scope["path"])
+        if match and scope["method"] == "GET":
+            await self._events(scope, receive, send, match.group("game_id") or DEFAULT_GAME_ID)
+        else:
+            await self._wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                close_flushers()
+                stop_logging()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _wsgi(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body = await self._read_body(receive)
+        loop = asyncio.get_running_loop()
+        status, headers, content = await loop.run_in_executor(self.executor, self._call_wsgi, scope, body)
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": content})
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    def _call_wsgi(self, scope: Scope, body: bytes) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+        """Run the WSGI application to completion. Runs on a pool thread."""
+        response: Dict[str, Any] = {}
+
+        def start_response(status: str, headers: List[Tuple[str, str]], exc_info: Any = None) -> None:
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                                   for name, value in headers]
+
+        chunks = self.wsgi_app(wsgi_environ(scope, body), start_response)
+        try:
+            content = b"".join(chunks)
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+        return response["status"], response["headers"], content
+
+    async def _events(self, scope: Scope, receive: Receive, send: Send, game_id: str) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            subscription, current_state = await loop.run_in_executor(
+                self.executor, subscribe_events, game_id, AsyncSubscription(loop))
+        except GameNotFoundError:
+            # Let the Flask error handler render the 404.
+            await self._wsgi(scope, receive, send)
+            return
+        self.logger.info("Streaming events of game %s.", game_id)
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream; charset=utf-8"),
+                    (b"cache-control", b"no-cache"),
+                    (b"access-control-allow-origin", b"*"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": current_state, "more_body": True})
+            await self._stream(subscription, receive, send)
+        finally:
+            unsubscribe_events(subscription, game_id)
+
+    async def _stream(self, subscription: AsyncSubscription, receive: Receive, send: Send) -> None:
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        try:
+            while True:
+                message = asyncio.ensure_future(subscription.get(timeout=self.keepalive))
+                await asyncio.wait({message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    message.cancel()
+                    return
+                await send({"type": "http.response.body", "body": message.result() or b": keepalive\n\n",
+                            "more_body": True})
+        finally:
+            disconnected.cancel()
+
+
+async def _wait_for_disconnect(receive: Receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def wsgi_environ(scope: Scope, body: bytes) -> Dict[str, Any]:
+    """
+    Translate an ASGI HTTP scope into a WSGI environ.
+
+    Args:
+        scope (Scope): The ASGI connection scope.
+        body (bytes): The complete request body.
+
+    Returns:
+        Dict[str, Any]: The WSGI environ.
+    """
+    server: Optional[Tuple[str, int]] = scope.get("server")
+    client: Optional[Tuple[str, int]] = scope.get("client")
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0] if server else "localhost",
+        "SERVER_PORT": str(server[1]) if server else "80",
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0] if client else "",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        key = name.decode("latin-1").upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = f"HTTP_{key}"
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    # The body has been read in full, chunked or not.
+    environ["CONTENT_LENGTH"] = str(len(body))
+    return environ
+
+
+def create_app() -> ChopsticksASGI:
+    """Build the application in a server process from the settings run() left in the environment."""
+    settings = json.loads(os.environ[SETTINGS_ENV])
+    max_workers = settings.pop("max_workers")
+    setup(**settings)
+    return ChopsticksASGI(max_workers=max_workers)
+
+
+@click.command()
+@controller_options
+@click.option('--host', default='0.0.0.0', help='Interface to listen on')
+@click.option('--port', default=5000, help='Port to listen on')
+@click.option('--max-workers', default=DEFAULT_MAX_WORKERS, help='Threads running blocking request handlers')
+@click.option('--workers', default=1, help='Server processes; needs a DAO shared between processes')
+def run(host: str, port: int, max_workers: int, workers: int, **settings: Any) -> None:
+    dao_id = settings["dao_id"]
+    if workers > 1 and not getattr(DAO.get(dao_id), "shared", False):
+        raise click.BadParameter(UNSHARED_DAO_ERROR_MSG.format(dao_id=dao_id), param_hint="--workers")
+    os.environ[SETTINGS_ENV] = json.dumps(dict(settings, max_workers=max_workers))
+    uvicorn.run("asgi:create_app", factory=True, host=host, port=port, workers=workers, log_level="warning")
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,5 @@
+"""Performance benchmarks for the chopsticks service.
+
+Run a benchmark from the service directory, e.g. ``python -m benchmarks.bench_registry``.
+``python -m benchmarks.suite`` runs the regression suite and compares its results.
+"""
@@ -0,0 +1,114 @@
+"""Scan throughput of the memory-mapped game archive against SQLite rows.
+
+Fills an archive with simulated games (one simulated batch, archived again
+under new ids until the archive holds the requested number of records), then
+times a full vectorized pass over the mapped records, the same pass in
+chunks, O(1) random reads, building the game id index and reads through
+it, and, for comparison, a Python scan of the same columns stored as
+SQLite rows. The page cache is warm: the file was just written.
+"""
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from typing import List, Tuple
+
+import click
+import numpy as np
+
+from chopsticks.archive import GameArchive
+from chopsticks.packed_state import position_count
+from chopsticks.simulator import simulate
+
+from benchmarks.common import quiet_logging, summarize, time_calls
+
+BATCH = 1_000_000
+
+
+def fill(archive: GameArchive, n_records: int, seed: int) -> None:
+    result = simulate(min(BATCH, n_records), max_plies=archive.max_moves, seed=seed, record_actions=True)
+    states = result.positions + position_count() * (result.winners.astype(np.int64) + 1)
+    while len(archive) < n_records:
+        start, n = len(archive), min(len(states), n_records - len(archive))
+        archive.extend([f"game-{i}" for i in range(start, start + n)], states[:n], result.actions[:n])
+
+
+# Every scan computes the outcome counts (unfinished, player 1, player 2) and the total moves played.
+def full_scan(archive: GameArchive) -> Tuple[np.ndarray, int]:
+    records = archive.records()
+    winners = np.bincount(records["state"] // position_count(), minlength=3)
+    return winners, int(records["n_moves"].sum(dtype=np.int64))
+
+
+def chunked_scan(archive: GameArchive) -> Tuple[np.ndarray, int]:
+    winners = np.zeros(3, dtype=np.int64)
+    moves = 0
+    for chunk in archive.scan(BATCH):
+        winners += np.bincount(chunk["state"] // position_count(), minlength=3)
+        moves += int(chunk["n_moves"].sum(dtype=np.int64))
+    return winners, moves
+
+
+def sqlite_scan(db_path: str) -> Tuple[List[int], int]:
+    conn = sqlite3.connect(db_path)
+    winners = [0, 0, 0]
+    moves = 0
+    for state, n_moves in conn.execute('SELECT state, n_moves FROM archived_games'):
+        winners[state // position_count()] += 1
+        moves += n_moves
+    conn.close()
+    return winners, moves
+
+
+def throughput(fn, n_records: int, record_size: int, repeat: int = 3) -> str:
+    best = min(time_calls(fn, repeat))
+    return f"{n_records / best / 1e6:>10.1f} M rec/s {n_records * record_size / best / 1e9:>8.2f} GB/s"
+
+
+@click.command()
+@click.option('--records', 'n_records', default=10_000_000, help='Records in the archive')
+@click.option('--sqlite-records', 'n_sqlite', default=1_000_000, help='Rows in the SQLite comparison')
+@click.option('--reads', 'n_reads', default=100_000, help='Random reads by archive id')
+@click.option('--seed', default=0, help='Random seed')
+def main(n_records: int, n_sqlite: int, n_reads: int, seed: int) -> None:
+    quiet_logging()
+    with tempfile.TemporaryDirectory() as tmp:
+        with GameArchive(os.path.join(tmp, "games.bin")) as archive:
+            start = time.perf_counter()
+            fill(archive, n_records, seed)
+            elapsed = time.perf_counter() - start
+            size = archive.dtype.itemsize
+            click.echo(f"archived {len(archive):,} games of {size} bytes in {elapsed:.1f}s "
+                       f"({len(archive) * size / 1e9:.2f} GB)")
+
+            click.echo(f"{'full scan (mmap)':<24} {throughput(lambda: full_scan(archive), n_records, size)}")
+            click.echo(f"{'chunked scan (mmap)':<24} {throughput(lambda: chunked_scan(archive), n_records, size)}")
+
+            rng = random.Random(seed)
+            ids = iter([rng.randrange(n_records) for _ in range(n_reads)])
+            stats = summarize(time_calls(lambda: archive.get(next(ids)), n_reads))
+            click.echo(f"{'get(archive_id)':<24} {stats['mean_us']:>10.1f} us mean {stats['p99_us']:>8.1f} us p99")
+
+            start = time.perf_counter()
+            archive.find("game-0")
+            click.echo(f"{'game id index build':<24} {time.perf_counter() - start:>10.2f} s")
+            game_ids = iter([f"game-{rng.randrange(n_records)}" for _ in range(n_reads)])
+            stats = summarize(time_calls(lambda: archive.get_by_game_id(next(game_ids)), n_reads))
+            click.echo(f"{'get_by_game_id':<24} {stats['mean_us']:>10.1f} us mean {stats['p99_us']:>8.1f} us p99")
+
+            db_path = os.path.join(tmp, "games.db")
+            conn = sqlite3.connect(db_path)
+            conn.execute('CREATE TABLE archived_games (game_id TEXT PRIMARY KEY, state INTEGER, n_moves INTEGER, '
+                         'moves BLOB)')
+            rows = archive.records()[:n_sqlite]
+            conn.executemany('INSERT INTO archived_games VALUES (?, ?, ?, ?)',
+                             ((row["game_id"].decode(), int(row["state"]), int(row["n_moves"]), row["moves"].tobytes())
+                              for row in rows))
+            conn.commit()
+            conn.close()
+            click.echo(f"{'full scan (sqlite rows)':<24} {throughput(lambda: sqlite_scan(db_path), len(rows), size)}")
+
+
+if __name__ == '__main__':
+    main()
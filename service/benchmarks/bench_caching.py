@@ -0,0 +1,56 @@
+"""Turn latency of the write-behind cache against its backend and memory.
+
+Each turn is a full controller move. The caching DAO's flusher runs in the
+background at its default interval while the turns are timed.
+"""
+import os
+import tempfile
+
+import click
+
+from chopsticks import chopstick_controller
+from chopsticks.chopstick_controller import init_game, init_model_and_view, move
+from chopsticks.chopstick_view import ChopstickView
+from chopsticks.dao.caching_dao import close_flushers
+from chopsticks.dao.sqlite_pool import close_pools
+
+from benchmarks.common import quiet_logging, summarize, time_calls
+
+
+def turn_latency(n_turns: int, dao_id: str, **dao_kwargs) -> dict:
+    close_pools()
+    init_model_and_view(ChopstickView(), dao_identifier=dao_id, **dao_kwargs)
+    model = chopstick_controller.REGISTRY.get("default")
+
+    def turn() -> None:
+        try:
+            move(str(model.get_current_player()), "left", "right")
+        except ValueError:
+            init_game()
+
+    stats = summarize(time_calls(turn, n_turns))
+    close_flushers()
+    return stats
+
+
+@click.command()
+@click.option('--turns', 'n_turns', default=2_000, help='Turns per configuration')
+def main(n_turns: int) -> None:
+    quiet_logging()
+    with tempfile.TemporaryDirectory() as tmp:
+        configs = [
+            ("passthrough", "passthrough", {}),
+            ("sqlite", "sqlite", {"sqlite_db_path": os.path.join(tmp, "sqlite.db")}),
+            ("caching/sqlite", "caching", {"sqlite_db_path": os.path.join(tmp, "caching.db")}),
+            ("caching/sqlite_packed", "caching", {"sqlite_db_path": os.path.join(tmp, "packed.db"),
+                                                  "caching_backend": "sqlite_packed"}),
+        ]
+        click.echo(f"{'dao':<22} {'mean_us':>10} {'p50_us':>10} {'p99_us':>10}")
+        for name, dao_id, dao_kwargs in configs:
+            stats = turn_latency(n_turns, dao_id, **dao_kwargs)
+            click.echo(f"{name:<22} {stats['mean_us']:>10.1f} {stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f}")
+    close_pools()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Fan-out latency of board state events.
+
+For each subscriber count, times a full controller move (which encodes the
+event once and delivers it to every mailbox) and the delay until a subscriber
+draining its mailbox on another thread sees the event.
+"""
+import threading
+import time
+
+import click
+
+from chopsticks import chopstick_controller
+from chopsticks.chopstick_controller import init_game, init_model_and_view, move, subscribe_events
+from chopsticks.chopstick_view import ChopstickView
+
+from benchmarks.common import quiet_logging, summarize
+
+
+@click.command()
+@click.option('--rounds', default=200, help='Moves timed per subscriber count')
+def main(rounds: int) -> None:
+    quiet_logging()
+    init_model_and_view(ChopstickView(), dao_identifier="passthrough")
+    model = chopstick_controller.REGISTRY.get("default")
+    click.echo(f"{'subscribers':>11} {'publish_p50_us':>15} {'publish_p99_us':>15} {'deliver_p50_us':>15} {'deliver_p99_us':>15}")
+    for n_subscribers in (0, 1, 100, 1_000, 10_000):
+        subscriptions = [subscribe_events()[0] for _ in range(n_subscribers)]
+        publish, deliver = [], []
+        for _ in range(rounds):
+            init_game()
+            for subscription in subscriptions:
+                subscription.get(timeout=0)
+            received = threading.Event()
+            if subscriptions:
+                watcher = threading.Thread(target=lambda: subscriptions[-1].get() and received.set())
+                watcher.start()
+            start = time.perf_counter()
+            move(str(model.get_current_player()), "left", "left")
+            publish.append(time.perf_counter() - start)
+            if subscriptions:
+                received.wait()
+                deliver.append(time.perf_counter() - start)
+                watcher.join()
+            for subscription in subscriptions:
+                subscription.get(timeout=0)
+        publish_stats = summarize(publish)
+        deliver_stats = summarize(deliver) if deliver else {"p50_us": 0.0, "p99_us": 0.0}
+        click.echo(f"{n_subscribers:>11} {publish_stats['p50_us']:>15.1f} {publish_stats['p99_us']:>15.1f} "
+                   f"{deliver_stats['p50_us']:>15.1f} {deliver_stats['p99_us']:>15.1f}")
+        for subscription in subscriptions:
+            chopstick_controller.unsubscribe_events(subscription)
+
+
+if __name__ == '__main__':
+    main()
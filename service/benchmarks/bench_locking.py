@@ -0,0 +1,124 @@
+"""Concurrent games under one global lock and under lock striping.
+
+One stripe is the old global lock: every action of the process waits for
+every other. With striping, actions on different games only contend inside the
+DAO and for the GIL.
+
+Throughput: every thread plays its own game through the controller, a move by
+the player to move at a time, resetting the game when it ends. Threads only
+add throughput where the DAO waits outside the interpreter, and on more than
+one CPU.
+
+Isolation: one thread times single moves on its game while another keeps
+asking the engine to play on a second game. The engine searches for its whole
+time budget while holding its game's lock, which under a global lock stalls
+every other game.
+"""
+import os
+import tempfile
+import threading
+import time
+from typing import Dict
+
+import click
+
+from chopsticks.chopstick_controller import configure_engine, configure_locks, engine_move, init_game, \
+    init_model_and_view, move
+from chopsticks.chopstick_view import ChopstickView
+from chopsticks.dao.sqlite_pool import close_pools
+from chopsticks.game_locks import DEFAULT_STRIPES
+
+from benchmarks.common import quiet_logging, summarize
+
+
+def moves_per_second(dao_id: str, db_path: str, stripes: int, n_threads: int, n_moves: int) -> float:
+    close_pools()
+    init_model_and_view(ChopstickView(), dao_identifier=dao_id, sqlite_db_path=db_path,
+                        sqlite_pragma_profile="default")
+    configure_locks(stripes)
+    games = [f"bench-{index}" for index in range(n_threads)]
+    for game_id in games:
+        init_game(game_id)
+
+    def play(game_id: str) -> None:
+        turn = 0
+        for _ in range(n_moves):
+            try:
+                move(str(turn), "left", "left", game_id)
+                turn = 1 - turn
+            except ValueError:
+                init_game(game_id)
+                turn = 0
+
+    threads = [threading.Thread(target=play, args=(game_id,)) for game_id in games]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return n_threads * n_moves / (time.perf_counter() - start)
+
+
+def latency_beside_engine(stripes: int, n_moves: int, engine_budget: float) -> Dict[str, float]:
+    init_model_and_view(ChopstickView(), dao_identifier="passthrough")
+    configure_locks(stripes)
+    configure_engine(engine_budget)
+    for game_id in ("player", "engine"):
+        init_game(game_id)
+    done = threading.Event()
+
+    def play_engine() -> None:
+        while not done.is_set():
+            try:
+                move("0", "left", "left", "engine")
+                engine_move("engine")
+            except ValueError:
+                init_game("engine")
+
+    engine = threading.Thread(target=play_engine)
+    engine.start()
+    durations = []
+    turn = 0
+    for _ in range(n_moves):
+        start = time.perf_counter()
+        try:
+            move(str(turn), "left", "left", "player")
+            turn = 1 - turn
+        except ValueError:
+            init_game("player")
+            turn = 0
+        durations.append(time.perf_counter() - start)
+        time.sleep(0.001)
+    done.set()
+    engine.join()
+    return summarize(durations)
+
+
+@click.command()
+@click.option('--moves', 'n_moves', default=500, help='Moves per thread')
+@click.option('--max-threads', default=8, help='Largest thread count')
+@click.option('--engine-budget-ms', default=50, help='Engine search time per move in the isolation run')
+def main(n_moves: int, max_threads: int, engine_budget_ms: int) -> None:
+    quiet_logging()
+    thread_counts = [count for count in (1, 2, 4, 8, 16, 32) if count <= max_threads]
+    with tempfile.TemporaryDirectory() as tmp:
+        # Warm up the interpreter and imports, which would otherwise count against the first run.
+        moves_per_second("passthrough", os.path.join(tmp, "warmup.db"), 1, 1, n_moves)
+        click.echo(f"{'dao':<12} {'threads':>7} {'global moves/s':>15} {'striped moves/s':>16} {'speedup':>8}")
+        for dao_id in ("passthrough", "sqlite"):
+            for n_threads in thread_counts:
+                rates = [moves_per_second(dao_id, os.path.join(tmp, f"{dao_id}-{stripes}-{n_threads}.db"), stripes,
+                                          n_threads, n_moves)
+                         for stripes in (1, DEFAULT_STRIPES)]
+                click.echo(f"{dao_id:<12} {n_threads:>7} {rates[0]:>15.0f} {rates[1]:>16.0f} "
+                           f"{rates[1] / rates[0]:>7.2f}x")
+    click.echo(f"\n{'move beside engine':<20} {'mean_us':>10} {'p50_us':>10} {'p99_us':>10}")
+    for name, stripes in (("global lock", 1), ("striped", DEFAULT_STRIPES)):
+        stats = latency_beside_engine(stripes, n_moves, engine_budget_ms / 1000)
+        click.echo(f"{name:<20} {stats['mean_us']:>10.1f} {stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f}")
+    configure_locks(DEFAULT_STRIPES)
+    close_pools()
+
+
+if __name__ == '__main__':
+    main()
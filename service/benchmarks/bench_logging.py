@@ -0,0 +1,78 @@
+"""Request latency under each logging configuration.
+
+Every request is served by the Flask test client over the in-memory DAO, so
+that logging is not hidden behind database commits: a move by the player to
+move, then a board read, resetting the game when it ends.
+Log records are written to a file in a temporary directory with the service's
+formatter, so each configuration pays for real I/O. "today" is the default
+configuration: everything at DEBUG, written synchronously by the request thread.
+"""
+import logging
+import os
+import tempfile
+from typing import Dict
+
+import click
+
+import chopsticks
+from chopsticks import configure_logging, stop_logging
+from chopsticks.dao.sqlite_pool import close_pools
+
+from app import app, setup
+from benchmarks.common import summarize, time_calls
+
+CONFIGS = [
+    ("today (DEBUG, sync)", "DEBUG", 1.0, False),
+    ("DEBUG, queue", "DEBUG", 1.0, True),
+    ("DEBUG 1% sampled, queue", "DEBUG", 0.01, True),
+    ("INFO, sync", "INFO", 1.0, False),
+    ("production (INFO, queue)", "INFO", 1.0, True),
+]
+
+
+def request_latency(n_requests: int, db_path: str, log_path: str, level: str, sample_rate: float,
+                    use_queue: bool) -> Dict[str, float]:
+    close_pools()
+    setup(dao_id="passthrough", sqlite_db_path=db_path, sqlite_pragma_profile="default", caching_backend="sqlite",
+          flush_interval_ms=100, max_unflushed=100, engine_budget_ms=50, log_level="CRITICAL")
+    with open(log_path, "a") as log_file:
+        target = logging.StreamHandler(log_file)
+        target.setFormatter(chopsticks.formatter)
+        configure_logging(level, sample_rate, use_queue, target=target)
+        client = app.test_client()
+        turn = [0]
+
+        def serve() -> None:
+            response = client.get(f"/chopsticks/move/{turn[0]}/left/left")
+            if response.status_code != 200:
+                client.get("/chopsticks/reset")
+                turn[0] = 0
+            else:
+                turn[0] = 1 - turn[0]
+            client.get("/chopsticks/get_board_state")
+
+        stats = summarize(time_calls(serve, n_requests))
+        stop_logging()
+    configure_logging("CRITICAL")
+    return stats
+
+
+@click.command()
+@click.option('--requests', 'n_requests', default=2_000, help='Move and read pairs per configuration')
+def main(n_requests: int) -> None:
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    logging.getLogger("werkzeug").setLevel(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        click.echo(f"{'logging':<26} {'mean_us':>10} {'p50_us':>10} {'p99_us':>10} {'log_kb':>10}")
+        for index, (name, level, sample_rate, use_queue) in enumerate(CONFIGS):
+            log_path = os.path.join(tmp, f"{index}.log")
+            stats = request_latency(n_requests, os.path.join(tmp, f"{index}.db"), log_path,
+                                    level, sample_rate, use_queue)
+            log_kb = os.path.getsize(log_path) / 1024
+            click.echo(f"{name:<26} {stats['mean_us']:>10.1f} {stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f} "
+                       f"{log_kb:>10.0f}")
+    close_pools()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Overhead of the metrics instrumentation on request latency.
+
+The same move-and-read request pairs as bench_logging are served by the Flask
+test client with metrics recorded and not recorded, alternating in rounds so
+that both see the same machine noise. Logging is off. The overhead is the
+median over rounds of the difference of mean latencies, relative to the
+uninstrumented one.
+"""
+import os
+import statistics
+import tempfile
+from typing import Callable, Dict, List
+
+import click
+
+from chopsticks.dao.sqlite_pool import close_pools
+from chopsticks.metrics import METRICS
+
+from app import app, setup
+from benchmarks.common import quiet_logging, time_calls
+
+
+def request_pairs(client) -> Callable[[], None]:
+    turn = [0]
+
+    def serve() -> None:
+        response = client.get(f"/chopsticks/move/{turn[0]}/left/left")
+        if response.status_code != 200:
+            client.get("/chopsticks/reset")
+            turn[0] = 0
+        else:
+            turn[0] = 1 - turn[0]
+        client.get("/chopsticks/get_board_state")
+
+    return serve
+
+
+def overhead(dao_id: str, db_path: str, rounds: int, n_requests: int) -> Dict[str, float]:
+    close_pools()
+    setup(dao_id=dao_id, sqlite_db_path=db_path, sqlite_pragma_profile="performance", caching_backend="sqlite",
+          flush_interval_ms=100, max_unflushed=100, engine_budget_ms=50, log_level="CRITICAL")
+    quiet_logging()
+    serve = request_pairs(app.test_client())
+    means: Dict[bool, List[float]] = {True: [], False: []}
+    for _ in range(rounds):
+        for enabled in (False, True):
+            METRICS.enabled = enabled
+            means[enabled].append(statistics.fmean(time_calls(serve, n_requests)))
+    METRICS.enabled = True
+    ratios = [on / off - 1 for off, on in zip(means[False], means[True])]
+    return {"off_us": statistics.median(means[False]) * 1e6, "on_us": statistics.median(means[True]) * 1e6,
+            "overhead_pct": statistics.median(ratios) * 100}
+
+
+@click.command()
+@click.option('--rounds', default=30, help='Alternating rounds per configuration')
+@click.option('--requests', 'n_requests', default=200, help='Move and read pairs per round')
+def main(rounds: int, n_requests: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        click.echo(f"{'dao':<12} {'off_us':>10} {'on_us':>10} {'overhead_%':>11}")
+        for dao_id in ("passthrough", "sqlite"):
+            stats = overhead(dao_id, os.path.join(tmp, f"{dao_id}.db"), rounds, n_requests)
+            click.echo(f"{dao_id:<12} {stats['off_us']:>10.1f} {stats['on_us']:>10.1f} {stats['overhead_pct']:>11.2f}")
+    close_pools()
+
+
+if __name__ == '__main__':
+    main()
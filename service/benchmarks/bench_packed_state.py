@@ -0,0 +1,66 @@
+"""Memory per live game for the object and packed representations.
+
+Builds N games in each representation and reports the bytes allocated per
+game, measured with tracemalloc.
+"""
+from array import array
+import gc
+import random
+import tracemalloc
+from typing import Callable
+
+import click
+
+from chopsticks import Player
+from chopsticks.chopstick_model import ChopstickModel
+from chopsticks.packed_state import PackedState, pack
+
+from benchmarks.common import quiet_logging
+
+
+def measure(build: Callable[[], object]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    games = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del games
+    return current
+
+
+@click.command()
+@click.option('--games', 'n_games', default=1_000_000, help='Number of live games')
+@click.option('--seed', default=0, help='Random seed')
+def main(n_games: int, seed: int) -> None:
+    quiet_logging()
+    rng = random.Random(seed)
+    hands = [[rng.randrange(5) for _ in range(4)] for _ in range(1000)]
+
+    def range_mod():
+        return (i % len(hands) for i in range(n_games))
+
+    def models():
+        return [ChopstickModel() for _ in range(n_games)]
+
+    def players():
+        return [([Player(h[0], h[1]), Player(h[2], h[3])], 0, -1) for h in map(hands.__getitem__, range_mod())]
+
+    def packed_ints():
+        return [PackedState(pack([Player(h[0], h[1]), Player(h[2], h[3])]))
+                for h in map(hands.__getitem__, range_mod())]
+
+    def packed_array():
+        return array('H', (pack([Player(h[0], h[1]), Player(h[2], h[3])]) for h in map(hands.__getitem__, range_mod())))
+
+    results = [
+        ("ChopstickModel + PassthroughDAO", measure(models)),
+        ("two Players + turn + winner", measure(players)),
+        ("PackedState in a list", measure(packed_ints)),
+        ("packed states in array('H')", measure(packed_array)),
+    ]
+    baseline = results[0][1]
+    for name, size in results:
+        click.echo(f"{name:<34} {size / n_games:>8.1f} bytes/game  ({baseline / size:>6.1f}x smaller)")
+
+if __name__ == '__main__':
+    main()
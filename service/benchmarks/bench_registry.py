@@ -0,0 +1,64 @@
+"""Per-request latency as the number of live games grows.
+
+Every step adds games to the registry and then times board reads and
+move/reset round trips against randomly chosen live games through the Flask
+test client. Latency should stay flat from 1 to 100k games.
+
+With --max-resident, the registry keeps at most that many games in memory
+and spills the rest to a temporary SQLite file, so requests for games that
+were evicted include reading them back.
+"""
+import os
+import random
+import tempfile
+
+import click
+
+from app import app, VIEW
+from chopsticks import chopstick_controller
+from chopsticks.chopstick_controller import configure_eviction, init_model_and_view
+from chopsticks.dao.sqlite_pool import close_pools
+
+from benchmarks.common import quiet_logging, summarize, time_calls
+
+
+@click.command()
+@click.option('--max-games', default=100_000, help='Largest number of live games')
+@click.option('--requests', 'n_requests', default=2_000, help='Timed requests per step')
+@click.option('--seed', default=0, help='Random seed')
+@click.option('--max-resident', default=0, help='Games kept in memory, the rest spilled to disk; 0 for no limit')
+def main(max_games: int, n_requests: int, seed: int, max_resident: int) -> None:
+    quiet_logging()
+    rng = random.Random(seed)
+    init_model_and_view(VIEW, dao_identifier="passthrough")
+    tmp = tempfile.TemporaryDirectory()
+    configure_eviction(max_resident, 0, os.path.join(tmp.name, "spill.db"))
+    registry = chopstick_controller.REGISTRY
+    client = app.test_client()
+
+    game_ids = list(registry)
+    steps = [n for n in (1, 10, 100, 1_000, 10_000, 100_000) if n <= max_games]
+    click.echo(f"{'games':>8} {'route':<12} {'mean_us':>9} {'p50_us':>9} {'p99_us':>9}")
+    for n_games in steps:
+        while len(game_ids) < n_games:
+            game_ids.append(f"game-{len(game_ids)}")
+            registry.create(game_ids[-1])
+
+        def read() -> None:
+            client.get(f"/chopsticks/{rng.choice(game_ids)}/get_board_state")
+
+        def play() -> None:
+            game_id = rng.choice(game_ids)
+            player = registry.get(game_id).get_current_player()
+            if client.get(f"/chopsticks/{game_id}/move/{player}/left/right").status_code != 200:
+                client.get(f"/chopsticks/{game_id}/reset")
+
+        for name, fn in (("read", read), ("move", play)):
+            stats = summarize(time_calls(fn, n_requests))
+            click.echo(f"{n_games:>8} {name:<12} {stats['mean_us']:>9.1f} {stats['p50_us']:>9.1f} {stats['p99_us']:>9.1f}")
+    close_pools()
+    tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Requests/sec and latency of the Flask server against the asyncio server.
+
+Starts each serving mode on a local port and runs concurrent clients, every
+one on its own game, that reset the game and then alternate moves and board
+reads. Run from the service directory:
+
+    python -m benchmarks.bench_serving --dao-id sqlite
+"""
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+import click
+
+from benchmarks.common import summarize
+
+MODES = {
+    "flask": ["app.py", "--no-debug"],
+    "asgi": ["asgi.py"],
+}
+
+
+def wait_until_up(port: int, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not start.")
+
+
+def client(port: int, game_id: str, requests: int, durations: List[float], errors: List[int]) -> None:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    paths = [f"/chopsticks/{game_id}/reset"]
+    for index in range(requests - 1):
+        player = index // 2 % 2
+        paths.append(f"/chopsticks/{game_id}/move/{player}/left/left" if index % 2 == 0
+                     else f"/chopsticks/{game_id}/get_board_state")
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            # Moves past the end of a game are rejected with 400; only server errors count.
+            if response.status >= 500:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException):
+            errors.append(0)
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        durations.append(time.perf_counter() - start)
+    connection.close()
+
+
+def load(port: int, clients: int, requests: int) -> Dict[str, float]:
+    durations: List[float] = []
+    errors: List[int] = []
+    threads = [threading.Thread(target=client, args=(port, f"bench-{index}", requests, durations, errors))
+               for index in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = summarize(durations)
+    stats["rps"] = len(durations) / elapsed
+    stats["errors"] = len(errors)
+    return stats
+
+
+@click.command()
+@click.option('--clients', default=32, help='Concurrent clients')
+@click.option('--requests', default=200, help='Requests per client')
+@click.option('--dao-id', default='sqlite', help='DAO ID passed to both servers')
+@click.option('--port', default=5050, help='First port to listen on')
+def main(clients: int, requests: int, dao_id: str, port: int) -> None:
+    service_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    click.echo(f"{'mode':>6} {'requests/s':>11} {'p50_us':>10} {'p99_us':>10} {'errors':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for offset, (mode, command) in enumerate(MODES.items()):
+            mode_port = port + offset
+            server = subprocess.Popen(
+                [sys.executable, *command, "--dao-id", dao_id, "--port", str(mode_port), "--host", "127.0.0.1",
+                 "--sqlite-db-path", os.path.join(directory, f"{mode}.db")],
+                cwd=service_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_up(mode_port)
+                stats = load(mode_port, clients, requests)
+            finally:
+                server.terminate()
+                server.wait()
+            click.echo(f"{mode:>6} {stats['rps']:>11.0f} {stats['p50_us']:>10.0f} {stats['p99_us']:>10.0f} "
+                       f"{stats['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
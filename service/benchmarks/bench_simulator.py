@@ -0,0 +1,57 @@
+"""Games per second: the vectorized simulator against the scalar model.
+
+The scalar baseline plays random legal games through the controller on a
+PassthroughDAO-backed ChopstickModel, one call per ply.
+"""
+import random
+import time
+
+import click
+
+from chopsticks import chopstick_controller
+from chopsticks.chopstick_controller import init_game, init_model_and_view, move, swap
+from chopsticks.chopstick_view import ChopstickView
+from chopsticks.rules import actions, position_of, successor_table
+from chopsticks.simulator import DEFAULT_MAX_PLIES, simulate
+
+from benchmarks.common import quiet_logging
+
+
+def scalar_games_per_second(n_games: int, seed: int) -> float:
+    rng = random.Random(seed)
+    table = successor_table().tolist()
+    init_model_and_view(ChopstickView(), dao_identifier="passthrough")
+    model = chopstick_controller.REGISTRY.get("default")
+    start = time.perf_counter()
+    for _ in range(n_games):
+        init_game()
+        for _ in range(DEFAULT_MAX_PLIES):
+            if model.get_winner() != -1:
+                break
+            player = model.get_current_player()
+            legal = table[position_of(model.get_board(), player)]
+            action = actions()[rng.choice([a for a, successor in enumerate(legal) if successor >= 0])]
+            if action.kind == "move":
+                move(str(player), action.hand, action.to_hand)
+            else:
+                swap(str(player), action.hand, str(action.fingers))
+    return n_games / (time.perf_counter() - start)
+
+
+@click.command()
+@click.option('--games', 'n_games', default=1_000_000, help='Games for the vectorized simulator')
+@click.option('--scalar-games', default=2_000, help='Games for the scalar baseline')
+@click.option('--seed', default=0, help='Random seed')
+def main(n_games: int, scalar_games: int, seed: int) -> None:
+    quiet_logging()
+    scalar = scalar_games_per_second(scalar_games, seed)
+    start = time.perf_counter()
+    result = simulate(n_games, seed=seed)
+    vectorized = n_games / (time.perf_counter() - start)
+    click.echo(f"scalar model:  {scalar:>12.0f} games/s")
+    click.echo(f"vectorized:    {vectorized:>12.0f} games/s  ({vectorized / scalar:.0f}x)")
+    click.echo(f"outcomes:      {result.outcome_distribution()}")
+
+
+if __name__ == '__main__':
+    main()
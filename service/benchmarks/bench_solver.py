@@ -0,0 +1,44 @@
+"""Solver table build time and lookup latency.
+
+Builds the outcome table for several finger counts and times O(1) lookups of
+random positions through solver.lookup().
+"""
+import random
+
+import click
+
+from chopsticks import rules, solver
+from chopsticks.packed_state import position_count, unpack
+
+from benchmarks.common import quiet_logging, summarize, time_calls
+
+
+@click.command()
+@click.option('--fingers', '-f', multiple=True, type=int, default=[5, 7, 10, 15, 20], help='Finger counts to solve')
+@click.option('--lookups', default=20_000, help='Timed lookups')
+@click.option('--seed', default=0, help='Random seed')
+def main(fingers: list, lookups: int, seed: int) -> None:
+    quiet_logging()
+    rng = random.Random(seed)
+    click.echo(f"{'fingers':>7} {'positions':>10} {'build_ms':>9} {'win':>7} {'draw':>7} {'loss':>7}")
+    for count in fingers:
+        rules.successor_table.cache_clear()
+        build = summarize(time_calls(lambda: solver.solve(count), 1))
+        solution = solver.get_solution(count)
+        tallies = [int((solution.outcome == outcome).sum()) for outcome in (solver.WIN, solver.DRAW, solver.LOSS)]
+        click.echo(f"{count:>7} {position_count(count):>10} {build['mean_us'] / 1000:>9.1f} "
+                   f"{tallies[0]:>7} {tallies[1]:>7} {tallies[2]:>7}")
+
+    boards = [unpack(rng.randrange(position_count()))[:2] for _ in range(1000)]
+    queries = iter(boards * (lookups // len(boards) + 1))
+
+    def lookup() -> None:
+        players, current_player = next(queries)
+        solver.lookup(players, current_player)
+
+    stats = summarize(time_calls(lookup, lookups))
+    click.echo(f"lookup: mean {stats['mean_us']:.2f}us, p50 {stats['p50_us']:.2f}us, p99 {stats['p99_us']:.2f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Moves per second against the SQLite backend.
+
+Compares the old connection-per-call access pattern with pooled connections
+under every PRAGMA profile. Each move is a full controller turn: validation,
+the model move, the player change and the win check.
+"""
+from contextlib import contextmanager
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Iterator
+
+import click
+
+from chopsticks import chopstick_controller
+from chopsticks.chopstick_controller import init_model_and_view, move, init_game
+from chopsticks.chopstick_view import ChopstickView
+from chopsticks.dao.sqlite_pool import PRAGMA_PROFILES, close_pools
+
+from benchmarks.common import quiet_logging
+
+
+class ConnectPerCall:
+    """Stand-in for SQLiteConnectionPool that reproduces the unpooled behaviour."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        with sqlite3.connect(self.db_path) as conn:
+            yield conn
+        conn.close()
+
+
+def moves_per_second(n_moves: int, db_path: str, pragma_profile: str, pooled: bool) -> float:
+    close_pools()
+    init_model_and_view(ChopstickView(), dao_identifier="sqlite", sqlite_db_path=db_path,
+                        sqlite_pragma_profile=pragma_profile)
+    model = chopstick_controller.REGISTRY.get("default")
+    if not pooled:
+        model.dao.pool = ConnectPerCall(db_path)
+    start = time.perf_counter()
+    for _ in range(n_moves):
+        player = model.get_current_player()
+        try:
+            move(str(player), "left", "right")
+        except ValueError:
+            init_game()
+    return n_moves / (time.perf_counter() - start)
+
+
+@click.command()
+@click.option('--moves', 'n_moves', default=2_000, help='Moves per configuration')
+def main(n_moves: int) -> None:
+    quiet_logging()
+    configs = [("connect-per-call", "default", False)]
+    configs += [(f"pooled/{profile}", profile, True) for profile in PRAGMA_PROFILES]
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = None
+        for name, profile, pooled in configs:
+            db_path = os.path.join(tmp, f"{profile}-{pooled}.db")
+            rate = moves_per_second(n_moves, db_path, profile, pooled)
+            baseline = baseline or rate
+            click.echo(f"{name:<22} {rate:>10.0f} moves/s  ({rate / baseline:.1f}x)")
+    close_pools()
+
+
+if __name__ == '__main__':
+    main()
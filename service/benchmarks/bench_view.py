@@ -0,0 +1,68 @@
+"""Cost of building the JSON responses, per view.
+
+Each view method is called inside one request context, so the time is the
+view alone: building and encoding the body, the log call, and the response
+object. Logging is at INFO, the level production runs at, with records
+dropped by a handler that writes nowhere, so the cost of formatting them is
+included. Through the Flask test client a read route takes some 300us on its
+own, so the difference between views is within the noise of full round trips.
+"""
+import logging
+import os
+import tempfile
+from typing import Callable, Dict
+
+import click
+
+import app as service
+from chopsticks import Player, configure_logging
+from chopsticks.chopstick_view import VIEWS
+from chopsticks.dao.sqlite_pool import close_pools
+
+from app import app, setup
+from benchmarks.common import summarize, time_calls
+
+PLAYER1 = Player(left=2, right=3)
+PLAYER2 = Player(left=1, right=4)
+
+
+def view_calls(view) -> Dict[str, Callable[[], object]]:
+    return {
+        "board_state": lambda: view.board_state(PLAYER1, PLAYER2, -1),
+        "game_state": lambda: view.game_state(PLAYER1, PLAYER2, 0, -1),
+        "get_player": lambda: view.get_player(1),
+        "get_hand": lambda: view.get_hand(PLAYER2, "right"),
+    }
+
+
+@click.command()
+@click.option('--calls', 'n_calls', default=20_000, help='Calls per view method')
+def main(n_calls: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name in VIEWS:
+            close_pools()
+            setup(dao_id="passthrough", sqlite_db_path=os.path.join(tmp, "view.db"), sqlite_pragma_profile="default",
+                  caching_backend="sqlite", flush_interval_ms=100, max_unflushed=100, engine_budget_ms=50,
+                  log_level="CRITICAL", view=name)
+            configure_logging("INFO", target=logging.NullHandler())
+            logging.getLogger("app").setLevel(logging.CRITICAL)
+            logging.getLogger("werkzeug").setLevel(logging.CRITICAL)
+            with app.test_request_context():
+                # The precomputed view encodes its bodies on first use.
+                for call in view_calls(service.VIEW).values():
+                    call()
+                for call_name, call in view_calls(service.VIEW).items():
+                    results[(call_name, name)] = summarize(time_calls(call, n_calls))
+    configure_logging("CRITICAL")
+    close_pools()
+    click.echo(f"{'call':<24} {'view':<12} {'mean_us':>10} {'p50_us':>10} {'p99_us':>10}")
+    for call_name in view_calls(None):
+        for name in VIEWS:
+            stats = results[(call_name, name)]
+            click.echo(f"{call_name:<24} {name:<12} {stats['mean_us']:>10.1f} {stats['p50_us']:>10.1f} "
+                       f"{stats['p99_us']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
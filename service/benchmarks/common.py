@@ -0,0 +1,31 @@
+import logging
+import statistics
+import time
+from typing import Callable, Dict, List
+
+
+def quiet_logging() -> None:
+    """Silence the service loggers so that benchmarks measure the code, not stderr."""
+    logging.getLogger("chopsticks").setLevel(logging.CRITICAL)
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    logging.getLogger("werkzeug").setLevel(logging.CRITICAL)
+
+
+def time_calls(fn: Callable[[], object], repeat: int) -> List[float]:
+    """Call fn repeat times and return the duration of every call in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """Summarize call durations as mean/p50/p99 in microseconds."""
+    ordered = sorted(durations)
+    return {
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p50_us": ordered[len(ordered) // 2] * 1e6,
+        "p99_us": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6,
+    }
@@ -0,0 +1,291 @@
+"""Concurrent simulated players against a running service.
+
+Each client is a thread with its own keep-alive connection that plays whole
+games through the HTTP routes, making the same requests as the React client
+(client_files/App.js):
+
+    start    reset, get_current_player, get_board_state
+    a turn   get_player_hand of the chosen hand, move or swap,
+             get_current_player, get_board_state
+    a win    reset, get_current_player, get_board_state
+
+A turn acts for the player read after the previous action, as the React
+client does, rather than asking for it again.
+
+Every client plays its own game, through the /chopsticks/<game_id>/ routes, so
+clients do not conflict. Actions are picked at random among the legal ones
+for the board the client last read; the random generator of a client is
+seeded from --seed and the client's index, so a run with the same seed and
+client count sends the same requests.
+
+By default a server is started from app.py on a free local port, with the
+options given after --server-arg, and stopped afterwards:
+
+    python -m benchmarks.load_generator --clients 8 --games 20 --seed 1 \\
+        --server-arg=--dao-id=sqlite --server-arg=--log-level=INFO
+
+Pass --url to load a server that is already running instead. The report gives
+the throughput, the games won and the games aborted (by a failed request, the
+deadline or --max-turns), and per route the number of requests, the error rate and the
+p50/p95/p99 latencies. A request fails if it raises or does not return 200.
+"""
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import click
+
+from chopsticks.rules import Action, actions
+
+ROUTES = ("reset", "get_current_player", "get_board_state", "get_player_hand", "move", "swap")
+PERCENTILES = (50, 95, 99)
+SERVER_START_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 10.0
+
+
+class RequestFailed(Exception):
+    """A request that raised or did not return 200."""
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """The nearest-rank q-th percentile of sorted values."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+def legal_actions(board: Dict[str, int], player: int) -> List[Action]:
+    """The actions the player may take on a board returned by get_board_state."""
+    prefix = f"player{player + 1}_"
+    result = []
+    for action in actions():
+        fingers = board[prefix + action.hand]
+        if (action.kind == "move" and fingers) or (action.kind == "swap" and action.fingers <= fingers):
+            result.append(action)
+    return result
+
+
+class Recorder:
+    """Latencies and failures of every request, by route; shared by the clients."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, seconds: float, ok: bool) -> None:
+        with self.lock:
+            self.latencies[route].append(seconds)
+            if not ok:
+                self.errors[route] += 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Summarize the run: throughput and per-route counts, error rates and latencies in ms."""
+        routes = {}
+        with self.lock:
+            for route in ROUTES:
+                ordered = sorted(self.latencies.get(route, []))
+                if not ordered:
+                    continue
+                routes[route] = {
+                    "requests": len(ordered),
+                    "errors": self.errors[route],
+                    "error_rate": self.errors[route] / len(ordered),
+                    **{f"p{q}_ms": round(percentile(ordered, q) * 1e3, 3) for q in PERCENTILES},
+                }
+        total = sum(route["requests"] for route in routes.values())
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "requests": total,
+            "errors": sum(route["errors"] for route in routes.values()),
+            "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+            "routes": routes,
+        }
+
+
+class Client:
+    """One simulated player, playing both sides of its own game.
+
+    Attributes:
+        game_id (str): The game this client plays.
+        rng (random.Random): The seeded source of the client's choices.
+        games (int): Games played to a win so far.
+        aborted (int): Games given up so far, after a failed request, at the deadline or after max_turns turns.
+    """
+
+    def __init__(self, url: str, index: int, seed: int, recorder: Recorder, max_turns: int):
+        parts = urlsplit(url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=REQUEST_TIMEOUT)
+        self.prefix = parts.path.rstrip("/")
+        self.game_id = f"load-{seed}-{index}"
+        self.rng = random.Random(seed * 1_000_003 + index)
+        self.recorder = recorder
+        self.max_turns = max_turns
+        self.games = 0
+        self.aborted = 0
+
+    def get(self, route: str, *args: Any) -> Dict[str, Any]:
+        path = "/".join([f"{self.prefix}/chopsticks/{self.game_id}/{route}", *map(str, args)]).rstrip("/")
+        start = time.perf_counter()
+        try:
+            self.connection.request("GET", path)
+            response = self.connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.connection.close()
+            self.recorder.record(route, time.perf_counter() - start, False)
+            raise RequestFailed(f"GET {path}: {e}") from e
+        self.recorder.record(route, time.perf_counter() - start, response.status == 200)
+        if response.status != 200:
+            raise RequestFailed(f"GET {path}: {response.status} {body[:200]!r}")
+        return json.loads(body)
+
+    def refresh(self) -> Tuple[int, Dict[str, int]]:
+        """Read the turn and the board, as the client does after every action."""
+        player = self.get("get_current_player")["player"]
+        return player, self.get("get_board_state")
+
+    def new_game(self) -> Tuple[int, Dict[str, int]]:
+        self.get("reset")
+        return self.refresh()
+
+    def turn(self, player: int, board: Dict[str, int]) -> Tuple[int, Dict[str, int]]:
+        action = self.rng.choice(legal_actions(board, player))
+        self.get("get_player_hand", player, action.hand)
+        if action.kind == "move":
+            self.get("move", player, action.hand, action.to_hand)
+        else:
+            self.get("swap", player, action.hand, action.fingers)
+        return self.refresh()
+
+    def play(self, games: int, deadline: float) -> None:
+        """Play games until enough of them were won or aborted, or the deadline has passed."""
+        while self.games + self.aborted < games and time.monotonic() < deadline:
+            won = False
+            try:
+                player, board = self.new_game()
+                for _ in range(self.max_turns):
+                    if board["winner"] != -1 or time.monotonic() >= deadline:
+                        break
+                    player, board = self.turn(player, board)
+                won = board["winner"] != -1
+            except RequestFailed:
+                # The failure is recorded; start over from a fresh game, as a user would.
+                pass
+            if won:
+                self.games += 1
+            else:
+                self.aborted += 1
+        self.connection.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_healthy(url: str, server: subprocess.Popen) -> None:
+    parts = urlsplit(url)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise click.ClickException(f"The server exited with status {server.returncode}.")
+        try:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=1)
+            connection.request("GET", f"{parts.path.rstrip('/')}/chopsticks/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise click.ClickException(f"The server did not answer within {SERVER_START_TIMEOUT:.0f}s.")
+
+
+def start_server(server_args: List[str]) -> Tuple[str, subprocess.Popen]:
+    """Start app.py on a free local port and wait until it serves requests."""
+    port = free_port()
+    service_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, os.path.join(service_dir, "app.py"), "--host", "127.0.0.1", "--port", str(port),
+               "--no-debug", *server_args]
+    server = subprocess.Popen(command, cwd=service_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_healthy(url, server)
+    except click.ClickException:
+        server.terminate()
+        raise
+    return url, server
+
+
+def run_load(url: str, clients: int, games: int, duration: Optional[float], seed: int,
+             max_turns: int) -> Dict[str, Any]:
+    """
+    Run the clients to completion against a server.
+
+    Args:
+        url (str): Base URL of the server, e.g. http://127.0.0.1:5000.
+        clients (int): Number of concurrent clients.
+        games (int): Games each client plays.
+        duration (Optional[float]): Seconds after which the clients stop, finished or not.
+        seed (int): Seed of the clients' choices.
+        max_turns (int): Turns after which an unfinished game is reset.
+
+    Returns:
+        Dict[str, Any]: The report; see Recorder.report().
+    """
+    recorder = Recorder()
+    players = [Client(url, index, seed, recorder, max_turns) for index in range(clients)]
+    deadline = time.monotonic() + duration if duration else float("inf")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for future in [pool.submit(player.play, games, deadline) for player in players]:
+            future.result()
+    result = recorder.report(time.perf_counter() - start)
+    result.update(clients=clients, seed=seed, games=sum(player.games for player in players),
+                  aborted_games=sum(player.aborted for player in players))
+    return result
+
+
+@click.command()
+@click.option('--clients', default=8, help='Concurrent simulated players')
+@click.option('--games', default=10, help='Games per client, won or aborted')
+@click.option('--duration', default=None, type=float, help='Stop after this many seconds, finished or not')
+@click.option('--seed', default=0, help='Seed of the players\' choices')
+@click.option('--max-turns', default=200, help='Turns after which an unfinished game is reset')
+@click.option('--url', default=None, help='Load this running server instead of starting app.py')
+@click.option('--server-arg', 'server_args', multiple=True, help='Option passed to the started app.py; repeatable')
+@click.option('--output', '-o', default=None, help='Also write the report to this JSON file')
+def main(clients: int, games: int, duration: Optional[float], seed: int, max_turns: int, url: Optional[str],
+         server_args: Tuple[str, ...], output: Optional[str]) -> None:
+    server = None
+    if url is None:
+        url, server = start_server(list(server_args))
+    try:
+        result = run_load(url, clients, games, duration, seed, max_turns)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    click.echo(f"{result['clients']} clients, {result['games']} games won, {result['aborted_games']} aborted, "
+               f"{result['requests']} requests "
+               f"in {result['elapsed_s']:.1f}s: {result['throughput_rps']:.0f} req/s, {result['errors']} errors")
+    click.echo(f"{'route':<20} {'requests':>9} {'error_%':>8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8}")
+    for route, stats in result["routes"].items():
+        click.echo(f"{route:<20} {stats['requests']:>9} {stats['error_rate'] * 100:>8.2f} {stats['p50_ms']:>8.2f} "
+                   f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+    if output:
+        with open(output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+"""The benchmark suite: a fixed set of micro and macro benchmarks with a
+machine-readable result, to catch performance regressions between commits.
+
+Micro benchmarks time one call of the model (move, swap) or of a DAO
+(get_player, set_player_hand) for every DAO in the DAO map, and the
+controller's argument validation. Macro benchmarks time full HTTP round trips
+of the game routes through the Flask test client, over the in-memory and the
+SQLite DAOs. Every benchmark is warmed up before it is timed.
+
+Run the suite and store the result, then compare a later run against it:
+
+    python -m benchmarks.suite run --output baseline.json
+    python -m benchmarks.suite run --output current.json --baseline baseline.json
+    python -m benchmarks.suite compare baseline.json current.json --threshold 10
+
+Comparing exits with status 1 when a benchmark is slower than the baseline by
+more than the threshold, in percent of the compared statistic (p50 by default,
+which is less sensitive to machine noise than the mean). Only compare results
+measured on the same machine.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import click
+
+from chopsticks import Player
+from chopsticks.chopstick_controller import validate_hand, validate_player
+from chopsticks.chopstick_model import ChopstickModel
+from chopsticks.dao import DAO
+from chopsticks.dao.caching_dao import close_flushers
+from chopsticks.dao.sqlite_pool import close_pools
+
+from app import app, setup
+from benchmarks.common import quiet_logging, summarize, time_calls
+
+FORMAT_VERSION = 1
+STATISTICS = ("mean_us", "p50_us", "p99_us")
+DEFAULT_THRESHOLD = 10.0
+HTTP_DAOS = ("passthrough", "sqlite")
+
+# A benchmark is a context manager taking a scratch directory and yielding the call to time.
+Benchmark = Callable[[str], Iterator[Callable[[], None]]]
+
+BENCHMARKS: Dict[str, Tuple[str, Benchmark]] = {}
+
+
+def benchmark(name: str, group: str) -> Callable[[Callable], Callable]:
+    """Register a generator as a benchmark of the suite."""
+    def register(fn: Callable) -> Callable:
+        BENCHMARKS[name] = (group, contextmanager(fn))
+        return fn
+    return register
+
+
+def dao_kwargs(dao_id: str, tmp: str) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"sqlite_db_path": os.path.join(tmp, f"{dao_id}.db")}
+    if dao_id == "caching":
+        kwargs.update(caching_backend="sqlite", flush_interval=0.1, max_unflushed=100)
+    return kwargs
+
+
+def model_move(dao_id: str) -> Benchmark:
+    def run(tmp: str) -> Iterator[Callable[[], None]]:
+        model = ChopstickModel(dao_id, **dao_kwargs(dao_id, tmp))
+        state = [model.get_state()]
+
+        def call() -> None:
+            # Move from a non-empty hand onto one, starting over when the game is won.
+            current = state[0]
+            player = current.current_player
+            hand_from = "left" if current.players[player].left else "right"
+            hand_to = "left" if current.players[1 - player].left else "right"
+            current = model.move(player, hand_from, hand_to)
+            if current.winner != -1:
+                model.init_game()
+                current = model.get_state()
+            state[0] = current
+
+        yield call
+    return run
+
+
+def model_swap(dao_id: str) -> Benchmark:
+    def run(tmp: str) -> Iterator[Callable[[], None]]:
+        model = ChopstickModel(dao_id, **dao_kwargs(dao_id, tmp))
+        # Swapping one finger off the fuller hand cycles (2, 2) -> (1, 3) -> (2, 2) for ever.
+        model.restore_state([Player(2, 2), Player(2, 2)], 0, -1)
+        state = [model.get_state()]
+
+        def call() -> None:
+            player = state[0].players[state[0].current_player]
+            hand = "left" if player.left >= player.right else "right"
+            state[0] = model.swap(state[0].current_player, hand, 1)
+
+        yield call
+    return run
+
+
+def dao_get_player(dao_id: str) -> Benchmark:
+    def run(tmp: str) -> Iterator[Callable[[], None]]:
+        model = ChopstickModel(dao_id, **dao_kwargs(dao_id, tmp))
+        yield lambda: model.dao.get_player(1)
+    return run
+
+
+def dao_set_player_hand(dao_id: str) -> Benchmark:
+    def run(tmp: str) -> Iterator[Callable[[], None]]:
+        model = ChopstickModel(dao_id, **dao_kwargs(dao_id, tmp))
+        fingers = [0]
+
+        def call() -> None:
+            fingers[0] = (fingers[0] + 1) % 5
+            model.dao.set_player_hand(0, "left", fingers[0])
+
+        yield call
+    return run
+
+
+for _dao_id in DAO:
+    benchmark(f"model.move[{_dao_id}]", "micro")(model_move(_dao_id))
+    benchmark(f"model.swap[{_dao_id}]", "micro")(model_swap(_dao_id))
+    benchmark(f"dao.get_player[{_dao_id}]", "micro")(dao_get_player(_dao_id))
+    benchmark(f"dao.set_player_hand[{_dao_id}]", "micro")(dao_set_player_hand(_dao_id))
+
+
+@benchmark("controller.validate", "micro")
+def controller_validate(tmp: str) -> Iterator[Callable[[], None]]:
+    def call() -> None:
+        validate_player("1")
+        validate_hand("left")
+        validate_hand("right")
+
+    yield call
+
+
+@contextmanager
+def http_client(dao_id: str, tmp: str) -> Iterator[Any]:
+    setup(dao_id=dao_id, sqlite_db_path=os.path.join(tmp, f"http-{dao_id}.db"), sqlite_pragma_profile="default",
+          caching_backend="sqlite", flush_interval_ms=100, max_unflushed=100, engine_budget_ms=50,
+          log_level="CRITICAL")
+    quiet_logging()
+    yield app.test_client()
+
+
+def http_get(dao_id: str, path: str) -> Benchmark:
+    def run(tmp: str) -> Iterator[Callable[[], None]]:
+        with http_client(dao_id, tmp) as client:
+            yield lambda: client.get(path)
+    return run
+
+
+def http_move(dao_id: str) -> Benchmark:
+    def run(tmp: str) -> Iterator[Callable[[], None]]:
+        with http_client(dao_id, tmp) as client:
+            turn = [0]
+
+            def call() -> None:
+                # A rejected move (empty hand, game over) resets the game, as bench_metrics does.
+                if client.get(f"/chopsticks/move/{turn[0]}/left/left").status_code != 200:
+                    client.get("/chopsticks/reset")
+                    turn[0] = 0
+                else:
+                    turn[0] = 1 - turn[0]
+
+            yield call
+    return run
+
+
+def http_swap(dao_id: str) -> Benchmark:
+    def run(tmp: str) -> Iterator[Callable[[], None]]:
+        with http_client(dao_id, tmp) as client:
+            turn = [0]
+
+            def call() -> None:
+                # Both players start from (1, 1): (1, 1) -> (0, 2) -> (1, 1) alternates hands each round.
+                hand = "left" if turn[0] % 4 < 2 else "right"
+                client.get(f"/chopsticks/swap/{turn[0] % 2}/{hand}/1")
+                turn[0] += 1
+
+            yield call
+    return run
+
+
+for _dao_id in HTTP_DAOS:
+    benchmark(f"http.get_board_state[{_dao_id}]", "macro")(http_get(_dao_id, "/chopsticks/get_board_state"))
+    benchmark(f"http.get_current_player[{_dao_id}]", "macro")(http_get(_dao_id, "/chopsticks/get_current_player"))
+    benchmark(f"http.get_player_hand[{_dao_id}]", "macro")(
+        http_get(_dao_id, "/chopsticks/get_player_hand/0/left"))
+    benchmark(f"http.reset[{_dao_id}]", "macro")(http_get(_dao_id, "/chopsticks/reset"))
+    benchmark(f"http.move[{_dao_id}]", "macro")(http_move(_dao_id))
+    benchmark(f"http.swap[{_dao_id}]", "macro")(http_swap(_dao_id))
+
+
+def run_suite(pattern: str, repeat: int, warmup: int) -> Dict[str, Any]:
+    """
+    Run every benchmark whose name matches pattern.
+
+    Args:
+        pattern (str): Regular expression searched in the benchmark names.
+        repeat (int): Timed calls per benchmark.
+        warmup (int): Untimed calls before them.
+
+    Returns:
+        Dict[str, Any]: The result document: when and where it was measured, and
+                        the statistics of every benchmark in microseconds.
+    """
+    selected = re.compile(pattern)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (group, bench) in BENCHMARKS.items():
+            if not selected.search(name):
+                continue
+            with bench(tmp) as call:
+                time_calls(call, warmup)
+                stats = summarize(time_calls(call, repeat))
+            close_flushers()
+            close_pools()
+            results[name] = {"group": group, "calls": repeat, **{key: round(stats[key], 3) for key in STATISTICS}}
+    return {
+        "format": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], statistic: str = "p50_us",
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compare two result documents benchmark by benchmark.
+
+    Args:
+        baseline (Dict[str, Any]): The reference result.
+        current (Dict[str, Any]): The result to check.
+        statistic (str): The statistic compared; one of STATISTICS.
+        threshold (float): Slowdown, in percent, beyond which a benchmark has regressed.
+
+    Returns:
+        List[Dict[str, Any]]: One row per benchmark of either document, with its status:
+                              "regression", "improvement", "ok", "new" or "missing".
+    """
+    rows = []
+    names = list(baseline["results"]) + [name for name in current["results"] if name not in baseline["results"]]
+    for name in names:
+        before = baseline["results"].get(name, {}).get(statistic)
+        after = current["results"].get(name, {}).get(statistic)
+        if before is None or after is None:
+            rows.append({"name": name, "baseline": before, "current": after, "change_pct": None,
+                         "status": "new" if before is None else "missing"})
+            continue
+        change = (after / before - 1) * 100 if before else 0.0
+        status = "regression" if change > threshold else "improvement" if change < -threshold else "ok"
+        rows.append({"name": name, "baseline": before, "current": after, "change_pct": round(change, 1),
+                     "status": status})
+    return rows
+
+
+def report(rows: List[Dict[str, Any]], statistic: str) -> int:
+    """Print a comparison and return the number of regressions."""
+    click.echo(f"{'benchmark':<40} {'baseline':>10} {'current':>10} {'change_%':>9}  status  ({statistic})")
+    for row in rows:
+        before = "-" if row["baseline"] is None else f"{row['baseline']:.1f}"
+        after = "-" if row["current"] is None else f"{row['current']:.1f}"
+        change = "-" if row["change_pct"] is None else f"{row['change_pct']:+.1f}"
+        click.echo(f"{row['name']:<40} {before:>10} {after:>10} {change:>9}  {row['status']}")
+    regressions = sum(row["status"] == "regression" for row in rows)
+    click.echo(f"{regressions} regression(s)")
+    return regressions
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        result = json.load(f)
+    if result.get("format") != FORMAT_VERSION:
+        raise click.ClickException(f"{path} is not a version {FORMAT_VERSION} benchmark result.")
+    return result
+
+
+@click.group()
+def main() -> None:
+    """Run the benchmark suite or compare its results."""
+
+
+@main.command()
+@click.option('--output', '-o', default='benchmark-results.json', help='File the result is written to')
+@click.option('--filter', 'pattern', default='', help='Only run benchmarks whose name matches this regex')
+@click.option('--repeat', default=1_000, help='Timed calls per benchmark')
+@click.option('--warmup', default=100, help='Untimed calls before timing')
+@click.option('--baseline', default=None, help='Result file to compare against after the run')
+@click.option('--statistic', default='p50_us', type=click.Choice(STATISTICS), help='Statistic compared')
+@click.option('--threshold', default=DEFAULT_THRESHOLD, help='Slowdown in percent that counts as a regression')
+def run(output: str, pattern: str, repeat: int, warmup: int, baseline: str, statistic: str,
+        threshold: float) -> None:
+    """Run the suite and write its result as JSON."""
+    quiet_logging()
+    result = run_suite(pattern, repeat, warmup)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    click.echo(f"{'benchmark':<40} {'mean_us':>10} {'p50_us':>10} {'p99_us':>10}")
+    for name, stats in result["results"].items():
+        click.echo(f"{name:<40} {stats['mean_us']:>10.1f} {stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f}")
+    click.echo(f"Wrote {output}")
+    if baseline and report(compare_results(load(baseline), result, statistic, threshold), statistic):
+        sys.exit(1)
+
+
+@main.command()
+@click.argument('baseline')
+@click.argument('current')
+@click.option('--statistic', default='p50_us', type=click.Choice(STATISTICS), help='Statistic compared')
+@click.option('--threshold', default=DEFAULT_THRESHOLD, help='Slowdown in percent that counts as a regression')
+def compare(baseline: str, current: str, statistic: str, threshold: float) -> None:
+    """Compare a result against a baseline; exit with status 1 on a regression."""
+    if report(compare_results(load(baseline), load(current), statistic, threshold), statistic):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,16 @@
-from dataclasses import dataclass
+import atexit
+from dataclasses import dataclass, field
+import itertools
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
 import sys
+from typing import Any, List, Optional
 
 from flask import current_app, has_request_context
 
+FINGERS = 5
+
 
 @dataclass
 class Player:
@@ -11,6 +18,26 @@ class Player:
     right: int
 
 
+@dataclass
+class GameState:
+    """Everything a DAO stores about one game.
+
+    Attributes:
+        players (List[Player]): The players, indexed by player ID.
+        current_player (int): The player to move.
+        winner (int): The winner (0 or 1) or -1 if no one has won.
+        version (int): Increases with every write, for compare-and-swap updates.
+        actions (List[Any]): The chopsticks.rules.Action moves and swaps played on this
+            state since it was read, in order. Stores that keep a move log write these
+            instead of the state; a change made other than by playing actions leaves it empty.
+    """
+    players: List[Player]
+    current_player: int = 0
+    winner: int = -1
+    version: int = 0
+    actions: List[Any] = field(default_factory=list, compare=False, repr=False)
+
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)  # Set the desired logging level here
 
@@ -27,8 +54,77 @@ handler.setFormatter(formatter)
 # Add the handler to the logger
 logger.addHandler(handler)
 
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+
+class DebugSampler(logging.Filter):
+    """Let through one DEBUG record in every round(1 / rate), and every record above DEBUG."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = round(1 / rate) if rate > 0 else 0
+        self.counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        return self.every > 0 and next(self.counter) % self.every == 0
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: str = "DEBUG", debug_sample_rate: float = 1.0, use_queue: bool = False,
+                      target: logging.Handler = handler) -> None:
+    """
+    Configure the chopsticks package logger, replacing any earlier configuration.
+
+    Messages are %-style, so a record below the level costs a level check and
+    is never formatted. With use_queue, records are handed to a QueueHandler and
+    written by a QueueListener thread, so the threads serving requests never
+    wait for the handler's I/O.
+
+    Args:
+        level (str): The lowest level logged, one of LOG_LEVELS.
+        debug_sample_rate (float): Share of DEBUG records kept, from 0 to 1.
+        use_queue (bool): Write records from a background thread.
+        target (logging.Handler): The handler that writes records. Defaults to stderr.
+    """
+    global _listener
+    stop_logging()
+    logger.setLevel(level)
+    for old_handler in list(logger.handlers):
+        logger.removeHandler(old_handler)
+    for old_filter in [f for f in target.filters if isinstance(f, DebugSampler)]:
+        target.removeFilter(old_filter)
+    if use_queue:
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = QueueListener(records, target, respect_handler_level=True)
+        _listener.start()
+        entry: logging.Handler = QueueHandler(records)
+    else:
+        entry = target
+    # Records of the package's modules reach this logger by propagation, which
+    # skips logger filters, so sampling is done by the handler.
+    if debug_sample_rate < 1:
+        entry.addFilter(DebugSampler(debug_sample_rate))
+    logger.addHandler(entry)
+
+
+def stop_logging() -> None:
+    """Write every queued record and stop the listener thread, if any. Runs at interpreter exit."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
 def configure_logger():
     if has_request_context():
         app_logger = current_app.logger
-        for handler in app_logger.handlers:
-            logger.addHandler(handler)
\ No newline at end of file
+        for app_handler in app_logger.handlers:
+            if app_handler not in logger.handlers:
+                logger.addHandler(app_handler)
\ No newline at end of file
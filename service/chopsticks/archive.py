@@ -0,0 +1,365 @@
+"""Archive of finished games as fixed-size binary records in a memory-mapped file.
+
+The file is a 64-byte header followed by records of record_dtype(max_moves):
+
+    game_id   the game's id, UTF-8, at most GAME_ID_BYTES bytes
+    state     the final state, packed as in chopsticks.packed_state
+    n_moves   the number of moves and swaps played
+    moves     their indexes into chopsticks.rules.actions(), padded with NO_MOVE
+
+Every record has the same size, so record i starts at a fixed offset and is
+read in O(1) without an index. Records are numbered in the order they were
+appended; that number is the archive id returned by GameArchive.append().
+Reads return NumPy views and memoryviews of the mapped file, so scanning
+millions of games copies nothing into Python objects.
+
+Games are also found by game id, through an index kept in memory: a sorted
+array of 64-bit hashes of the ids with the archive id of each, 16 bytes per
+game, checked against the stored id on lookup. It is built from the file on
+the first lookup and again whenever records were added other than by this
+process's append(), e.g. by extend(); games appended one at a time go to a
+dict beside it. When a game id was archived more than once, the latest game
+is found.
+"""
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from chopsticks import GameState
+from chopsticks.packed_state import pack, unpack
+from chopsticks.rules import Action, action_codes, actions
+
+MAGIC = b"CHOPARC1"
+HEADER = struct.Struct("<8sIIQ")
+HEADER_SIZE = 64
+
+GAME_ID_BYTES = 32
+DEFAULT_MAX_MOVES = 32
+NO_MOVE = 255
+# Records added to the file at a time when it is full.
+GROWTH_RECORDS = 1 << 16
+
+GAME_ID_ERROR_MSG = "Game id {game_id} is longer than {limit} bytes."
+MOVES_ERROR_MSG = "Game has {moves} moves; the archive holds at most {limit}."
+FORMAT_ERROR_MSG = "{path} is not a game archive."
+MAX_MOVES_ERROR_MSG = "{path} holds {stored} moves per game, not {requested}."
+
+# Multiplier of the game id hash (the 64-bit FNV prime).
+HASH_MULTIPLIER = np.uint64(0x100000001B3)
+ID_WORDS = struct.Struct(f"<{GAME_ID_BYTES // 8}Q")
+
+
+def record_dtype(max_moves: int = DEFAULT_MAX_MOVES) -> np.dtype:
+    """
+    Get the layout of one archived game.
+
+    Args:
+        max_moves (int): Moves stored per game.
+
+    Returns:
+        np.dtype: A packed structured dtype; see the module docstring.
+    """
+    return np.dtype([("game_id", f"S{GAME_ID_BYTES}"), ("state", "<u2"), ("n_moves", "<u2"),
+                     ("moves", "u1", (max_moves,))])
+
+
+def hash_game_ids(game_ids: np.ndarray) -> np.ndarray:
+    """
+    Hash game ids as stored in the archive.
+
+    Args:
+        game_ids (np.ndarray): Ids with dtype S{GAME_ID_BYTES}.
+
+    Returns:
+        np.ndarray: One uint64 per id.
+    """
+    words = np.ascontiguousarray(game_ids, dtype=f"S{GAME_ID_BYTES}").view("<u8").reshape(len(game_ids), -1)
+    keys = words[:, 0].copy()
+    for column in range(1, words.shape[1]):
+        keys *= HASH_MULTIPLIER
+        keys ^= words[:, column]
+    return keys
+
+
+def _hash_game_id(padded: bytes) -> np.uint64:
+    # hash_game_ids() of one id, padded to GAME_ID_BYTES, without building arrays.
+    words = ID_WORDS.unpack(padded)
+    key = words[0]
+    for word in words[1:]:
+        key = ((key * int(HASH_MULTIPLIER)) & 0xFFFFFFFFFFFFFFFF) ^ word
+    return np.uint64(key)
+
+
+class GameArchive:
+    """Append-only store of finished games in a memory-mapped file.
+
+    Appends are serialized by a lock, so one process may write while any
+    number read; reads need no lock, as records never change once written.
+    The file grows GROWTH_RECORDS records at a time and is mapped again when
+    it does; views taken before keep the old mapping alive and stay valid.
+
+    Attributes:
+        path (str): The archive file.
+        max_moves (int): Moves stored per game.
+        dtype (np.dtype): The record layout.
+    """
+
+    def __init__(self, path: str, max_moves: int = DEFAULT_MAX_MOVES):
+        """Open an archive, creating the file if it does not exist.
+
+        Args:
+            path (str): Path to the archive file.
+            max_moves (int): Moves stored per game, for a new file. Defaults to 32.
+
+        Raises:
+            ValueError: If the file is not an archive or was created with another max_moves.
+        """
+        self.path = path
+        self.max_moves = max_moves
+        self.dtype = record_dtype(max_moves)
+        self.lock = threading.Lock()
+        # The game id index; see the module docstring. None until the first lookup.
+        self.index_keys: Optional[np.ndarray] = None
+        self.index_ids: Optional[np.ndarray] = None
+        self.indexed = 0
+        self.appended: Dict[bytes, int] = {}
+        self.file = open(path, "r+b" if os.path.exists(path) else "w+b")
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.truncate(HEADER_SIZE)
+            self._map()
+            self._write_header(0)
+        else:
+            self._map()
+            magic, _, stored, _ = HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC:
+                self.close()
+                raise ValueError(FORMAT_ERROR_MSG.format(path=path))
+            if stored != max_moves:
+                self.close()
+                raise ValueError(MAX_MOVES_ERROR_MSG.format(path=path, stored=stored, requested=max_moves))
+
+    def _map(self) -> None:
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.capacity = (len(self.map) - HEADER_SIZE) // self.dtype.itemsize
+
+    def _write_header(self, count: int) -> None:
+        HEADER.pack_into(self.map, 0, MAGIC, 1, self.max_moves, count)
+
+    def __len__(self) -> int:
+        return HEADER.unpack_from(self.map, 0)[3]
+
+    def _reserve(self, n: int) -> np.ndarray:
+        # Grow the file to fit n more records; return a writable view of them.
+        count = len(self)
+        if count + n > self.capacity:
+            capacity = max(count + n, self.capacity + GROWTH_RECORDS)
+            self.file.truncate(HEADER_SIZE + capacity * self.dtype.itemsize)
+            # The old mapping is not closed: views of it may still be in use.
+            self._map()
+        return np.frombuffer(self.map, self.dtype, n, HEADER_SIZE + count * self.dtype.itemsize)
+
+    def append(self, game_id: str, state: GameState, moves: Sequence[Action]) -> int:
+        """
+        Archive one game.
+
+        Args:
+            game_id (str): The game's id.
+            state (GameState): The final state; its version is not stored.
+            moves (Sequence[Action]): The moves and swaps played, in order.
+
+        Returns:
+            int: The archive id of the game, for get() and record().
+
+        Raises:
+            ValueError: If the game id is too long or the game has more than max_moves moves.
+        """
+        encoded = game_id.encode()
+        if len(encoded) > GAME_ID_BYTES:
+            raise ValueError(GAME_ID_ERROR_MSG.format(game_id=game_id, limit=GAME_ID_BYTES))
+        if len(moves) > self.max_moves:
+            raise ValueError(MOVES_ERROR_MSG.format(moves=len(moves), limit=self.max_moves))
+        codes = action_codes()
+        with self.lock:
+            record = self._reserve(1)
+            record["game_id"] = encoded
+            record["state"] = pack(state.players, state.current_player, state.winner)
+            record["n_moves"] = len(moves)
+            record["moves"] = NO_MOVE
+            record["moves"][0, :len(moves)] = [codes[move] for move in moves]
+            archive_id = len(self)
+            self._write_header(archive_id + 1)
+            if self.index_keys is not None:
+                self.appended[encoded] = archive_id
+        return archive_id
+
+    def extend(self, game_ids: Sequence[str], states: np.ndarray, moves: np.ndarray) -> range:
+        """
+        Archive many games at once, e.g. the result of chopsticks.simulator.simulate().
+
+        Args:
+            game_ids (Sequence[str]): The games' ids.
+            states (np.ndarray): The packed final states.
+            moves (np.ndarray): Shape (games, plies); indexes into rules.actions(), negative
+                                after the end of a game. Plies beyond max_moves must be negative.
+
+        Returns:
+            range: The archive ids of the games.
+
+        Raises:
+            ValueError: If an id is too long or a game has more than max_moves moves.
+        """
+        encoded = np.array([game_id.encode() for game_id in game_ids], dtype=f"S{GAME_ID_BYTES + 1}")
+        if len(encoded) and np.char.str_len(encoded).max() > GAME_ID_BYTES:
+            raise ValueError(GAME_ID_ERROR_MSG.format(game_id="in batch", limit=GAME_ID_BYTES))
+        played = moves >= 0
+        n_moves = played.sum(axis=1)
+        if played[:, self.max_moves:].any():
+            raise ValueError(MOVES_ERROR_MSG.format(moves=int(n_moves.max()), limit=self.max_moves))
+        width = min(moves.shape[1], self.max_moves)
+        with self.lock:
+            records = self._reserve(len(encoded))
+            records["game_id"] = encoded
+            records["state"] = states
+            records["n_moves"] = n_moves
+            records["moves"] = NO_MOVE
+            records["moves"][:, :width] = np.where(played[:, :width], moves[:, :width], NO_MOVE)
+            start = len(self)
+            self._write_header(start + len(encoded))
+        return range(start, start + len(encoded))
+
+    def records(self) -> np.ndarray:
+        """
+        Get every archived game as one read-only structured array over the mapped file.
+
+        Returns:
+            np.ndarray: A view with dtype record_dtype(max_moves); nothing is copied.
+        """
+        view = np.frombuffer(self.map, self.dtype, len(self), HEADER_SIZE)
+        view.flags.writeable = False
+        return view
+
+    def scan(self, chunk_records: int = GROWTH_RECORDS) -> Iterator[np.ndarray]:
+        """
+        Stream the archive in chunks of views, oldest first.
+
+        Args:
+            chunk_records (int): Records per chunk.
+
+        Yields:
+            np.ndarray: Read-only views of consecutive records.
+        """
+        records = self.records()
+        for start in range(0, len(records), chunk_records):
+            yield records[start:start + chunk_records]
+
+    def record(self, archive_id: int) -> memoryview:
+        """
+        Get the raw bytes of one game in O(1).
+
+        Args:
+            archive_id (int): The archive id returned by append().
+
+        Returns:
+            memoryview: A read-only view of the record in the mapped file.
+
+        Raises:
+            IndexError: If there is no such game.
+        """
+        if not 0 <= archive_id < len(self):
+            raise IndexError(archive_id)
+        start = HEADER_SIZE + archive_id * self.dtype.itemsize
+        return memoryview(self.map)[start:start + self.dtype.itemsize].toreadonly()
+
+    def get(self, archive_id: int) -> Tuple[str, GameState, List[Action]]:
+        """
+        Decode one game in O(1).
+
+        Args:
+            archive_id (int): The archive id returned by append().
+
+        Returns:
+            Tuple[str, GameState, List[Action]]: The game id, the final state and the moves played.
+
+        Raises:
+            IndexError: If there is no such game.
+        """
+        record = np.frombuffer(self.record(archive_id), self.dtype)[0]
+        players, current_player, winner = unpack(int(record["state"]))
+        played = actions()
+        moves = [played[code] for code in record["moves"][:record["n_moves"]]]
+        return record["game_id"].decode(), GameState(players, current_player, winner), moves
+
+    def find(self, game_id: str) -> int:
+        """
+        Find the archive id of a game by its game id.
+
+        Args:
+            game_id (str): The game's id.
+
+        Returns:
+            int: The archive id of the latest game archived under game_id.
+
+        Raises:
+            KeyError: If no game with that id was archived.
+        """
+        encoded = game_id.encode()
+        with self.lock:
+            count = len(self)
+            if self.index_keys is None or self.indexed + len(self.appended) != count or \
+                    len(self.appended) > max(GROWTH_RECORDS, self.indexed):
+                self._build_index(count)
+            archive_id = self.appended.get(encoded)
+            if archive_id is not None:
+                return archive_id
+            keys, ids = self.index_keys, self.index_ids
+        padded = encoded.ljust(GAME_ID_BYTES, b"\0")
+        key = _hash_game_id(padded)
+        start, end = keys.searchsorted(key, side="left"), keys.searchsorted(key, side="right")
+        # Equal hashes keep archive order, so the latest game is the last match.
+        for candidate in ids[start:end][::-1].tolist():
+            if self.record(candidate)[:GAME_ID_BYTES] == padded:
+                return candidate
+        raise KeyError(game_id)
+
+    def get_by_game_id(self, game_id: str) -> Tuple[str, GameState, List[Action]]:
+        """
+        Decode the latest game archived under a game id.
+
+        Args:
+            game_id (str): The game's id.
+
+        Returns:
+            Tuple[str, GameState, List[Action]]: As get().
+
+        Raises:
+            KeyError: If no game with that id was archived.
+        """
+        return self.get(self.find(game_id))
+
+    def _build_index(self, count: int) -> None:
+        # Hash and sort the ids of the first count records; called with the lock held.
+        keys = np.concatenate([hash_game_ids(chunk["game_id"]) for chunk in self.scan()] or
+                              [np.empty(0, np.uint64)])[:count]
+        order = np.argsort(keys, kind="stable")
+        self.index_keys, self.index_ids = keys[order], order
+        self.indexed = count
+        self.appended = {}
+
+    def flush(self) -> None:
+        """Write the mapped pages back to the file."""
+        self.map.flush()
+
+    def close(self) -> None:
+        """Flush and close the file. Views still in use keep their mapping open."""
+        self.map.flush()
+        self.file.close()
+
+    def __enter__(self) -> "GameArchive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
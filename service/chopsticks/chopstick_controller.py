@@ -1,120 +1,222 @@
+from functools import wraps
+import inspect
 import logging
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from flask import Response
 
-from chopsticks.chopstick_model import ChopstickModel
+from chopsticks import GameState, Player, solver
+from chopsticks.chopstick_model import GAME_OVER_ERROR_MSG, ChopstickModel, WRONG_PLAYER_ERROR_MSG
 from chopsticks.chopstick_view import ChopstickView
+from chopsticks.engine import SearchEngine
+from chopsticks.events import EventBroker, Subscription
+from chopsticks.game_locks import DEFAULT_STRIPES, StripedLocks
+from chopsticks.game_registry import DEFAULT_GAME_ID, GameNotFoundError, GameRegistry
+from chopsticks.rules import Action, advance, legal_moves
+from chopsticks.spill_store import DEFAULT_SPILL_PATH
 
 INVALID_HAND_ERROR_MSG = "Hand must be 'left' or 'right'"
 INVALID_PLAYER_ERROR_MSG = "Player must be an integer, either 0 or 1."
-WRONG_PLAYER_ERROR_MSG = "It is player {current_player}'s turn."
+INVALID_ACTION_ERROR_MSG = "Action must be 'move' or 'swap'."
+BATCH_ERROR_MSG = "Action {index} failed: {error}"
+EMPTY_BATCH_ERROR_MSG = "At least one action is required."
 
-MODEL = None
+ENGINE_PLAYER = 1
+
+REGISTRY = None
 VIEW = None
+ENGINE = SearchEngine()
+EVENTS = EventBroker()
+
+# Serializes the actions of this process per game; see StripedLocks.
+GAME_LOCKS = StripedLocks(DEFAULT_STRIPES)
 
 logger = logging.getLogger(__name__)
 
+def locked(fn: Callable) -> Callable:
+    """Run fn while holding the lock of the game named by its game_id argument."""
+    parameters = inspect.signature(fn).parameters
+    position, default = list(parameters).index("game_id"), parameters["game_id"].default
+
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if len(args) > position:
+            game_id = args[position]
+        else:
+            game_id = kwargs.get("game_id", default)
+        with GAME_LOCKS.lock_for(game_id):
+            return fn(*args, **kwargs)
+    return wrapper
+
 def init_model_and_view(view: ChopstickView, dao_identifier: str, *args: Any, **kwargs: Any) -> None:
     """
-    Initialize the model and view.
+    Initialize the game registry, the default game and the view.
 
     Args:
         view (ChopstickView): View object for the application.
         dao_identifier (str): Identifier for the data access object.
         dao_args (Any): Arguments for the data access object.
     """
-    global MODEL, VIEW
-    MODEL = ChopstickModel(dao_identifier, *args, **kwargs)
+    global REGISTRY, VIEW
+    REGISTRY = GameRegistry(dao_identifier, *args, **kwargs)
+    REGISTRY.get_or_create(DEFAULT_GAME_ID)
     VIEW = view
 
-def init_game() -> None:
+def configure_locks(stripes: int) -> None:
     """
-    Initialize the game.
+    Replace the per-game locks with a new number of stripes. Call it before serving.
+
+    Args:
+        stripes (int): Number of locks the games are shared out among; 1 serializes every action.
     """
-    MODEL.init_game()
-    logger.info("Initialized game.")
+    global GAME_LOCKS
+    GAME_LOCKS = StripedLocks(stripes)
+    logger.info("Actions serialized per game over %s lock stripes.", stripes)
 
-def change_player() -> None:
+def configure_eviction(max_games: int, idle_ttl: float, spill_path: str = DEFAULT_SPILL_PATH) -> None:
     """
-    Change the current player to the next player.
+    Bound the games the registry keeps in memory; evicted games are spilled to disk
+    and read back on their next request. Call it after init_model_and_view().
+
+    Args:
+        max_games (int): Games kept in memory; 0 for no limit.
+        idle_ttl (float): Seconds without a request after which a game is evicted; 0 to never.
+        spill_path (str): The SQLite database evicted games are written to.
     """
-    MODEL.change_player()
-    logger.info(f"Changed current player to {MODEL.get_current_player()}.")
+    # Look the lock up at eviction time, so that configure_locks() may run later.
+    REGISTRY.configure_eviction(max_games, idle_ttl, spill_path, lock_for=lambda game_id: GAME_LOCKS.lock_for(game_id))
 
-def check_win() -> bool:
+def configure_engine(time_budget: float) -> None:
     """
-    Check if the current player has won the game.
+    Replace the computer opponent with one using a new per-move time budget.
 
-    Returns:
-        bool: True if the current player has won, False otherwise.
+    Args:
+        time_budget (float): Seconds the engine may search per move.
+    """
+    global ENGINE
+    ENGINE = SearchEngine(time_budget=time_budget)
+    logger.info("Engine time budget set to %ss.", time_budget)
+
+@locked
+def init_game(game_id: str = DEFAULT_GAME_ID) -> None:
+    """
+    Initialize the game, creating it if it does not exist yet.
+
+    Args:
+        game_id (str): The id of the game.
     """
-    player = MODEL.get_player_hands(MODEL.get_current_player())
-    win = player.left + player.right == 0
-    logger.info(f"Checked win condition for player {MODEL.get_current_player()}: {'win' if win else 'no win'}.")
-    return win
+    REGISTRY.get_or_create(game_id).init_game()
+    logger.info("Initialized game %s.", game_id)
+    publish_board_state(game_id)
 
-def get_winner() -> int:
+@locked
+def end_game(game_id: str) -> None:
+    """
+    Tear down a game.
+
+    Args:
+        game_id (str): The id of the game.
+
+    Raises:
+        GameNotFoundError: If there is no game with the given id.
+    """
+    REGISTRY.remove(game_id)
+    logger.info("Ended game %s.", game_id)
+
+def forget_game(game_id: str) -> None:
+    """
+    Drop this process's model of a game that turned out to be missing, e.g. because
+    another worker deleted it from the shared store. Its next request attaches
+    the game again if it has been created anew.
+
+    Args:
+        game_id (str): The id of the game.
+    """
+    REGISTRY.discard(game_id)
+
+def change_player(game_id: str = DEFAULT_GAME_ID) -> None:
+    """
+    Change the current player to the next player.
+
+    Args:
+        game_id (str): The id of the game.
+    """
+    model = REGISTRY.get(game_id)
+    model.change_player()
+    logger.info("Changed current player to %s.", model.get_current_player())
+
+def get_winner(game_id: str = DEFAULT_GAME_ID) -> int:
     """
     Get the winner of the game.
 
+    Args:
+        game_id (str): The id of the game.
+
     Returns:
         int: The winner (0 or 1) or -1 if no one has won.
     """
-    return MODEL.get_winner()
+    return REGISTRY.get(game_id).get_winner()
 
-def set_winner() -> None:
+def get_state_version(game_id: str = DEFAULT_GAME_ID) -> int:
     """
-    Inform the model of the current winner of the game
+    Get the state version of the game, a single lookup in the DAO.
+
+    Args:
+        game_id (str): The id of the game.
+
+    Returns:
+        int: The state version; it changes whenever the game does.
     """
-    if check_win():
-        change_player()
-        winner = MODEL.get_current_player()
-        logger.info(f"Player {winner} has won the game.")
-        MODEL.set_winner(winner)
-    else:
-        logger.info("No player has won yet.")
+    return REGISTRY.get(game_id).get_version()
 
-def get_current_player() -> Response:
+def get_current_player(game_id: str = DEFAULT_GAME_ID) -> Response:
     """
     Get the current player.
 
+    Args:
+        game_id (str): The id of the game.
+
     Returns:
         Response: Flask response object containing the current player.
     """
-    current_player = MODEL.get_current_player()
+    current_player = REGISTRY.get(game_id).get_current_player()
     return VIEW.get_player(current_player)
 
-def get_player_hand(player: str, hand: str) -> Response:
+def get_player_hand(player: str, hand: str, game_id: str = DEFAULT_GAME_ID) -> Response:
     """
     Get the value of a specific hand for a player.
 
     Args:
         player (str): The index of the player in the array of players.
         hand (str): The hand to get the value of.
+        game_id (str): The id of the game.
 
     Returns:
         Response: Flask response object containing the value of the hand.
     """
+    model = REGISTRY.get(game_id)
     try:
         player = int(player)
     except ValueError:
         e = ValueError(INVALID_PLAYER_ERROR_MSG)
         logger.error(e)
         return VIEW.error(str(e))
-    player_obj = MODEL.get_player_hands(player)
+    player_obj = model.get_player_hands(player)
     return VIEW.get_hand(player_obj, hand)
 
-def validate_player(player: str) -> None:
+def validate_player(player: str) -> int:
     """
-    Validate the player.
+    Validate the player. Whose turn it is is checked by the model, in the
+    same compare-and-swap update as the action.
 
     Args:
         player (str): The player to validate.
 
+    Returns:
+        int: The player.
+
     Raises:
         ValueError: If player is not an integer 0 or 1.
-        ValueError: If it is not the current player's turn.
     """
     try:
         player = int(player)
@@ -124,10 +226,6 @@ def validate_player(player: str) -> None:
     if player not in (0, 1):
         logger.error(INVALID_PLAYER_ERROR_MSG)
         raise ValueError(INVALID_PLAYER_ERROR_MSG)
-    if player != MODEL.get_current_player():
-        display_player = MODEL.get_current_player() + 1
-        logger.error(WRONG_PLAYER_ERROR_MSG.format(current_player=display_player))
-        raise ValueError(WRONG_PLAYER_ERROR_MSG.format(current_player=display_player))
     return player
 
 def validate_hand(hand: str) -> None:
@@ -144,7 +242,8 @@ def validate_hand(hand: str) -> None:
         logger.error(INVALID_HAND_ERROR_MSG)
         raise ValueError(INVALID_HAND_ERROR_MSG)
 
-def move(player: str, from_hand: str, to_hand: str) -> Response:
+@locked
+def move(player: str, from_hand: str, to_hand: str, game_id: str = DEFAULT_GAME_ID) -> Response:
     """
     Execute a move in the game and check if the move results in a win.
 
@@ -152,28 +251,31 @@ def move(player: str, from_hand: str, to_hand: str) -> Response:
         player (str): The player making the move (should be "0" or "1").
         from_hand (str): The hand to move from (should be "left" or "right").
         to_hand (str): The hand to move to (should be "left" or "right").
+        game_id (str): The id of the game.
 
     Returns:
         Response: The Flask response object containing the move result.
 
     Raises:
-        ValueError: If player is not "0" or "1".
+        ValueError: If player is not "0" or "1", or it is not their turn.
         ValueError: If from_hand or to_hand are not "left" or "right".
     """
-    logger.info(f"Player {player} is attempting to move from {from_hand} to {to_hand}.")
+    logger.info("Player %s is attempting to move from %s to %s.", player, from_hand, to_hand)
     try:
-        logger.info(f"Player {player} is attempting to move from {from_hand} to {to_hand}.")
+        logger.info("Player %s is attempting to move from %s to %s.", player, from_hand, to_hand)
+        model = REGISTRY.get(game_id)
         player = validate_player(player)
         validate_hand(from_hand)
         validate_hand(to_hand)
-        MODEL.move(MODEL.get_current_player(), from_hand, to_hand)
-        logger.info(f"Move completed.")
-        end_move()
+        state = model.move(player, from_hand, to_hand)
+        logger.info("Move completed.")
+        end_move(game_id, state)
     except ValueError as e:
         logger.error(e)
         raise e
 
-def swap(player: str, hand: str, fingers: str) -> Response:
+@locked
+def swap(player: str, hand: str, fingers: str, game_id: str = DEFAULT_GAME_ID) -> Response:
     """
     Execute a swap of fingers between hands.
 
@@ -181,15 +283,17 @@ def swap(player: str, hand: str, fingers: str) -> Response:
         player (str): The player making the swap (should be "0" or "1").
         hand (str): The hand to swap from (should be "left" or "right").
         fingers (str): The number of fingers to swap (should be a string representing an integer).
+        game_id (str): The id of the game.
 
     Returns:
         Response: The Flask response object containing the swap result.
 
     Raises:
-        ValueError: If player is not "0" or "1".
+        ValueError: If player is not "0" or "1", or it is not their turn.
         ValueError: If hand is not "left" or "right".
     """
-    logger.info(f"Player {player} is attempting to swap {fingers} fingers from {hand}.")
+    logger.info("Player %s is attempting to swap %s fingers from %s.", player, fingers, hand)
+    model = REGISTRY.get(game_id)
     try:
         player = validate_player(player)
         validate_hand(hand)
@@ -203,28 +307,246 @@ def swap(player: str, hand: str, fingers: str) -> Response:
         logger.error(e)
         raise e
     try:
-        MODEL.swap(player, hand, fingers)
-        logger.info(f"Swap completed for player {player}.")
-        end_move()
+        state = model.swap(player, hand, fingers)
+        logger.info("Swap completed for player %s.", player)
+        end_move(game_id, state)
     except ValueError as e:
         logger.error(e)
         raise e
 
-def end_move() -> None:
+def end_move(game_id: str = DEFAULT_GAME_ID, state: Optional[GameState] = None) -> None:
     """
-    Change players and check for a winner
+    Announce the state after an action. The model has already passed the turn
+    and checked for a winner in the same update.
+
+    Args:
+        game_id (str): The id of the game.
+        state (Optional[GameState]): The state just written by the model, if known.
+    """
+    publish_board_state(game_id, state)
+
+@locked
+def apply_actions(actions: List[Dict[str, Any]], game_id: str = DEFAULT_GAME_ID) -> Response:
+    """
+    Apply a list of moves and swaps in order, atomically.
+
+    Each action is validated and applied like a single move or swap request,
+    to an in-memory copy of the game, and the result is written with a single
+    compare-and-swap. If any action fails nothing is written, no other action
+    can interleave with the batch, and subscribers only see the final state.
+
+    Args:
+        actions (List[Dict[str, Any]]): Actions such as {"action": "move", "player": 0,
+                                        "from_hand": "left", "to_hand": "right"} or
+                                        {"action": "swap", "player": 0, "hand": "left", "fingers": 1}.
+        game_id (str): The id of the game.
+
+    Returns:
+        Response: The Flask response object containing the final game state.
+
+    Raises:
+        ValueError: If there are no actions, or an action is invalid; the message names the failing action.
+    """
+    model = REGISTRY.get(game_id)
+    if not actions:
+        # Writing nothing would still bump the version and notify subscribers.
+        logger.error(EMPTY_BATCH_ERROR_MSG)
+        raise ValueError(EMPTY_BATCH_ERROR_MSG)
+    logger.info("Applying %s actions to game %s.", len(actions), game_id)
+
+    def transition(state: GameState) -> None:
+        for index, action in enumerate(actions):
+            try:
+                apply_action(model, state, action)
+            except ValueError as e:
+                error = ValueError(BATCH_ERROR_MSG.format(index=index, error=e))
+                logger.error(error)
+                raise error from e
+
+    state = model.update(transition)
+    publish_board_state(game_id, state)
+    player1, player2 = state.players
+    return VIEW.game_state(player1, player2, state.current_player, state.winner)
+
+def apply_action(model: ChopstickModel, state: GameState, action: Dict[str, Any]) -> None:
+    """
+    Validate one action of a batch and apply it to a state in memory.
+
+    Args:
+        model (ChopstickModel): The model of the game.
+        state (GameState): The state to change.
+        action (Dict[str, Any]): The action, as accepted by apply_actions().
+
+    Raises:
+        ValueError: If the action is invalid.
     """
-    change_player()
-    set_winner()
+    if not isinstance(action, dict):
+        raise ValueError(INVALID_ACTION_ERROR_MSG)
+    player = validate_player(str(action.get("player")))
+    if action.get("action") == "move":
+        validate_hand(action.get("from_hand"))
+        validate_hand(action.get("to_hand"))
+        model.apply_move(state, player, action.get("from_hand"), action.get("to_hand"))
+    elif action.get("action") == "swap":
+        validate_hand(action.get("hand"))
+        try:
+            fingers = int(action.get("fingers"))
+        except (TypeError, ValueError):
+            raise ValueError("Fingers must be an integer") from None
+        model.apply_swap(state, player, action.get("hand"), fingers)
+    else:
+        raise ValueError(INVALID_ACTION_ERROR_MSG)
 
-def get_board_state() -> Response:
+def get_board_state(game_id: str = DEFAULT_GAME_ID) -> Response:
     """
     Get the current state of the board and display it using the view.
 
+    Args:
+        game_id (str): The id of the game.
+
     Returns:
         Response: The Flask response object containing the board state.
     """
-    player1 = MODEL.get_player_hands(0)
-    player2 = MODEL.get_player_hands(1)
-    winner = MODEL.get_winner()
-    return VIEW.board_state(player1, player2, winner)
+    state = REGISTRY.get(game_id).get_state()
+    player1, player2 = state.players
+    return VIEW.board_state(player1, player2, state.winner)
+
+def get_best_move(game_id: str = DEFAULT_GAME_ID) -> Response:
+    """
+    Get the best action for the current player from the solved game table.
+
+    Args:
+        game_id (str): The id of the game.
+
+    Returns:
+        Response: The Flask response object containing the best action, the predicted
+                  outcome for the current player and the plies to the end. Once the
+                  game is won there is no action, the outcome is the actual result
+                  and the distance is 0.
+    """
+    state = REGISTRY.get(game_id).get_state()
+    if state.winner != -1:
+        action, outcome, distance = None, "win" if state.winner == state.current_player else "loss", 0
+    else:
+        action, outcome, distance = solver.lookup(state.players, state.current_player)
+    logger.info("Best move for player %s: %s (%s in %s).", state.current_player, action, outcome, distance)
+    return VIEW.best_move(action.to_dict() if action else None, outcome, distance)
+
+def get_legal_moves(game_id: str = DEFAULT_GAME_ID) -> Response:
+    """
+    List the actions the current player may take, with the state each one leads to.
+
+    Args:
+        game_id (str): The id of the game.
+
+    Returns:
+        Response: The Flask response object containing the player to move, the
+                  winner and the legal actions; there are none once the game is won.
+    """
+    state = REGISTRY.get(game_id).get_state()
+    options = []
+    if state.winner == -1:
+        for action, successor in legal_moves(state.players, state.current_player).items():
+            result = GameState([Player(player.left, player.right) for player in state.players],
+                               state.current_player, state.winner)
+            advance(result, successor)
+            options.append((action.to_dict(), result))
+    logger.info("Player %s has %s legal actions.", state.current_player, len(options))
+    return VIEW.legal_moves(state.current_player, state.winner, options)
+
+@locked
+def engine_move(game_id: str = DEFAULT_GAME_ID) -> Action:
+    """
+    Let the computer opponent make its move as player 1.
+
+    The engine searches the in-memory board, then plays its action through move()
+    or swap() like any other player.
+
+    Args:
+        game_id (str): The id of the game.
+
+    Returns:
+        Action: The action the engine played.
+
+    Raises:
+        ValueError: If the game is over or it is not player 1's turn.
+    """
+    state = REGISTRY.get(game_id).get_state()
+    if state.winner != -1:
+        logger.error(GAME_OVER_ERROR_MSG)
+        raise ValueError(GAME_OVER_ERROR_MSG)
+    if state.current_player != ENGINE_PLAYER:
+        message = WRONG_PLAYER_ERROR_MSG.format(current_player=state.current_player + 1)
+        logger.error(message)
+        raise ValueError(message)
+    action = ENGINE.choose_action(state.players, ENGINE_PLAYER)
+    logger.info("Engine chose %s.", action)
+    if action.kind == "move":
+        move(str(ENGINE_PLAYER), action.hand, action.to_hand, game_id)
+    else:
+        swap(str(ENGINE_PLAYER), action.hand, str(action.fingers), game_id)
+    return action
+
+def get_board_event(game_id: str = DEFAULT_GAME_ID, state: Optional[GameState] = None) -> bytes:
+    """
+    Encode the current state of the board as a server-sent event.
+
+    Args:
+        game_id (str): The id of the game.
+        state (Optional[GameState]): The state just written by the model, if known.
+
+    Returns:
+        bytes: The encoded event.
+    """
+    if state is None:
+        state = REGISTRY.get(game_id).get_state()
+    player1, player2 = state.players
+    return VIEW.board_event(player1, player2, state.current_player, state.winner)
+
+def publish_board_state(game_id: str = DEFAULT_GAME_ID, state: Optional[GameState] = None) -> None:
+    """
+    Push the board state to every subscriber of the game. The event is encoded
+    once, and not at all when nobody is subscribed.
+
+    Args:
+        game_id (str): The id of the game.
+        state (Optional[GameState]): The state just written by the model, if known.
+    """
+    if EVENTS.has_subscribers(game_id):
+        EVENTS.publish(game_id, get_board_event(game_id, state))
+
+@locked
+def subscribe_events(game_id: str = DEFAULT_GAME_ID,
+                     subscription: Optional[Subscription] = None) -> Tuple[Subscription, bytes]:
+    """
+    Subscribe to board state changes of a game.
+
+    The subscription is made before the current state is read, under the game's
+    lock, so no change falls between the two.
+
+    Args:
+        game_id (str): The id of the game.
+        subscription (Optional[Subscription]): The mailbox to deliver to; a new one if omitted.
+
+    Returns:
+        Tuple[Subscription, bytes]: The subscription and an event with the current state.
+
+    Raises:
+        GameNotFoundError: If there is no game with the given id.
+    """
+    subscription = EVENTS.subscribe(game_id, subscription)
+    try:
+        return subscription, get_board_event(game_id)
+    except GameNotFoundError:
+        EVENTS.unsubscribe(game_id, subscription)
+        raise
+
+def unsubscribe_events(subscription: Subscription, game_id: str = DEFAULT_GAME_ID) -> None:
+    """
+    Stop delivering board state changes to a subscriber.
+
+    Args:
+        subscription (Subscription): The subscription returned by subscribe_events().
+        game_id (str): The id of the game.
+    """
+    EVENTS.unsubscribe(game_id, subscription)
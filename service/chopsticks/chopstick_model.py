@@ -1,39 +1,167 @@
 import logging
-from typing import Any
+from typing import Any, Callable, List
 
-from chopsticks import Player
+from chopsticks import FINGERS, GameState, Player
 from chopsticks.dao import get_dao
-
-FINGERS = 5
+from chopsticks.metrics import GAME_EVENTS, METRICS
+from chopsticks.rules import Action, advance, legal_moves
 
 
 EMPTY_HAND_ERROR_MSG = "Cannot move from an empty hand."
 SWAP_ERROR_MSG = "Cannot swap more fingers than you have."
+SWAP_COUNT_ERROR_MSG = "Fingers to swap must be between 1 and {max_fingers}."
+WRONG_PLAYER_ERROR_MSG = "It is player {current_player}'s turn."
+GAME_OVER_ERROR_MSG = "The game is over."
+CONFLICT_ERROR_MSG = "The game changed {attempts} times while updating it; try again."
+GAME_NOT_FOUND_ERROR_MSG = "Game {game_id} does not exist."
+
+MAX_UPDATE_ATTEMPTS = 32
+
+class ConcurrentUpdateError(RuntimeError):
+    """Raised when an update keeps losing compare-and-swap races."""
+
+
+class GameNotFoundError(KeyError):
+    """Raised when a game id is not present in the registry, or its store no longer holds it."""
+
+    def __init__(self, game_id: str):
+        super().__init__(game_id)
+        self.game_id = game_id
+
+    def __str__(self) -> str:
+        return GAME_NOT_FOUND_ERROR_MSG.format(game_id=self.game_id)
+
 
 class ChopstickModel:
+    """The rules of the game, on top of a DAO that holds all of its state.
+
+    Hands, turn, winner and version all live in the DAO, so several models
+    (e.g. in several worker processes) can share a game. Every change is a
+    read-modify-write: the state is read, changed in memory and written back
+    with compare-and-swap on its version, retrying if another writer got there
+    first.
 
-    def __init__(self, dao_id: str = "passthrough", *args: Any, **kwargs: Any):
+    A game deleted from a shared store by another worker reads as missing:
+    every read and update then raises GameNotFoundError.
+    """
+
+    def __init__(self, dao_id: str = "passthrough", *args: Any, new_game: bool = True, **kwargs: Any):
         """
         Initialize the ChopstickModel with a configurable DAO.
 
         Args:
             dao_id (str, optional): The identifier for the data access object to use.
                                     Defaults to "passthrough" which is a simple in-memory DAO.
+            new_game (bool, optional): Start a new game. Pass False to attach to a game
+                                       that already exists in a shared store.
             **dao_kwargs: Additional keyword arguments to pass to the DAO constructor.
         """
         self.logger = logging.getLogger(__name__)
+        self.game_id = kwargs.get("game_id", "default")
         self.dao = get_dao(dao_id, *args, **kwargs)
-        self.init_game()
+        if new_game:
+            self.init_game()
 
     def init_game(self) -> None:
         """
         Initialize the game using the DAO.
         """
-        self.players = self.dao.init()
-        self.current_player = 0
-        self.winner = -1
+        self.dao.init()
+        if METRICS.enabled:
+            GAME_EVENTS.inc("reset")
         self.logger.info("Game initialized with two players.")
 
+    def get_state(self) -> GameState:
+        """
+        Retrieve hands, turn, winner and version in one DAO call.
+
+        Returns:
+            GameState: The state of the game.
+
+        Raises:
+            GameNotFoundError: If the store no longer holds the game.
+        """
+        state = self.dao.get_state()
+        if state is None or state.version is None:
+            self.logger.warning("Game %s is gone from the store.", self.game_id)
+            raise GameNotFoundError(self.game_id)
+        return state
+
+    def update(self, transition: Callable[[GameState], None]) -> GameState:
+        """
+        Change the game with compare-and-swap.
+
+        The transition is applied to a freshly read state and the result is
+        written only if no other writer changed the game in between; otherwise
+        the transition is retried on the newer state.
+
+        Args:
+            transition (Callable[[GameState], None]): Changes the state in place. It may raise
+                                                      ValueError to reject the change; nothing
+                                                      is written then.
+
+        Returns:
+            GameState: The state as written.
+
+        Raises:
+            ConcurrentUpdateError: If the update lost MAX_UPDATE_ATTEMPTS races in a row.
+            GameNotFoundError: If the store no longer holds the game.
+        """
+        for attempt in range(MAX_UPDATE_ATTEMPTS):
+            state = self.get_state()
+            expected_version, winner = state.version, state.winner
+            transition(state)
+            if self.dao.compare_and_set(expected_version, state):
+                state.version = expected_version + 1
+                if METRICS.enabled:
+                    self._count_events(state, winner)
+                return state
+            self.logger.debug("Lost a compare-and-swap race at version %s; retrying.", expected_version)
+        self.logger.error(CONFLICT_ERROR_MSG.format(attempts=MAX_UPDATE_ATTEMPTS))
+        raise ConcurrentUpdateError(CONFLICT_ERROR_MSG.format(attempts=MAX_UPDATE_ATTEMPTS))
+
+    def _count_events(self, state: GameState, winner: int) -> None:
+        for action in state.actions:
+            GAME_EVENTS.inc(action.kind)
+        if winner == -1 and state.winner != -1:
+            GAME_EVENTS.inc("win")
+
+    def restore_state(self, board: List[Player], current_player: int, winner: int) -> None:
+        """
+        Put the game back into an earlier state.
+
+        Args:
+            board (List[Player]): The players, indexed by player ID.
+            current_player (int): The player to move.
+            winner (int): The winner (0 or 1) or -1 if no one has won.
+        """
+        def transition(state: GameState) -> None:
+            state.players = [Player(player.left, player.right) for player in board]
+            state.current_player = current_player
+            state.winner = winner
+
+        self.update(transition)
+        self.logger.info("Game state restored: %s, player %s to move, winner %s.", board, current_player, winner)
+
+    def get_version(self) -> int:
+        """
+        Retrieve the state version.
+
+        The version increases with every change to the game: a reset, a move,
+        a swap, a change of player or a winner being set. Two reads with the same
+        version see the same state.
+
+        Returns:
+            int: The state version.
+
+        Raises:
+            GameNotFoundError: If the store no longer holds the game.
+        """
+        version = self.dao.get_version()
+        if version is None:
+            raise GameNotFoundError(self.game_id)
+        return version
+
     def get_winner(self) -> int:
         """
         Retrieve the winner of the game.
@@ -41,7 +169,7 @@ class ChopstickModel:
         Returns:
             int: The index of the winner (0 or 1) or -1 if the game is not over.
         """
-        return self.winner
+        return self.get_state().winner
 
     def set_winner(self, winner: int) -> None:
         """
@@ -50,8 +178,11 @@ class ChopstickModel:
         Args:
             winner (int): The index of the winner (0 or 1).
         """
-        self.winner = winner
-        self.logger.info(f"Player {winner} has won the game.")
+        def transition(state: GameState) -> None:
+            state.winner = winner
+
+        self.update(transition)
+        self.logger.info("Player %s has won the game.", winner)
 
     def get_current_player(self) -> int:
         """
@@ -60,14 +191,17 @@ class ChopstickModel:
         Returns:
             int: The index of the current player (0 or 1).
         """
-        return self.current_player
+        return self.get_state().current_player
 
     def change_player(self) -> None:
         """
         Change the current player to the other player.
         """
-        self.current_player = (self.current_player + 1) % 2
-        self.logger.info(f"Changed current player to {self.current_player}.")
+        def transition(state: GameState) -> None:
+            state.current_player = (state.current_player + 1) % 2
+
+        state = self.update(transition)
+        self.logger.info("Changed current player to %s.", state.current_player)
 
     def get_player_hands(self, player: int) -> Player:
         """
@@ -79,13 +213,29 @@ class ChopstickModel:
         Returns:
             Player: The player corresponding to the identifier.
         """
-        self.logger.debug(f"Retrieving hands for player {player}.")
-        return self.dao.get_player(player)
+        self.logger.debug("Retrieving hands for player %s.", player)
+        hands = self.dao.get_player(player)
+        if hands is None:
+            raise GameNotFoundError(self.game_id)
+        return hands
+
+    def get_board(self) -> List[Player]:
+        """
+        Retrieve the hands of both players in one DAO call.
+
+        Returns:
+            List[Player]: The players, indexed by player ID.
+        """
+        self.logger.debug("Retrieving board.")
+        board = self.dao.get_board()
+        if not board:
+            raise GameNotFoundError(self.game_id)
+        return board
 
-    def move(self, player_id: int, hand_from: str, hand_to: str) -> None:
+    def move(self, player_id: int, hand_from: str, hand_to: str) -> GameState:
         """
         Perform a move by transferring chopsticks from one hand of the
-        current player to one hand of the opponent.
+        current player to one hand of the opponent, then pass the turn.
 
         Args:
             player_id (int): The index of the current player (0 or 1).
@@ -94,31 +244,22 @@ class ChopstickModel:
             hand_to (str): The hand of the opponent to transfer to.
                            Expected values are "left" or "right".
 
+        Returns:
+            GameState: The state after the move.
+
         Raises:
-            ValueError: If the hand_from or hand_to is empty.
+            ValueError: If the game is over, it is not the player's turn, or the hand_from is empty.
         """
-        self.logger.info(f"Player {player_id} moving from {hand_from} to {hand_to}.")
-        from_player = self.dao.get_player(player_id)
-        to_player = self.dao.get_player((player_id + 1) % 2)
+        self.logger.info("Player %s moving from %s to %s.", player_id, hand_from, hand_to)
+        state = self.update(lambda state: self.apply_move(state, player_id, hand_from, hand_to))
+        self.logger.debug("Move completed: Player %s (%s) to Player %s (%s).",
+                          player_id, hand_from, (player_id + 1) % 2, hand_to)
+        return state
 
-        if hand_from == "left":
-            if from_player.left == 0:
-                self.logger.error(EMPTY_HAND_ERROR_MSG)
-                raise ValueError(EMPTY_HAND_ERROR_MSG)
-            add = from_player.left
-        else:
-            if from_player.right == 0:
-                self.logger.error(EMPTY_HAND_ERROR_MSG)
-                raise ValueError(EMPTY_HAND_ERROR_MSG)
-            add = from_player.right
-
-        self.dao.set_player_hand((player_id + 1) % 2, hand_to, (getattr(to_player, hand_to) + add) % FINGERS)
-        self.logger.debug(f"Move completed: Player {player_id} ({hand_from}) to Player {(player_id + 1) % 2} ({hand_to}).")
-
-    def swap(self, player_id: int, starting_hand: str, fingers_to_swap: int) -> None:
+    def swap(self, player_id: int, starting_hand: str, fingers_to_swap: int) -> GameState:
         """
         Swap the given number of fingers between the two hands of the given
-        player.
+        player, then pass the turn.
 
         Args:
             player_id (int): The index of the current player (0 or 1).
@@ -126,26 +267,64 @@ class ChopstickModel:
                                  Expected values are "left" or "right".
             fingers_to_swap (int): The number of fingers to swap (1 to 4).
 
+        Returns:
+            GameState: The state after the swap.
+
+        Raises:
+            ValueError: If the game is over, it is not the player's turn, or if trying to swap more
+                        fingers than available in the starting hand.
+        """
+        self.logger.info("Player %s swapping %s fingers from %s.", player_id, fingers_to_swap, starting_hand)
+        state = self.update(lambda state: self.apply_swap(state, player_id, starting_hand, fingers_to_swap))
+        self.logger.debug("Swap completed: Player %s swapped %s fingers from %s.",
+                          player_id, fingers_to_swap, starting_hand)
+        return state
+
+    def apply_move(self, state: GameState, player_id: int, hand_from: str, hand_to: str) -> None:
+        """
+        Apply a move to a state in memory. See move().
+
         Raises:
-            ValueError: If an empty hand is involved, or if fingers_to_swap is
-                        not between 1 and 4, or if trying to swap more fingers
-                        than available in the starting hand.
-        """
-        self.logger.info(f"Player {player_id} swapping {fingers_to_swap} fingers from {starting_hand}.")
-        player = self.dao.get_player(player_id)
-        if starting_hand == "left":
-            if player.left < fingers_to_swap or \
-               player.left - fingers_to_swap < 0:
-                self.logger.error(SWAP_ERROR_MSG)
-                raise ValueError(SWAP_ERROR_MSG)
-            self.dao.set_player_hand(player_id, "left", player.left - fingers_to_swap)
-            self.dao.set_player_hand(player_id, "right", (player.right + fingers_to_swap) % FINGERS)
-        else:
-            if player.right < fingers_to_swap or \
-               player.right - fingers_to_swap < 0:
-                self.logger.error(SWAP_ERROR_MSG)
-                raise ValueError(SWAP_ERROR_MSG)
-            self.dao.set_player_hand(player_id, "right", player.right - fingers_to_swap)
-            self.dao.set_player_hand(player_id, "left", (player.left + fingers_to_swap) % FINGERS)
-
-        self.logger.debug(f"Swap completed: Player {player_id} swapped {fingers_to_swap} fingers from {starting_hand}.")
+            ValueError: If the game is over, it is not the player's turn, or the hand_from is empty.
+        """
+        self._check_turn(state, player_id)
+        self._play(state, Action("move", hand_from, to_hand=hand_to), EMPTY_HAND_ERROR_MSG)
+
+    def apply_swap(self, state: GameState, player_id: int, starting_hand: str, fingers_to_swap: int) -> None:
+        """
+        Apply a swap to a state in memory. See swap().
+
+        Raises:
+            ValueError: If the game is over, it is not the player's turn, if fewer than 1 or more than
+                        FINGERS - 1 fingers are swapped, or if trying to swap more
+                        fingers than available in the starting hand.
+        """
+        self._check_turn(state, player_id)
+        if not 1 <= fingers_to_swap < FINGERS:
+            message = SWAP_COUNT_ERROR_MSG.format(max_fingers=FINGERS - 1)
+            self.logger.error(message)
+            raise ValueError(message)
+        self._play(state, Action("swap", starting_hand, fingers=fingers_to_swap), SWAP_ERROR_MSG)
+
+    def _check_turn(self, state: GameState, player_id: int) -> None:
+        # Checked on the state being updated, so an action read before a winning move cannot follow it.
+        if state.winner != -1:
+            self.logger.error(GAME_OVER_ERROR_MSG)
+            raise ValueError(GAME_OVER_ERROR_MSG)
+        if player_id != state.current_player:
+            message = WRONG_PLAYER_ERROR_MSG.format(current_player=state.current_player + 1)
+            self.logger.error(message)
+            raise ValueError(message)
+
+    def _play(self, state: GameState, action: Action, illegal_message: str) -> None:
+        # The rules tables hold the successor of every legal action; an action without one is illegal.
+        # The turn passes, unless the opponent has no fingers left: then the mover has won.
+        player_id = state.current_player
+        successor = legal_moves(state.players, player_id).get(action)
+        if successor is None:
+            self.logger.error(illegal_message)
+            raise ValueError(illegal_message)
+        advance(state, successor)
+        state.actions.append(action)
+        if state.winner == player_id:
+            self.logger.info("Player %s has won the game.", player_id)
@@ -1,8 +1,11 @@
+from itertools import product
+import json
 import logging
+from typing import Any, Dict, List, Optional, Tuple
 
-from flask import make_response, jsonify
+from flask import current_app, make_response, jsonify
 
-from . import Player
+from . import FINGERS, GameState, Player
 
 
 class ChopstickView:
@@ -22,16 +25,58 @@ class ChopstickView:
         Returns:
             Response: A Flask response object containing the move result.
         """
-        response_data = {
+        response_data = self._board_data(player1, player2, winner)
+        self.logger.info("Move result returned: %s", response_data)
+        return make_response(jsonify(response_data), 200)
+
+    def _hands_data(self, player1: Player, player2: Player) -> Dict[str, int]:
+        return {
             "player1_left": player1.left,
             "player1_right": player1.right,
             "player2_left": player2.left,
             "player2_right": player2.right,
-            "winner": winner
         }
-        self.logger.info(f"Move result returned: {response_data}")
+
+    def _board_data(self, player1: Player, player2: Player, winner: int) -> Dict[str, int]:
+        return {**self._hands_data(player1, player2), "winner": winner}
+
+    def _game_data(self, player1: Player, player2: Player, current_player: int, winner: int) -> Dict[str, int]:
+        return {**self._hands_data(player1, player2), "player": current_player, "winner": winner}
+
+    def game_state(self, player1: Player, player2: Player, current_player: int, winner: int):
+        """
+        Create a response for the whole game state: both boards, the turn and the winner.
+
+        Args:
+            player1 (Player): The first player.
+            player2 (Player): The second player.
+            current_player (int): The player to move.
+            winner (int): The winner of the game.
+
+        Returns:
+            Response: A Flask response object containing the game state.
+        """
+        response_data = self._game_data(player1, player2, current_player, winner)
+        self.logger.info("Game state returned: %s", response_data)
         return make_response(jsonify(response_data), 200)
 
+    def board_event(self, player1: Player, player2: Player, current_player: int, winner: int) -> bytes:
+        """
+        Encode a board state change as a server-sent event.
+
+        Args:
+            player1 (Player): The first player.
+            player2 (Player): The second player.
+            current_player (int): The player to move.
+            winner (int): The winner of the game.
+
+        Returns:
+            bytes: The encoded event, ready to be written to every subscriber.
+        """
+        event_data = self._game_data(player1, player2, current_player, winner)
+        self.logger.debug("Board event encoded: %s", event_data)
+        return f"event: board_state\ndata: {json.dumps(event_data)}\n\n".encode()
+
     def get_player(self, player: int):
         """
         Create a response for getting the current player.
@@ -45,7 +90,7 @@ class ChopstickView:
         response_data = {
             "player": player
         }
-        self.logger.info(f"Get player returned: {response_data}")
+        self.logger.info("Get player returned: %s", response_data)
         return make_response(jsonify(response_data), 200)
 
     def get_hand(self, player: Player, hand: str):
@@ -62,7 +107,50 @@ class ChopstickView:
         response_data = {
             "hand": getattr(player, hand)
         }
-        self.logger.info(f"Get hand returned: {response_data}")
+        self.logger.info("Get hand returned: %s", response_data)
+        return make_response(jsonify(response_data), 200)
+
+    def best_move(self, action: Optional[Dict[str, Any]], outcome: str, distance: int):
+        """
+        Create a response for the best move in the current position.
+
+        Args:
+            action (Optional[Dict[str, Any]]): The best action, or None if there is none.
+            outcome (str): "win", "loss" or "draw" for the player to move.
+            distance (int): Plies to the end of the game with perfect play, -1 for a draw.
+
+        Returns:
+            Response: A Flask response object containing the best move.
+        """
+        response_data = {
+            "best_move": action,
+            "outcome": outcome,
+            "distance": distance
+        }
+        self.logger.info("Best move returned: %s", response_data)
+        return make_response(jsonify(response_data), 200)
+
+    def legal_moves(self, current_player: int, winner: int, options: List[Tuple[Dict[str, Any], GameState]]):
+        """
+        Create a response for the legal actions of the player to move.
+
+        Args:
+            current_player (int): The player to move.
+            winner (int): The winner of the game.
+            options (List[Tuple[Dict[str, Any], GameState]]): Each legal action with the state it leads to.
+
+        Returns:
+            Response: A Flask response object containing the legal actions and their results.
+        """
+        response_data = {
+            "player": current_player,
+            "winner": winner,
+            "legal_moves": [
+                {**action, "result": self._game_data(*result.players, result.current_player, result.winner)}
+                for action, result in options
+            ]
+        }
+        self.logger.info("Legal moves returned: %s", response_data)
         return make_response(jsonify(response_data), 200)
 
     def error(self, message: str):
@@ -79,5 +167,120 @@ class ChopstickView:
         response_data = {
             "error": message
         }
-        self.logger.info(f"Error returned: {message}")
+        self.logger.info("Error returned: %s", message)
         return make_response(jsonify(response_data), 400)
+
+    def not_found(self, message: str):
+        """
+        Create a not found response.
+
+        Args:
+            message (str): The error message.
+
+        Returns:
+            Response: A Flask response object containing the error message.
+        """
+        response_data = {
+            "error": message
+        }
+        self.logger.info("Not found returned: %s", message)
+        return make_response(jsonify(response_data), 404)
+
+    def conflict(self, message: str):
+        """
+        Create a conflict response, for updates that lost too many races.
+
+        Args:
+            message (str): The error message.
+
+        Returns:
+            Response: A Flask response object containing the error message.
+        """
+        response_data = {
+            "error": message
+        }
+        self.logger.info("Conflict returned: %s", message)
+        return make_response(jsonify(response_data), 409)
+
+
+class PrecomputedView(ChopstickView):
+    """A view serving the game responses as bodies encoded once, up front.
+
+    There are only FINGERS^4 x 3 boards with a winner, twice as many game
+    states and a handful of player and hand answers, so their JSON bodies are
+    all encoded on the first request, by the app's JSON provider as jsonify()
+    would (compact, or indented in debug mode), and each request after that
+    only wraps the prepared bytes in a response. Values outside those ranges
+    fall back to building the body as ChopstickView does.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.board_bodies: Dict[Tuple[int, ...], bytes] = {}
+        self.game_bodies: Dict[Tuple[int, ...], bytes] = {}
+        self.player_bodies: Dict[int, bytes] = {}
+        self.hand_bodies: Dict[int, bytes] = {}
+        self.encoded = False
+
+    def _encode_bodies(self) -> None:
+        # Runs in the first request's app context; concurrent first requests encode the same bodies.
+        def encode(data: Dict[str, int]) -> bytes:
+            return current_app.json.response(data).get_data()
+
+        boards = [(Player(left1, right1), Player(left2, right2))
+                  for left1, right1, left2, right2 in product(range(FINGERS), repeat=4)]
+        self.board_bodies = {
+            (player1.left, player1.right, player2.left, player2.right, winner):
+                encode(self._board_data(player1, player2, winner))
+            for player1, player2 in boards for winner in (-1, 0, 1)}
+        self.game_bodies = {
+            (player1.left, player1.right, player2.left, player2.right, current_player, winner):
+                encode(self._game_data(player1, player2, current_player, winner))
+            for player1, player2 in boards for current_player in (0, 1) for winner in (-1, 0, 1)}
+        self.player_bodies = {player: encode({"player": player}) for player in (0, 1)}
+        self.hand_bodies = {fingers: encode({"hand": fingers}) for fingers in range(FINGERS)}
+        self.encoded = True
+
+    def _respond(self, message: str, body: bytes):
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(message, body.decode().rstrip())
+        return current_app.response_class(body, mimetype="application/json")
+
+    def board_state(self, player1: Player, player2: Player, winner: int = 1):
+        if not self.encoded:
+            self._encode_bodies()
+        body = self.board_bodies.get((player1.left, player1.right, player2.left, player2.right, winner))
+        if body is None:
+            return super().board_state(player1, player2, winner)
+        return self._respond("Move result returned: %s", body)
+
+    def game_state(self, player1: Player, player2: Player, current_player: int, winner: int):
+        if not self.encoded:
+            self._encode_bodies()
+        key = (player1.left, player1.right, player2.left, player2.right, current_player, winner)
+        body = self.game_bodies.get(key)
+        if body is None:
+            return super().game_state(player1, player2, current_player, winner)
+        return self._respond("Game state returned: %s", body)
+
+    def get_player(self, player: int):
+        if not self.encoded:
+            self._encode_bodies()
+        body = self.player_bodies.get(player)
+        if body is None:
+            return super().get_player(player)
+        return self._respond("Get player returned: %s", body)
+
+    def get_hand(self, player: Player, hand: str):
+        if not self.encoded:
+            self._encode_bodies()
+        body = self.hand_bodies.get(getattr(player, hand))
+        if body is None:
+            return super().get_hand(player, hand)
+        return self._respond("Get hand returned: %s", body)
+
+
+VIEWS = {
+    "dynamic": ChopstickView,
+    "precomputed": PrecomputedView,
+}
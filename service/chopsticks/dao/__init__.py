@@ -1,14 +1,24 @@
 from typing import Any
 
 from chopsticks.dao.abstract_dao import AbstractDAO
+from chopsticks.dao.caching_dao import CachingDAO
+from chopsticks.dao.event_log_dao import EventLogDAO
+from chopsticks.dao.packed_sqlite_dao import PackedSQLiteDAO
 from chopsticks.dao.passthrough_dao import PassthroughDAO
 from chopsticks.dao.sqlite_dao import SQLiteDAO
+from chopsticks.metrics import instrument_dao
 
 DAO = {
     "passthrough": PassthroughDAO,
-    "sqlite": SQLiteDAO
+    "sqlite": SQLiteDAO,
+    "sqlite_packed": PackedSQLiteDAO,
+    "caching": CachingDAO,
+    "sqlite_log": EventLogDAO
 }
 
+for dao_class in DAO.values():
+    instrument_dao(dao_class)
+
 def get_dao(dao_name: str, *args: Any, **kwargs: Any) -> AbstractDAO:
     dao_class = DAO.get(dao_name, PassthroughDAO)
     return dao_class(*args, **kwargs)
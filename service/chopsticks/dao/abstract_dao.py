@@ -1,10 +1,16 @@
-from typing import Any
+from typing import Any, Iterable, List, Optional, Tuple
 from abc import ABC, abstractmethod
 
-from chopsticks import Player
+from chopsticks import GameState, Player
 
 class AbstractDAO(ABC):
 
+    # No instance dict of its own, so that subclasses may keep their state in slots.
+    __slots__ = ()
+
+    # Whether the game lives outside the process, where other workers can see it.
+    shared = False
+
     @abstractmethod
     def init(self, *args: Any, **kwargs: Any):
         """Initialize the data store."""
@@ -25,3 +31,78 @@ class AbstractDAO(ABC):
             fingers (int): Number of fingers to set (0 to 4)
         """
         raise NotImplementedError
+
+    @abstractmethod
+    def get_board(self) -> List[Player]:
+        """Retrieve the hands of both players in one call.
+
+        Returns:
+            List[Player]: The players, indexed by player ID.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_hands(self, updates: Iterable[Tuple[int, str, int]]) -> None:
+        """Apply several hand updates atomically: either all of them are stored or none are.
+
+        Args:
+            updates (Iterable[Tuple[int, str, int]]): (player, hand, fingers) triples, applied in order.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_state(self) -> Optional[GameState]:
+        """Retrieve the whole game in one consistent read.
+
+        Returns:
+            Optional[GameState]: The hands, turn, winner and version, or None if the game does not exist.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def compare_and_set(self, expected_version: int, state: GameState) -> bool:
+        """Store the hands, turn and winner of state if the game is still at expected_version.
+
+        On success the stored version becomes expected_version + 1; on a conflict
+        nothing is written.
+
+        Args:
+            expected_version (int): The version the state was read at.
+            state (GameState): The new state; its version is ignored.
+
+        Returns:
+            bool: Whether the state was stored.
+        """
+        raise NotImplementedError
+
+    def get_version(self) -> int:
+        """Retrieve the state version alone.
+
+        Stores that can read it more cheaply than the whole state should override this.
+        """
+        return self.get_state().version
+
+    def load(self, state: GameState) -> None:
+        """Store a whole game saved earlier, e.g. by the registry when it evicted the game.
+
+        Stores that can set the version directly should override this to keep
+        it; this default writes the state as the next version of the game.
+
+        Args:
+            state (GameState): The game to restore.
+        """
+        self.compare_and_set(self.get_version(), state)
+
+    def release(self) -> None:
+        """Write out anything only held in this process, before the DAO is dropped.
+
+        Called when the registry evicts an idle game. Stores that hold no
+        pending writes do not need to override this.
+        """
+
+    def delete_game(self) -> None:
+        """Remove the game's data from the store.
+
+        Called when a game is torn down. Stores that hold nothing outside the
+        process do not need to override this.
+        """
@@ -0,0 +1,306 @@
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from chopsticks import GameState, Player
+from chopsticks.dao.abstract_dao import AbstractDAO
+
+DEFAULT_BACKEND = "sqlite"
+DEFAULT_FLUSH_INTERVAL = 0.1
+DEFAULT_MAX_UNFLUSHED = 100
+
+INVALID_HAND_ERROR_MSG = "Hand must be 'left' or 'right'"
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindFlusher:
+    """Background thread that writes dirty caching DAOs back to their backends.
+
+    Every flush_interval seconds each dirty DAO is flushed once, with only its
+    latest state, so any number of writes to a game between two ticks cost one
+    backend commit.
+
+    Attributes:
+        flush_interval (float): Seconds between flushes.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self.dirty: Set["CachingDAO"] = set()
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name="chopsticks-flusher", daemon=True)
+        self.thread.start()
+
+    def mark_dirty(self, dao: "CachingDAO") -> None:
+        """Schedule a DAO for the next flush."""
+        with self.condition:
+            self.dirty.add(dao)
+
+    def discard(self, dao: "CachingDAO") -> None:
+        """Forget a DAO, e.g. after its game was deleted."""
+        with self.condition:
+            self.dirty.discard(dao)
+
+    def flush(self) -> int:
+        """
+        Flush every dirty DAO now.
+
+        Returns:
+            int: The number of DAOs flushed.
+        """
+        with self.condition:
+            dirty, self.dirty = self.dirty, set()
+        for dao in dirty:
+            dao.flush()
+        return len(dirty)
+
+    def _run(self) -> None:
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.stopped, timeout=self.flush_interval)
+                stopped = self.stopped
+            self.flush()
+            if stopped:
+                return
+
+    def stop(self) -> None:
+        """Flush whatever is pending and stop the thread."""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+
+
+_FLUSHERS: Dict[float, WriteBehindFlusher] = {}
+_FLUSHERS_LOCK = threading.Lock()
+
+
+def get_flusher(flush_interval: float = DEFAULT_FLUSH_INTERVAL) -> WriteBehindFlusher:
+    """Return the shared flusher for a flush interval, starting it on first use.
+
+    Args:
+        flush_interval (float): Seconds between flushes.
+
+    Returns:
+        WriteBehindFlusher: The flusher shared by every caching DAO with this interval.
+    """
+    with _FLUSHERS_LOCK:
+        flusher = _FLUSHERS.get(flush_interval)
+        if flusher is None:
+            flusher = WriteBehindFlusher(flush_interval)
+            _FLUSHERS[flush_interval] = flusher
+        return flusher
+
+
+def close_flushers() -> None:
+    """Flush every caching DAO and stop the flusher threads. Runs at interpreter exit."""
+    with _FLUSHERS_LOCK:
+        flushers = list(_FLUSHERS.values())
+        _FLUSHERS.clear()
+    for flusher in flushers:
+        flusher.stop()
+    if flushers:
+        logger.info("Stopped %s write-behind flushers.", len(flushers))
+
+
+atexit.register(close_flushers)
+
+
+class CachingDAO(AbstractDAO):
+    """Write-behind cache in front of another DAO.
+
+    Reads are served from memory. Writes change the in-memory state at once and
+    are written to the backend later, coalesced: a background flusher stores the
+    latest state of every changed game each flush_interval seconds. A writer
+    that finds max_unflushed writes pending flushes inline, so a crash loses at
+    most flush_interval seconds or max_unflushed writes of a game. Everything
+    pending is flushed at interpreter exit (see close_flushers()).
+
+    Resets and deletions are written through, as are the first reads of a game.
+
+    The cache is the game's authority while the process runs, so a caching DAO
+    cannot be shared between worker processes even if its backend can.
+
+    Attributes:
+        backend (AbstractDAO): The DAO the state is written back to.
+        flusher (WriteBehindFlusher): The flusher that writes this DAO back.
+        max_unflushed (int): Pending writes that trigger an inline flush.
+    """
+
+    def __init__(self, *args: Any, caching_backend: str = DEFAULT_BACKEND,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_unflushed: int = DEFAULT_MAX_UNFLUSHED,
+                 **kwargs: Any):
+        """Initialize the cache and its backend.
+
+        Args:
+            caching_backend (str): Identifier of the backing DAO. Defaults to 'sqlite'.
+            flush_interval (float): Seconds between background flushes.
+            max_unflushed (int): Pending writes that trigger an inline flush.
+            **kwargs: Arguments for the backing DAO.
+        """
+        from chopsticks.dao import get_dao
+
+        self.logger = logging.getLogger(__name__)
+        self.backend = get_dao(caching_backend, *args, **kwargs)
+        self.flusher = get_flusher(flush_interval)
+        self.max_unflushed = max_unflushed
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.state: Optional[GameState] = None
+        self.backend_version: Optional[int] = None
+        self.unflushed = 0
+        self._load()
+        self.logger.debug("CachingDAO initialized over %s, flush interval %ss, at most %s unflushed writes.",
+                          type(self.backend).__name__, flush_interval, max_unflushed)
+
+    def _load(self) -> None:
+        state = self.backend.get_state()
+        with self.lock:
+            self.state = state
+            self.backend_version = state.version if state is not None else None
+            self.unflushed = 0
+
+    def init(self, *args: Any, **kwargs: Any):
+        """Reset the game in the backend, dropping pending writes, and cache the new state."""
+        with self.flush_lock:
+            self.flusher.discard(self)
+            self.backend.init(*args, **kwargs)
+            self._load()
+        self.logger.debug("Game reset and cached.")
+
+    def get_player(self, player: int) -> Player:
+        """Retrieve player hands from memory."""
+        with self.lock:
+            if self.state is None:
+                return None
+            hands = self.state.players[player]
+            return Player(hands.left, hands.right)
+
+    def get_board(self) -> List[Player]:
+        """Retrieve the hands of both players from memory."""
+        state = self.get_state()
+        return state.players if state is not None else None
+
+    def get_state(self) -> Optional[GameState]:
+        """Retrieve a copy of the whole game from memory."""
+        with self.lock:
+            if self.state is None:
+                return None
+            return GameState([Player(player.left, player.right) for player in self.state.players],
+                             self.state.current_player, self.state.winner, self.state.version)
+
+    def get_version(self) -> int:
+        """Retrieve the state version from memory."""
+        with self.lock:
+            return self.state.version if self.state is not None else None
+
+    def set_player_hand(self, player: int, hand: str, fingers: int) -> None:
+        """Set a player's hand in memory; it is written back later.
+
+        Raises:
+            ValueError: If the 'hand' parameter is not 'left' or 'right'.
+        """
+        self.set_hands([(player, hand, fingers)])
+
+    def set_hands(self, updates: Iterable[Tuple[int, str, int]]) -> None:
+        """Apply several hand updates atomically in memory; they are written back later.
+
+        Args:
+            updates (Iterable[Tuple[int, str, int]]): (player, hand, fingers) triples, applied in order.
+
+        Raises:
+            ValueError: If any hand is not 'left' or 'right'. Nothing is applied in that case.
+        """
+        updates = list(updates)
+        if any(hand not in ['left', 'right'] for _, hand, _ in updates):
+            self.logger.error("Invalid hand specified. Hand must be 'left' or 'right'.")
+            raise ValueError(INVALID_HAND_ERROR_MSG)
+        with self.lock:
+            for player, hand, fingers in updates:
+                setattr(self.state.players[player], hand, fingers)
+            self.state.version += 1
+            self.unflushed += 1
+            unflushed = self.unflushed
+        self._written(unflushed)
+
+    def compare_and_set(self, expected_version: int, state: GameState) -> bool:
+        """Store the state in memory if the game is still at expected_version; it is written back later.
+
+        Args:
+            expected_version (int): The version the state was read at.
+            state (GameState): The new state; its version is ignored.
+
+        Returns:
+            bool: Whether the state was stored.
+        """
+        with self.lock:
+            if self.state is None or self.state.version != expected_version:
+                return False
+            self.state = GameState([Player(player.left, player.right) for player in state.players],
+                                   state.current_player, state.winner, expected_version + 1)
+            self.unflushed += 1
+            unflushed = self.unflushed
+        self._written(unflushed)
+        return True
+
+    def _written(self, unflushed: int) -> None:
+        if unflushed >= self.max_unflushed:
+            self.flush()
+        else:
+            self.flusher.mark_dirty(self)
+
+    def flush(self) -> bool:
+        """
+        Write the latest state back to the backend, if anything changed since the last flush.
+
+        Returns:
+            bool: Whether anything was written.
+        """
+        with self.flush_lock:
+            with self.lock:
+                if self.state is None or self.unflushed == 0:
+                    return False
+                state = GameState([Player(player.left, player.right) for player in self.state.players],
+                                  self.state.current_player, self.state.winner, self.state.version)
+                unflushed, self.unflushed = self.unflushed, 0
+            try:
+                if not self.backend.compare_and_set(self.backend_version, state):
+                    # Someone else wrote the backend; the cache is the authority, so overwrite.
+                    self.logger.warning("Backend changed behind the cache; overwriting it.")
+                    self.backend_version = self.backend.get_version()
+                    if not self.backend.compare_and_set(self.backend_version, state):
+                        raise RuntimeError("Backend keeps changing behind the cache.")
+            except Exception:
+                with self.lock:
+                    self.unflushed += unflushed
+                self.flusher.mark_dirty(self)
+                self.logger.exception("Flush failed; will retry.")
+                return False
+            self.backend_version += 1
+        self.logger.debug("Flushed %s writes as version %s.", unflushed, state.version)
+        return True
+
+    def release(self) -> None:
+        """Write pending changes back before the DAO is dropped.
+
+        A failed flush marks the DAO dirty again, so the flusher keeps it and retries.
+        """
+        self.flusher.discard(self)
+        self.flush()
+
+    def delete_game(self) -> None:
+        """Remove the game from the backend.
+
+        Pending writes are flushed first, so that the backend records the game's
+        last version and a game created again under its id continues from it.
+        """
+        self.flush()
+        with self.flush_lock:
+            self.flusher.discard(self)
+            with self.lock:
+                self.state = None
+                self.unflushed = 0
+            self.backend.delete_game()
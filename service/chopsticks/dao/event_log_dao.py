@@ -0,0 +1,286 @@
+import logging
+import sqlite3
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from chopsticks import GameState, Player
+from chopsticks.dao.abstract_dao import AbstractDAO
+from chopsticks.dao.sqlite_pool import get_pool
+from chopsticks.packed_state import pack, unpack
+from chopsticks.rules import action_codes, actions, play
+
+DEFAULT_SNAPSHOT_INTERVAL = 64
+
+
+class EventLogDAO(AbstractDAO):
+    """Data access object keeping each game as an append-only log in an SQLite database.
+
+    Every write appends one row to game_events, keyed by (game_id, version).
+    A row holds either the moves and swaps that were played, as indexes into
+    chopsticks.rules.actions(), or, for any other change (a reset, a restore,
+    a hand set by hand), the whole packed state. Nothing is ever updated in
+    place, so the log is the full history of the game.
+
+    Every snapshot_interval versions, and on every reset, the packed state is
+    also written to game_snapshots. Loading a game restores the latest snapshot
+    and replays only the events after it; see replay().
+
+    compare_and_set() is a single INSERT: it only succeeds if the event at
+    expected_version exists and the one after it does not, so the primary key
+    does the version check and several worker processes can share a game.
+
+    Attributes:
+        db_path (str): The file path to the SQLite database.
+        game_id (str): The id of the game this DAO manages.
+        pool (SQLiteConnectionPool): The connection pool for db_path.
+        snapshot_interval (int): Versions between two snapshots.
+    """
+
+    shared = True
+
+    def __init__(self, sqlite_db_path: str = "chopsticks.db", game_id: str = "default",
+                 sqlite_pragma_profile: str = "default", snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL):
+        """Initialize the EventLogDAO with the path to the SQLite database file.
+
+        Args:
+            sqlite_db_path (str): Path to the database file. Defaults to 'chopsticks.db'.
+            game_id (str): Id of the game whose log this DAO reads and appends to. Defaults to 'default'.
+            sqlite_pragma_profile (str): PRAGMA profile for pooled connections. Defaults to 'default'.
+            snapshot_interval (int): Versions between two snapshots. Defaults to 64.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_path = sqlite_db_path
+        self.game_id = game_id
+        self.pool = get_pool(sqlite_db_path, sqlite_pragma_profile)
+        self.snapshot_interval = snapshot_interval
+        self.logger.debug("EventLogDAO initialized with database path: %s, game: %s, snapshot every %s versions",
+                          sqlite_db_path, game_id, snapshot_interval)
+
+    def init(self):
+        """Creates the tables if needed and appends a reset to the game's log, with a snapshot.
+
+        The history of an existing game is kept and its version keeps increasing; a
+        game created again after delete_game() continues from its last version.
+        """
+        self.logger.info("Initializing the database...")
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''CREATE TABLE IF NOT EXISTS game_events (
+                              game_id TEXT NOT NULL,
+                              version INTEGER NOT NULL,
+                              actions BLOB,
+                              state INTEGER,
+                              PRIMARY KEY (game_id, version))''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS game_snapshots (
+                              game_id TEXT NOT NULL,
+                              version INTEGER NOT NULL,
+                              state INTEGER NOT NULL,
+                              PRIMARY KEY (game_id, version))''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS game_tombstones (
+                              game_id TEXT PRIMARY KEY,
+                              version INTEGER NOT NULL)''')
+            cursor.execute('''INSERT INTO game_events (game_id, version, actions, state)
+                              SELECT ?, MAX(COALESCE(MAX(version), 0),
+                                            COALESCE((SELECT version FROM game_tombstones WHERE game_id = ?), 0)) + 1,
+                                     NULL, ? FROM game_events WHERE game_id = ?''',
+                           (self.game_id, self.game_id, pack([Player(1, 1), Player(1, 1)]), self.game_id))
+            cursor.execute('''INSERT OR REPLACE INTO game_snapshots (game_id, version, state)
+                              SELECT game_id, version, state FROM game_events WHERE rowid = ?''', (cursor.lastrowid,))
+            cursor.execute('DELETE FROM game_tombstones WHERE game_id = ?', (self.game_id,))
+            conn.commit()
+            self.logger.info("Database initialization complete.")
+
+    def replay(self, from_snapshot: bool = True) -> Iterator[GameState]:
+        """Rebuilds the game event by event, yielding the state after each one.
+
+        Events are read from a cursor as they are applied, within one read
+        transaction, so replaying a long game never holds its history in memory.
+        The same GameState object is yielded every time and changed in place by
+        the next event; copy it to keep it.
+
+        Args:
+            from_snapshot (bool): Start from the latest snapshot, yielding it first, and
+                                  replay only the events after it. Pass False to replay
+                                  the whole log.
+
+        Yields:
+            GameState: The state after each event, oldest first.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            # One read transaction, so the snapshot and the events after it agree.
+            cursor.execute('BEGIN')
+            try:
+                state, after = None, 0
+                if from_snapshot:
+                    cursor.execute('''SELECT version, state FROM game_snapshots WHERE game_id = ?
+                                      ORDER BY version DESC LIMIT 1''', (self.game_id,))
+                    row = cursor.fetchone()
+                    if row is not None:
+                        after = row[0]
+                        players, current_player, winner = unpack(row[1])
+                        state = GameState(players, current_player, winner, after)
+                        yield state
+                cursor.execute('''SELECT version, actions, state FROM game_events
+                                  WHERE game_id = ? AND version > ? ORDER BY version''', (self.game_id, after))
+                for version, codes, packed in cursor:
+                    if packed is not None:
+                        players, current_player, winner = unpack(packed)
+                        if state is None:
+                            state = GameState(players, current_player, winner)
+                        else:
+                            state.players, state.current_player, state.winner = players, current_player, winner
+                    else:
+                        played = actions()
+                        for code in codes:
+                            play(state, played[code])
+                    state.version = version
+                    yield state
+            except sqlite3.OperationalError as e:
+                # A database that no worker has initialized yet holds no games.
+                if "no such table" not in str(e):
+                    raise
+            finally:
+                conn.rollback()
+
+    def get_state(self) -> Optional[GameState]:
+        """Loads the game from its latest snapshot and the events after it.
+
+        Returns:
+            Optional[GameState]: The game, or None if it does not exist.
+        """
+        state = None
+        for state in self.replay():
+            pass
+        if state is None:
+            self.logger.warning("No data found for game %s.", self.game_id)
+        return state
+
+    def get_player(self, player: int) -> Player:
+        """Retrieves a player's hands.
+
+        Args:
+            player (int): The player ID to retrieve data for.
+
+        Returns:
+            Player: A Player object with the hand data or None if the game does not exist.
+        """
+        board = self.get_board()
+        return board[player] if board else None
+
+    def get_board(self) -> List[Player]:
+        """Retrieves both players' hands.
+
+        Returns:
+            List[Player]: The players, indexed by player ID, or None if the game does not exist.
+        """
+        state = self.get_state()
+        return state.players if state is not None else None
+
+    def set_player_hand(self, player: int, hand: str, fingers: int):
+        """Appends a change of one hand to the log.
+
+        Args:
+            player (int): The player ID.
+            hand (str): Which hand to update ('left' or 'right').
+            fingers (int): The number of fingers to set for the specified hand.
+
+        Raises:
+            ValueError: If the 'hand' parameter is not 'left' or 'right'.
+        """
+        self.set_hands([(player, hand, fingers)])
+
+    def set_hands(self, updates: Iterable[Tuple[int, str, int]]):
+        """Appends several hand updates to the log as one event.
+
+        Args:
+            updates (Iterable[Tuple[int, str, int]]): (player, hand, fingers) triples, applied in order.
+
+        Raises:
+            ValueError: If any hand is not 'left' or 'right'. Nothing is written in that case.
+            ConcurrentUpdateError: If the append lost MAX_UPDATE_ATTEMPTS races in a row.
+        """
+        from chopsticks.chopstick_model import CONFLICT_ERROR_MSG, MAX_UPDATE_ATTEMPTS, ConcurrentUpdateError
+
+        updates = list(updates)
+        self.logger.debug("Applying hand updates %s.", updates)
+        if any(hand not in ['left', 'right'] for _, hand, _ in updates):
+            self.logger.error("Invalid hand specified. Hand must be 'left' or 'right'.")
+            raise ValueError("Hand must be 'left' or 'right'")
+
+        for attempt in range(MAX_UPDATE_ATTEMPTS):
+            state = self.get_state()
+            if state is None:
+                return
+            for player, hand, fingers in updates:
+                setattr(state.players[player], hand, fingers)
+            if self.compare_and_set(state.version, state):
+                self.logger.info("Hand updates %s committed.", updates)
+                return
+            self.logger.debug("Lost a race to append at version %s; retrying.", state.version)
+        self.logger.error(CONFLICT_ERROR_MSG.format(attempts=MAX_UPDATE_ATTEMPTS))
+        raise ConcurrentUpdateError(CONFLICT_ERROR_MSG.format(attempts=MAX_UPDATE_ATTEMPTS))
+
+    def _event(self, state: GameState) -> Tuple[Optional[bytes], Optional[int]]:
+        # The actions played on the state if they can all be encoded, else the whole state.
+        codes = action_codes()
+        if state.actions and all(action in codes for action in state.actions):
+            return bytes(codes[action] for action in state.actions), None
+        return None, pack(state.players, state.current_player, state.winner)
+
+    def compare_and_set(self, expected_version: int, state: GameState) -> bool:
+        """Appends the state's actions, or the state itself, as the event after expected_version.
+
+        Args:
+            expected_version (int): The version the state was read at.
+            state (GameState): The new state; its version is ignored.
+
+        Returns:
+            bool: Whether the event was appended.
+        """
+        version = expected_version + 1
+        codes, packed = self._event(state)
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute('''INSERT INTO game_events (game_id, version, actions, state)
+                                  SELECT ?, ?, ?, ? WHERE EXISTS
+                                  (SELECT 1 FROM game_events WHERE game_id = ? AND version = ?)''',
+                               (self.game_id, version, codes, packed, self.game_id, expected_version))
+                appended = cursor.rowcount == 1
+            except sqlite3.IntegrityError:
+                # Another writer already appended the event after expected_version.
+                appended = False
+            if not appended:
+                conn.rollback()
+                self.logger.debug("Version conflict on game %s: expected %s.", self.game_id, expected_version)
+                return False
+            if version % self.snapshot_interval == 0:
+                cursor.execute('INSERT OR REPLACE INTO game_snapshots (game_id, version, state) VALUES (?, ?, ?)',
+                               (self.game_id, version, pack(state.players, state.current_player, state.winner)))
+                self.logger.debug("Snapshot of game %s taken at version %s.", self.game_id, version)
+            conn.commit()
+        self.logger.info("Event %s of game %s appended.", version, self.game_id)
+        return True
+
+    def get_version(self) -> int:
+        """Retrieves the version of the last event with a primary key lookup."""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT MAX(version) FROM game_events WHERE game_id = ?', (self.game_id,))
+            return cursor.fetchone()[0]
+
+    def delete_game(self):
+        """Deletes this game's log and snapshots from the database, keeping its last version in game_tombstones."""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''CREATE TABLE IF NOT EXISTS game_tombstones (
+                              game_id TEXT PRIMARY KEY,
+                              version INTEGER NOT NULL)''')
+            cursor.execute('''INSERT INTO game_tombstones (game_id, version)
+                              SELECT game_id, MAX(version) FROM game_events WHERE game_id = ? GROUP BY game_id
+                              ON CONFLICT (game_id) DO UPDATE SET version = MAX(version, excluded.version)''',
+                           (self.game_id,))
+            cursor.execute('DELETE FROM game_events WHERE game_id = ?', (self.game_id,))
+            cursor.execute('DELETE FROM game_snapshots WHERE game_id = ?', (self.game_id,))
+            conn.commit()
+            self.logger.info("Game %s deleted.", self.game_id)
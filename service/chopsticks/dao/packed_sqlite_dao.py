@@ -0,0 +1,204 @@
+import logging
+import sqlite3
+from typing import Iterable, List, Optional, Tuple
+
+from chopsticks import FINGERS, GameState, Player
+from chopsticks.dao.abstract_dao import AbstractDAO
+from chopsticks.dao.sqlite_pool import get_pool
+from chopsticks.packed_state import hand_weight, pack, unpack
+
+
+class PackedSQLiteDAO(AbstractDAO):
+    """Data access object storing each game as one packed integer in an SQLite database.
+
+    Every game is a single row of the packed_games table whose state column holds
+    the whole game as produced by chopsticks.packed_state.pack, so a board read is
+    one single-column lookup. Hand updates are applied in SQL arithmetic on that
+    column, so they need no read beforehand. A version column next to it makes
+    compare_and_set() a single conditional UPDATE.
+
+    Attributes:
+        db_path (str): The file path to the SQLite database.
+        game_id (str): The id of the game this DAO manages.
+        pool (SQLiteConnectionPool): The connection pool for db_path.
+    """
+
+    shared = True
+
+    def __init__(self, sqlite_db_path: str = "chopsticks.db", game_id: str = "default",
+                 sqlite_pragma_profile: str = "default"):
+        """Initialize the PackedSQLiteDAO with the path to the SQLite database file.
+
+        Args:
+            sqlite_db_path (str): Path to the database file. Defaults to 'chopsticks.db'.
+            game_id (str): Id of the game whose row this DAO reads and writes. Defaults to 'default'.
+            sqlite_pragma_profile (str): PRAGMA profile for pooled connections. Defaults to 'default'.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_path = sqlite_db_path
+        self.game_id = game_id
+        self.pool = get_pool(sqlite_db_path, sqlite_pragma_profile)
+        self.logger.debug("PackedSQLiteDAO initialized with database path: %s, game: %s", sqlite_db_path, game_id)
+
+    def init(self):
+        """Creates the packed_games table if needed and stores the initial state of the game.
+
+        The state version of an existing game keeps increasing across resets, and
+        a game created again after delete_game() continues from its last version.
+        """
+        self.logger.info("Initializing the database...")
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''CREATE TABLE IF NOT EXISTS packed_games (
+                              game_id TEXT PRIMARY KEY,
+                              state INTEGER NOT NULL,
+                              version INTEGER NOT NULL)''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS game_tombstones (
+                              game_id TEXT PRIMARY KEY,
+                              version INTEGER NOT NULL)''')
+            cursor.execute('''INSERT INTO packed_games (game_id, state, version) VALUES (?, ?,
+                              COALESCE((SELECT version FROM game_tombstones WHERE game_id = ?), 0) + 1)
+                              ON CONFLICT (game_id) DO UPDATE SET state = excluded.state, version = version + 1''',
+                           (self.game_id, pack([Player(1, 1), Player(1, 1)]), self.game_id))
+            cursor.execute('DELETE FROM game_tombstones WHERE game_id = ?', (self.game_id,))
+            conn.commit()
+            self.logger.info("Database initialization complete.")
+
+    def _get_state(self) -> int:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT state FROM packed_games WHERE game_id = ?', (self.game_id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def get_player(self, player: int) -> Player:
+        """Retrieves a player's hands.
+
+        Args:
+            player (int): The player ID to retrieve data for.
+
+        Returns:
+            Player: A Player object with the hand data or None if the game does not exist.
+        """
+        board = self.get_board()
+        return board[player] if board else None
+
+    def get_board(self) -> List[Player]:
+        """Retrieves both players' hands with a single-column read.
+
+        Returns:
+            List[Player]: The players, indexed by player ID, or None if the game does not exist.
+        """
+        state = self._get_state()
+        if state is None:
+            self.logger.warning("No data found for game %s.", self.game_id)
+            return None
+        board, _, _ = unpack(state)
+        self.logger.debug("Board retrieved for game %s: %s", self.game_id, board)
+        return board
+
+    def set_player_hand(self, player: int, hand: str, fingers: int):
+        """Updates a player's hand.
+
+        Args:
+            player (int): The player ID.
+            hand (str): Which hand to update ('left' or 'right').
+            fingers (int): The number of fingers to set for the specified hand.
+
+        Raises:
+            ValueError: If the 'hand' parameter is not 'left' or 'right'.
+        """
+        self.set_hands([(player, hand, fingers)])
+
+    def set_hands(self, updates: Iterable[Tuple[int, str, int]]):
+        """Applies several hand updates to the packed state in one transaction.
+
+        Each update replaces one base-FINGERS digit of the state column in place.
+
+        Args:
+            updates (Iterable[Tuple[int, str, int]]): (player, hand, fingers) triples, applied in order.
+
+        Raises:
+            ValueError: If any hand is not 'left' or 'right'. Nothing is written in that case.
+        """
+        updates = list(updates)
+        self.logger.debug("Applying hand updates %s.", updates)
+        if any(hand not in ['left', 'right'] for _, hand, _ in updates):
+            self.logger.error("Invalid hand specified. Hand must be 'left' or 'right'.")
+            raise ValueError("Hand must be 'left' or 'right'")
+
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            for player, hand, fingers in updates:
+                weight = hand_weight(player, hand)
+                cursor.execute('UPDATE packed_games SET state = state + (? - (state / ?) % ?) * ? WHERE game_id = ?',
+                               (fingers, weight, FINGERS, weight, self.game_id))
+            cursor.execute('UPDATE packed_games SET version = version + 1 WHERE game_id = ?', (self.game_id,))
+            conn.commit()
+            self.logger.info("Hand updates %s committed.", updates)
+
+    def get_state(self) -> Optional[GameState]:
+        """Retrieves the whole game with a single-row read.
+
+        Returns:
+            Optional[GameState]: The game, or None if it does not exist.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute('SELECT state, version FROM packed_games WHERE game_id = ?', (self.game_id,))
+                row = cursor.fetchone()
+            except sqlite3.OperationalError as e:
+                # A database that no worker has initialized yet holds no games.
+                if "no such table" not in str(e):
+                    raise
+                return None
+        if row is None:
+            self.logger.warning("No data found for game %s.", self.game_id)
+            return None
+        players, current_player, winner = unpack(row[0])
+        return GameState(players, current_player, winner, row[1])
+
+    def compare_and_set(self, expected_version: int, state: GameState) -> bool:
+        """Replaces the packed state if its version is still expected_version.
+
+        Args:
+            expected_version (int): The version the state was read at.
+            state (GameState): The new state; its version is ignored.
+
+        Returns:
+            bool: Whether the state was stored.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''UPDATE packed_games SET state = ?, version = version + 1
+                              WHERE game_id = ? AND version = ?''',
+                           (pack(state.players, state.current_player, state.winner), self.game_id, expected_version))
+            conn.commit()
+            stored = cursor.rowcount == 1
+        self.logger.debug("Compare-and-set on game %s at version %s: %s.",
+                          self.game_id, expected_version, 'stored' if stored else 'conflict')
+        return stored
+
+    def get_version(self) -> int:
+        """Retrieves the state version with a primary key lookup."""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT version FROM packed_games WHERE game_id = ?', (self.game_id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def delete_game(self):
+        """Deletes this game's row from the database, keeping its last version in game_tombstones."""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''CREATE TABLE IF NOT EXISTS game_tombstones (
+                              game_id TEXT PRIMARY KEY,
+                              version INTEGER NOT NULL)''')
+            cursor.execute('''INSERT INTO game_tombstones (game_id, version)
+                              SELECT game_id, version FROM packed_games WHERE game_id = ?
+                              ON CONFLICT (game_id) DO UPDATE SET version = MAX(version, excluded.version)''',
+                           (self.game_id,))
+            cursor.execute('DELETE FROM packed_games WHERE game_id = ?', (self.game_id,))
+            conn.commit()
+            self.logger.info("Game %s deleted.", self.game_id)
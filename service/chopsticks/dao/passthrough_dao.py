@@ -1,27 +1,64 @@
+import itertools
 import logging
-from typing import Any, List
+import threading
+from typing import Any, Iterable, List, Optional, Tuple
 
-from chopsticks import Player
+from chopsticks import FINGERS, GameState, Player
 from chopsticks.dao import AbstractDAO
+from chopsticks.packed_state import hand_weight, pack, unpack, unpack_digits
+
+# Each DAO (each incarnation of a game) numbers its versions from its own multiple of
+# INCARNATION_SPAN, above those of every DAO made before it in the process. A game
+# created again after delete_game() thus continues above its old versions without
+# the deleted game being remembered.
+INCARNATION_SPAN = 1 << 32
+_INCARNATIONS = itertools.count(1)
+
+INITIAL_STATE = pack([Player(1, 1), Player(1, 1)])
+
+# One lock for every passthrough game: a write holds it for a compare and two
+# assignments, so a lock per game would cost more memory than it saves waiting.
+_LOCK = threading.Lock()
+
+logger = logging.getLogger(__name__)
 
 
 class PassthroughDAO(AbstractDAO):
+    """Keeps one game in process memory.
+
+    The whole game is one packed state (see chopsticks.packed_state) and a
+    version, in slots, so that a live game costs a few dozen bytes rather than
+    two Player objects and an instance dict.
 
-    def __init__(self, *args: Any, **kwargs: Any):
-        self.logger = logging.getLogger(__name__)
-        self.players: List[Player] = []
+    Attributes:
+        game_id (str): The id of the game.
+        state (Optional[int]): The packed game, or None once it is deleted.
+        version (int): Increases with every write.
+    """
+
+    __slots__ = ("game_id", "state", "version")
+
+    def __init__(self, *args: Any, game_id: str = "default", **kwargs: Any):
+        self.game_id = game_id
+        self.state: Optional[int] = None
+        self.version = next(_INCARNATIONS) * INCARNATION_SPAN
         self.init()
 
     def init(self, *args: Any, **kwargs: Any):
-        """Initialize the data store."""
-        self.logger.debug("Initializing passthrough DAO")
-        self.players = [Player(1, 1), Player(1, 1)]
-        self.logger.debug("Passthrough DAO initialized with two players.")
+        """Initialize the data store. The version keeps increasing across resets."""
+        with _LOCK:
+            self.state = INITIAL_STATE
+            self.version += 1
+        logger.debug("Passthrough game %s initialized with two players.", self.game_id)
 
     def get_player(self, player: int) -> Player:
         """Retrieve player hands based on player ID."""
-        player_data = self.players[player]
-        self.logger.debug(f"Retrieved hands for player {player}: {player_data}")
+        state = self.state
+        if state is None:
+            return None
+        digits = unpack_digits(state)
+        player_data = Player(digits[2 * player], digits[2 * player + 1])
+        logger.debug("Retrieved hands for player %s: %s", player, player_data)
         return player_data
 
     def set_player_hand(self, player: int, hand: str, fingers: int) -> None:
@@ -32,14 +69,86 @@ class PassthroughDAO(AbstractDAO):
             hand (str): Hand to set ("left" or "right")
             fingers (int): Number of fingers to set (0 to 4)
         """
-        self.logger.debug(f"Setting {hand} hand of player {player} to {fingers}.")
+        logger.debug("Setting %s hand of player %s to %s.", hand, player, fingers)
+        self.set_hands([(player, hand, fingers)])
+
+    def get_board(self) -> List[Player]:
+        """Retrieve the hands of both players in one call."""
+        state = self.state
+        if state is None:
+            return None
+        board = unpack(state)[0]
+        logger.debug("Retrieved board: %s", board)
+        return board
 
-        # Validate that the 'hand' parameter is either 'left' or 'right'
-        if hand not in ['left', 'right']:
-            self.logger.error("Invalid hand specified. Hand must be 'left' or 'right'.")
+    def set_hands(self, updates: Iterable[Tuple[int, str, int]]) -> None:
+        """Apply several hand updates atomically.
+
+        Args:
+            updates (Iterable[Tuple[int, str, int]]): (player, hand, fingers) triples, applied in order.
+
+        Raises:
+            ValueError: If any hand is not 'left' or 'right'. Nothing is applied in that case.
+        """
+        updates = list(updates)
+        if any(hand not in ['left', 'right'] for _, hand, _ in updates):
+            logger.error("Invalid hand specified. Hand must be 'left' or 'right'.")
             raise ValueError("Hand must be 'left' or 'right'")
+        with _LOCK:
+            state = self.state
+            if state is None:
+                return
+            for player, hand, fingers in updates:
+                weight = hand_weight(player, hand)
+                state += (fingers - state // weight % FINGERS) * weight
+            self.state = state
+            self.version += 1
+        logger.debug("Applied hand updates: %s", updates)
+
+    def get_state(self) -> Optional[GameState]:
+        """Retrieve a copy of the whole game."""
+        with _LOCK:
+            state, version = self.state, self.version
+        if state is None:
+            return None
+        players, current_player, winner = unpack(state)
+        return GameState(players, current_player, winner, version)
+
+    def get_version(self) -> int:
+        """Retrieve the state version alone."""
+        return self.version if self.state is not None else None
+
+    def compare_and_set(self, expected_version: int, state: GameState) -> bool:
+        """Store the state if the game is still at expected_version.
+
+        Args:
+            expected_version (int): The version the state was read at.
+            state (GameState): The new state; its version is ignored.
+
+        Returns:
+            bool: Whether the state was stored.
+        """
+        packed = pack(state.players, state.current_player, state.winner)
+        with _LOCK:
+            if self.state is None or self.version != expected_version:
+                logger.debug("Version conflict: expected %s, found %s.", expected_version, self.version)
+                return False
+            self.state = packed
+            self.version += 1
+        logger.debug("Stored state %s, player %s to move, winner %s at version %s.",
+                     state.players, state.current_player, state.winner, expected_version + 1)
+        return True
 
-        # Set the appropriate hand using setattr
-        setattr(self.players[player], hand, fingers)
+    def load(self, state: GameState) -> None:
+        """Store a whole game saved earlier, version included, so ETags given out before stay valid."""
+        packed = pack(state.players, state.current_player, state.winner)
+        with _LOCK:
+            self.state = packed
+            self.version = state.version
+        logger.debug("Loaded state %s at version %s.", state.players, state.version)
 
-        self.logger.debug(f"Player {player}'s {hand} hand: {getattr(self.players[player], hand)}")
+    def delete_game(self) -> None:
+        """Remove the game's data from the store."""
+        logger.debug("Deleting passthrough game %s.", self.game_id)
+        with _LOCK:
+            self.state = None
@@ -1,45 +1,84 @@
 import logging
 import sqlite3
+from typing import Iterable, List, Optional, Tuple
 
 from chopsticks.dao.abstract_dao import AbstractDAO
-from chopsticks import Player
+from chopsticks.dao.sqlite_pool import get_pool
+from chopsticks import GameState, Player
 
 
 class SQLiteDAO(AbstractDAO):
+
     """Data access object for managing player data in an SQLite database.
 
     Provides methods to initialize the database, retrieve player data, and update player data.
+    Several games share one database; every row is keyed by game id. Hands live in
+    game_players, and the turn, winner and state version in games. Every write
+    increases the version, and compare_and_set() only writes if it has not moved,
+    so several worker processes can serve the same games.
+
+    Connections come from a pool shared by every DAO using the same database,
+    so a call costs a checkout rather than a new connection.
 
     Attributes:
         db_path (str): The file path to the SQLite database.
+        game_id (str): The id of the game this DAO manages.
+        pool (SQLiteConnectionPool): The connection pool for db_path.
     """
 
-    def __init__(self, sqlite_db_path: str = "chopsticks.db"):
+    shared = True
+
+    def __init__(self, sqlite_db_path: str = "chopsticks.db", game_id: str = "default",
+                 sqlite_pragma_profile: str = "default"):
         """Initialize the SQLiteDAO with the path to the SQLite database file.
 
         Args:
             db_path (str): Path to the database file. Defaults to 'chopsticks.db'.
+            game_id (str): Id of the game whose rows this DAO reads and writes. Defaults to 'default'.
+            sqlite_pragma_profile (str): PRAGMA profile for pooled connections. Defaults to 'default'.
         """
         self.logger = logging.getLogger(__name__)
         self.db_path = sqlite_db_path
-        self.logger.debug(f"SQLiteDAO initialized with database path: {sqlite_db_path}")
+        self.game_id = game_id
+        self.pool = get_pool(sqlite_db_path, sqlite_pragma_profile)
+        self.logger.debug("SQLiteDAO initialized with database path: %s, game: %s, PRAGMA profile: %s",
+                          sqlite_db_path, game_id, sqlite_pragma_profile)
 
     def init(self):
-        """Initializes the database by creating the players table and inserting initial player data."""
+        """Initializes the database by creating the tables and inserting the initial game.
+
+        The state version of an existing game keeps increasing across resets, and
+        a game created again after delete_game() continues from its last version.
+        """
         self.logger.info("Initializing the database...")
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('DROP TABLE IF EXISTS players')
-            self.logger.debug("Dropped existing players table.")
-            cursor.execute('''CREATE TABLE players (
-                              player_id INTEGER PRIMARY KEY,
+            cursor.execute('''CREATE TABLE IF NOT EXISTS game_players (
+                              game_id TEXT NOT NULL,
+                              player_id INTEGER NOT NULL,
                               left_hand INTEGER,
-                              right_hand INTEGER)''')
-            self.logger.debug("Created new players table.")
-            cursor.execute('''Insert into players (player_id, left_hand, right_hand) values
-                            (0, 1, 1),
-                            (1, 1, 1)''')
+                              right_hand INTEGER,
+                              PRIMARY KEY (game_id, player_id))''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS games (
+                              game_id TEXT PRIMARY KEY,
+                              current_player INTEGER NOT NULL,
+                              winner INTEGER NOT NULL,
+                              version INTEGER NOT NULL)''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS game_tombstones (
+                              game_id TEXT PRIMARY KEY,
+                              version INTEGER NOT NULL)''')
+            self.logger.debug("Ensured game_players, games and game_tombstones tables exist.")
+            cursor.execute('DELETE FROM game_players WHERE game_id = ?', (self.game_id,))
+            self.logger.debug("Deleted existing rows for game %s.", self.game_id)
+            cursor.execute('''Insert into game_players (game_id, player_id, left_hand, right_hand) values
+                            (?, 0, 1, 1),
+                            (?, 1, 1, 1)''', (self.game_id, self.game_id))
             self.logger.debug("Inserted initial player data.")
+            cursor.execute('''INSERT INTO games (game_id, current_player, winner, version) VALUES (?, 0, -1,
+                              COALESCE((SELECT version FROM game_tombstones WHERE game_id = ?), 0) + 1)
+                              ON CONFLICT (game_id) DO UPDATE SET current_player = 0, winner = -1,
+                              version = version + 1''', (self.game_id, self.game_id))
+            cursor.execute('DELETE FROM game_tombstones WHERE game_id = ?', (self.game_id,))
             conn.commit()
             self.logger.info("Database initialization complete.")
 
@@ -52,16 +91,17 @@ class SQLiteDAO(AbstractDAO):
         Returns:
             Player: A Player object with the retrieved hand data or None if not found.
         """
-        self.logger.debug(f"Retrieving data for player {player}...")
-        with sqlite3.connect(self.db_path) as conn:
+        self.logger.debug("Retrieving data for player %s...", player)
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT left_hand, right_hand FROM players WHERE player_id = ?', (player,))
+            cursor.execute('SELECT left_hand, right_hand FROM game_players WHERE game_id = ? AND player_id = ?',
+                           (self.game_id, player))
             row = cursor.fetchone()
             if row:
-                self.logger.debug(f"Data retrieved for player {player}: {row}")
+                self.logger.debug("Data retrieved for player %s: %s", player, row)
                 return Player(*row)
             else:
-                self.logger.warning(f"No data found for player {player}.")
+                self.logger.warning("No data found for player %s.", player)
                 return None
 
     def set_player_hand(self, player: int, hand: str, fingers: int):
@@ -75,13 +115,135 @@ class SQLiteDAO(AbstractDAO):
         Raises:
             ValueError: If the 'hand' parameter is not 'left' or 'right'.
         """
-        self.logger.debug(f"Updating {hand} hand of player {player} to {fingers} fingers.")
+        self.logger.debug("Updating %s hand of player %s to %s fingers.", hand, player, fingers)
         if hand not in ['left', 'right']:
             self.logger.error("Invalid hand specified. Hand must be 'left' or 'right'.")
             raise ValueError("Hand must be 'left' or 'right'")
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'UPDATE game_players SET {hand}_hand = ? WHERE game_id = ? AND player_id = ?',
+                           (fingers, self.game_id, player))
+            cursor.execute('UPDATE games SET version = version + 1 WHERE game_id = ?', (self.game_id,))
+            conn.commit()
+            self.logger.info("Player %s's %s hand updated to %s fingers.", player, hand, fingers)
+
+    def get_board(self) -> List[Player]:
+        """Retrieves both players' hands with a single query.
+
+        Returns:
+            List[Player]: The players, indexed by player ID.
+        """
+        self.logger.debug("Retrieving board for game %s...", self.game_id)
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT left_hand, right_hand FROM game_players WHERE game_id = ? ORDER BY player_id',
+                           (self.game_id,))
+            board = [Player(*row) for row in cursor.fetchall()]
+            self.logger.debug("Board retrieved for game %s: %s", self.game_id, board)
+            return board
+
+    def set_hands(self, updates: Iterable[Tuple[int, str, int]]):
+        """Applies several hand updates in one transaction with a single commit.
+
+        Args:
+            updates (Iterable[Tuple[int, str, int]]): (player, hand, fingers) triples, applied in order.
+
+        Raises:
+            ValueError: If any hand is not 'left' or 'right'. Nothing is written in that case.
+        """
+        updates = list(updates)
+        self.logger.debug("Applying hand updates %s.", updates)
+        if any(hand not in ['left', 'right'] for _, hand, _ in updates):
+            self.logger.error("Invalid hand specified. Hand must be 'left' or 'right'.")
+            raise ValueError("Hand must be 'left' or 'right'")
+
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            for player, hand, fingers in updates:
+                cursor.execute(f'UPDATE game_players SET {hand}_hand = ? WHERE game_id = ? AND player_id = ?',
+                               (fingers, self.game_id, player))
+            cursor.execute('UPDATE games SET version = version + 1 WHERE game_id = ?', (self.game_id,))
+            conn.commit()
+            self.logger.info("Hand updates %s committed.", updates)
+
+    def get_state(self) -> Optional[GameState]:
+        """Retrieves hands, turn, winner and version with a single query.
+
+        Returns:
+            Optional[GameState]: The game, or None if it does not exist.
+        """
+        self.logger.debug("Retrieving state for game %s...", self.game_id)
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute('''SELECT g.current_player, g.winner, g.version, p.left_hand, p.right_hand
+                                  FROM games g JOIN game_players p ON p.game_id = g.game_id
+                                  WHERE g.game_id = ? ORDER BY p.player_id''', (self.game_id,))
+                rows = cursor.fetchall()
+            except sqlite3.OperationalError as e:
+                # A database that no worker has initialized yet holds no games.
+                if "no such table" not in str(e):
+                    raise
+                return None
+            if not rows:
+                self.logger.warning("No data found for game %s.", self.game_id)
+                return None
+            current_player, winner, version = rows[0][:3]
+            state = GameState([Player(*row[3:]) for row in rows], current_player, winner, version)
+            self.logger.debug("State retrieved for game %s: %s", self.game_id, state)
+            return state
+
+    def compare_and_set(self, expected_version: int, state: GameState) -> bool:
+        """Writes the whole game in one transaction if its version is still expected_version.
+
+        The version check and bump is the transaction's first statement, so it
+        takes the write lock before anything else is read or written.
+
+        Args:
+            expected_version (int): The version the state was read at.
+            state (GameState): The new state; its version is ignored.
+
+        Returns:
+            bool: Whether the state was stored.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''UPDATE games SET current_player = ?, winner = ?, version = version + 1
+                              WHERE game_id = ? AND version = ?''',
+                           (state.current_player, state.winner, self.game_id, expected_version))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                self.logger.debug("Version conflict on game %s: expected %s.", self.game_id, expected_version)
+                return False
+            cursor.executemany('UPDATE game_players SET left_hand = ?, right_hand = ? WHERE game_id = ? AND player_id = ?',
+                               [(player.left, player.right, self.game_id, player_id)
+                                for player_id, player in enumerate(state.players)])
+            conn.commit()
+            self.logger.info("State of game %s committed at version %s.", self.game_id, expected_version + 1)
+            return True
+
+    def get_version(self) -> int:
+        """Retrieves the state version with a primary key lookup."""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT version FROM games WHERE game_id = ?', (self.game_id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def delete_game(self):
+        """Deletes this game's rows from the database, keeping its last version in game_tombstones."""
+        self.logger.debug("Deleting rows for game %s...", self.game_id)
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(f'UPDATE players SET {hand}_hand = ? WHERE player_id = ?', (fingers, player))
+            cursor.execute('''CREATE TABLE IF NOT EXISTS game_tombstones (
+                              game_id TEXT PRIMARY KEY,
+                              version INTEGER NOT NULL)''')
+            cursor.execute('''INSERT INTO game_tombstones (game_id, version)
+                              SELECT game_id, version FROM games WHERE game_id = ?
+                              ON CONFLICT (game_id) DO UPDATE SET version = MAX(version, excluded.version)''',
+                           (self.game_id,))
+            cursor.execute('DELETE FROM game_players WHERE game_id = ?', (self.game_id,))
+            cursor.execute('DELETE FROM games WHERE game_id = ?', (self.game_id,))
             conn.commit()
-            self.logger.info(f"Player {player}'s {hand} hand updated to {fingers} fingers.")
+            self.logger.info("Game %s deleted.", self.game_id)
@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+import logging
+import queue
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, Tuple
+
+PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Leave every setting at the SQLite defaults.
+    "default": {},
+    # Write-ahead logging with relaxed fsyncs: commits survive a process crash
+    # but the last transactions may be lost on power failure.
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+DEFAULT_MAX_IDLE = 16
+
+INVALID_PROFILE_ERROR_MSG = "Unknown PRAGMA profile {profile}. Expected one of: {profiles}."
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteConnectionPool:
+    """Pool of reusable connections to one SQLite database.
+
+    Connections are checked out for the duration of a DAO call and handed back
+    afterwards, so a connection (and its PRAGMA settings and page cache) is
+    reused across requests no matter which thread serves them. At most
+    max_idle idle connections are kept; extra ones are closed on release.
+
+    Attributes:
+        db_path (str): The file path to the SQLite database.
+        pragma_profile (str): The name of the PRAGMA profile applied to new connections.
+    """
+
+    def __init__(self, db_path: str, pragma_profile: str = "default", max_idle: int = DEFAULT_MAX_IDLE):
+        """Initialize the pool.
+
+        Args:
+            db_path (str): Path to the database file.
+            pragma_profile (str): Name of an entry in PRAGMA_PROFILES. Defaults to 'default'.
+            max_idle (int): Maximum number of idle connections kept open.
+
+        Raises:
+            ValueError: If the PRAGMA profile is unknown.
+        """
+        if pragma_profile not in PRAGMA_PROFILES:
+            raise ValueError(INVALID_PROFILE_ERROR_MSG.format(profile=pragma_profile,
+                                                              profiles=", ".join(PRAGMA_PROFILES)))
+        self.db_path = db_path
+        self.pragma_profile = pragma_profile
+        self.idle: queue.LifoQueue = queue.LifoQueue(maxsize=max_idle)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection and apply the PRAGMA profile to it."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma, value in PRAGMA_PROFILES[self.pragma_profile].items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        logger.debug("Opened connection to %s with PRAGMA profile %s.", self.db_path, self.pragma_profile)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Check a connection out of the pool.
+
+        Uncommitted work is rolled back if the block raises.
+
+        Yields:
+            sqlite3.Connection: A connection that is returned to the pool when the block exits.
+        """
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool, closing it if the pool is full."""
+        try:
+            self.idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_POOLS: Dict[Tuple[str, str], SQLiteConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(db_path: str, pragma_profile: str = "default") -> SQLiteConnectionPool:
+    """Return the shared pool for a database and PRAGMA profile, creating it on first use.
+
+    Args:
+        db_path (str): Path to the database file.
+        pragma_profile (str): Name of an entry in PRAGMA_PROFILES.
+
+    Returns:
+        SQLiteConnectionPool: The pool shared by every DAO using this database.
+    """
+    key = (db_path, pragma_profile)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = SQLiteConnectionPool(db_path, pragma_profile)
+            _POOLS[key] = pool
+        return pool
+
+
+def close_pools() -> None:
+    """Close and forget every shared pool."""
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.close()
+        _POOLS.clear()
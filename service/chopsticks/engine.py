@@ -0,0 +1,171 @@
+"""Computer opponent.
+
+Iterative-deepening negamax with alpha-beta pruning over packed positions.
+Moves come from chopsticks.rules' successor table, so the search never touches
+a DAO; it only needs the board and the player to move. Results are kept in a
+transposition table keyed by position, and every search stops at a deadline,
+answering with the deepest completed iteration.
+"""
+import logging
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from chopsticks import FINGERS, Player
+from chopsticks.rules import Action, actions, position_digits, position_of, successor_table
+
+DEFAULT_TIME_BUDGET = 0.05
+DEFAULT_MAX_DEPTH = 32
+
+MATE = 1000
+# Deepest search ever run, whatever max_depth says: it keeps mate scores apart
+# from static scores, and the recursion within Python's stack limit.
+MAX_PLY = MATE // 2
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the deadline has passed."""
+
+
+class TTEntry(NamedTuple):
+    depth: int
+    value: int
+    flag: int
+    action: int
+
+
+class SearchEngine:
+    """Time-budgeted alpha-beta search.
+
+    Attributes:
+        time_budget (float): Seconds allowed per search.
+        max_depth (int): Deepest iteration to run.
+        fingers (int): Number of fingers per hand.
+        table (Dict[int, TTEntry]): The transposition table, shared by every search.
+    """
+
+    def __init__(self, time_budget: float = DEFAULT_TIME_BUDGET, max_depth: int = DEFAULT_MAX_DEPTH,
+                 fingers: int = FINGERS):
+        """
+        Initialize the engine.
+
+        Args:
+            time_budget (float): Seconds allowed per search.
+            max_depth (int): Deepest iteration to run.
+            fingers (int): Number of fingers per hand.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.fingers = fingers
+        self.actions = actions(fingers)
+        self.moves: List[List[Tuple[int, int]]] = [
+            [(action, successor) for action, successor in enumerate(row) if successor >= 0]
+            for row in successor_table(fingers).tolist()
+        ]
+        self.scores = self._static_scores()
+        self.table: Dict[int, TTEntry] = {}
+
+    def _static_scores(self) -> List[int]:
+        """Score every position by empty hands: the opponent's count minus the mover's."""
+        scores = []
+        for p0_left, p0_right, p1_left, p1_right, mover in position_digits(self.fingers).tolist():
+            empty = [(p0_left == 0) + (p0_right == 0), (p1_left == 0) + (p1_right == 0)]
+            scores.append(empty[1 - mover] - empty[mover])
+        return scores
+
+    def choose_action(self, players: Sequence[Player], current_player: int) -> Optional[Action]:
+        """
+        Pick an action for the player to move within the time budget.
+
+        Searches may run at the same time, e.g. for different games; each keeps
+        its own deadline and they share the transposition table.
+
+        Args:
+            players (Sequence[Player]): Both players, indexed by player ID.
+            current_player (int): The player to move.
+
+        Returns:
+            Optional[Action]: The chosen action, or None if the player cannot act.
+        """
+        position = position_of(players, current_player, self.fingers)
+        if not self.moves[position]:
+            return None
+        deadline = time.perf_counter() + self.time_budget
+        best_action, best_value, depth_reached = self.moves[position][0][0], 0, 0
+        try:
+            for depth in range(1, min(self.max_depth, MAX_PLY) + 1):
+                best_value = self._negamax(position, depth, -MATE - 1, MATE + 1, 0, deadline)
+                best_action = self.table[position].action
+                depth_reached = depth
+                # A forced win or loss within this depth; deeper searches cannot change it.
+                if abs(best_value) >= MATE - depth:
+                    break
+        except SearchTimeout:
+            pass
+        self.logger.debug("Searched position %s to depth %s: %s scores %s.",
+                          position, depth_reached, self.actions[best_action], best_value)
+        return self.actions[best_action]
+
+    def _negamax(self, position: int, depth: int, alpha: int, beta: int, ply: int, deadline: float) -> int:
+        if time.perf_counter() > deadline:
+            raise SearchTimeout()
+        moves = self.moves[position]
+        if not moves:
+            return -MATE + ply
+        if depth == 0:
+            return self.scores[position]
+
+        entry = self.table.get(position)
+        first = -1
+        if entry is not None:
+            first = entry.action
+            if entry.depth >= depth:
+                value = _from_table(entry.value, ply)
+                if entry.flag == EXACT:
+                    return value
+                if entry.flag == LOWER and value >= beta:
+                    return value
+                if entry.flag == UPPER and value <= alpha:
+                    return value
+
+        original_alpha = alpha
+        best_value, best_action = -MATE - 1, moves[0][0]
+        ordered = sorted(moves, key=lambda move: move[0] != first)
+        for action, successor in ordered:
+            value = -self._negamax(successor, depth - 1, -beta, -alpha, ply + 1, deadline)
+            if value > best_value:
+                best_value, best_action = value, action
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= original_alpha:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[position] = TTEntry(depth, _to_table(best_value, ply), flag, best_action)
+        return best_value
+
+
+def _to_table(value: int, ply: int) -> int:
+    """Make a mate score count from the position instead of the root, so other searches can reuse it."""
+    if value >= MATE - MAX_PLY:
+        return value + ply
+    if value <= -MATE + MAX_PLY:
+        return value - ply
+    return value
+
+
+def _from_table(value: int, ply: int) -> int:
+    """Make a mate score read from the table count from the root of the current search."""
+    if value >= MATE - MAX_PLY:
+        return value - ply
+    if value <= -MATE + MAX_PLY:
+        return value + ply
+    return value
@@ -0,0 +1,152 @@
+"""Publish/subscribe for board state changes.
+
+A message is encoded once by the publisher and the same bytes are handed to
+every subscriber of the game. Subscribers are plain mailboxes, not threads:
+delivery happens on the publisher's thread, and how a mailbox is drained
+(a blocking generator, an asyncio task, ...) is up to the transport.
+"""
+import asyncio
+import logging
+import queue
+import threading
+from typing import Dict, Optional, Set
+
+MAX_PENDING = 16
+
+
+class Subscription:
+    """A bounded mailbox of encoded messages for one subscriber.
+
+    Board states supersede each other, so when a slow subscriber falls
+    MAX_PENDING messages behind the oldest pending message is dropped.
+    """
+
+    def __init__(self, max_pending: int = MAX_PENDING):
+        self.messages: queue.Queue = queue.Queue(maxsize=max_pending)
+
+    def deliver(self, message: bytes) -> None:
+        """Queue a message without blocking the publisher."""
+        while True:
+            try:
+                self.messages.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.messages.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Wait for the next message.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait; None waits forever.
+
+        Returns:
+            Optional[bytes]: The message, or None if the timeout expired.
+        """
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """A mailbox drained by an asyncio task instead of a blocked thread.
+
+    Publishers on any thread hand messages to the event loop, so thousands of
+    idle subscribers cost one queue each and no threads.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int = MAX_PENDING):
+        self.loop = loop
+        self.messages: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    def deliver(self, message: bytes) -> None:
+        """Queue a message on the event loop's thread."""
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message: bytes) -> None:
+        if self.messages.full():
+            self.messages.get_nowait()
+        self.messages.put_nowait(message)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Wait for the next message without blocking the event loop.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait; None waits forever.
+
+        Returns:
+            Optional[bytes]: The message, or None if the timeout expired.
+        """
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """Fans encoded messages out to the subscribers of each game."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.subscribers: Dict[str, Set[Subscription]] = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, game_id: str, subscription: Optional[Subscription] = None) -> Subscription:
+        """
+        Register a subscriber for a game.
+
+        Args:
+            game_id (str): The id of the game.
+            subscription (Optional[Subscription]): The mailbox to deliver to; a new one if omitted.
+
+        Returns:
+            Subscription: The registered mailbox.
+        """
+        subscription = subscription or Subscription()
+        with self.lock:
+            self.subscribers.setdefault(game_id, set()).add(subscription)
+        self.logger.debug("Subscribed to game %s.", game_id)
+        return subscription
+
+    def unsubscribe(self, game_id: str, subscription: Subscription) -> None:
+        """
+        Remove a subscriber.
+
+        Args:
+            game_id (str): The id of the game.
+            subscription (Subscription): The mailbox returned by subscribe().
+        """
+        with self.lock:
+            subscribers = self.subscribers.get(game_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[game_id]
+        self.logger.debug("Unsubscribed from game %s.", game_id)
+
+    def has_subscribers(self, game_id: str) -> bool:
+        """Whether anyone is listening to a game."""
+        return game_id in self.subscribers
+
+    def publish(self, game_id: str, message: bytes) -> int:
+        """
+        Deliver an encoded message to every subscriber of a game.
+
+        Args:
+            game_id (str): The id of the game.
+            message (bytes): The encoded message.
+
+        Returns:
+            int: The number of subscribers it was delivered to.
+        """
+        with self.lock:
+            subscribers = list(self.subscribers.get(game_id, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+        self.logger.debug("Published to %s subscribers of game %s.", len(subscribers), game_id)
+        return len(subscribers)
@@ -0,0 +1,44 @@
+"""Per-game locks for the actions of one process.
+
+Actions on one game must not interleave: a move, its compare-and-swap and the
+board event it publishes belong together. Actions on different games have
+nothing to share. A lock per game would grow with every game ever created,
+so games are mapped onto a fixed number of stripes instead: each game always
+gets the same lock, two games only wait for each other when they hash to the
+same stripe, and memory is bounded by the stripe count.
+
+Across processes, every change is still a compare-and-swap on the game's
+version in the DAO; these locks only spare a process its own retries.
+"""
+import threading
+from typing import List
+
+DEFAULT_STRIPES = 64
+
+
+class StripedLocks:
+    """A fixed array of re-entrant locks, shared out among games by hash.
+
+    The locks are re-entrant, so an action may call another action on the same
+    game, as the engine move does. Holding the locks of two games at once can
+    deadlock and is not done.
+
+    Attributes:
+        locks (List[threading.RLock]): One lock per stripe.
+    """
+
+    def __init__(self, stripes: int = DEFAULT_STRIPES):
+        if stripes < 1:
+            raise ValueError("There must be at least one lock stripe.")
+        self.locks: List[threading.RLock] = [threading.RLock() for _ in range(stripes)]
+
+    def stripe(self, game_id: str) -> int:
+        """The index of the lock guarding a game; stable for the life of the process."""
+        return hash(game_id) % len(self.locks)
+
+    def lock_for(self, game_id: str) -> threading.RLock:
+        """The lock guarding a game."""
+        return self.locks[self.stripe(game_id)]
+
+    def __len__(self) -> int:
+        return len(self.locks)
@@ -0,0 +1,327 @@
+from collections import OrderedDict
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from chopsticks.chopstick_model import ChopstickModel, GameNotFoundError
+from chopsticks.dao import DAO, PassthroughDAO
+from chopsticks.metrics import GAME_EVICTIONS, GAME_RELOADS, GAMES_RESIDENT, GAMES_SPILLED, METRICS
+from chopsticks.spill_store import DEFAULT_SPILL_PATH, SpillStore
+
+DEFAULT_GAME_ID = "default"
+
+EVICTION_REASONS = ("capacity", "idle")
+
+
+class GameRegistry:
+    """Registry of live games keyed by game id.
+
+    Every game gets its own ChopstickModel (and therefore its own DAO instance),
+    built from the DAO identifier and arguments the registry was created with.
+    Creation, lookup and teardown are single dictionary operations. With a DAO
+    whose store is shared between processes, a game created by another worker
+    is attached on first lookup.
+
+    Games are kept in memory for the life of the process unless eviction is
+    configured (see configure_eviction()). Then the registry keeps its games in
+    least recently used order and evicts from the front: the oldest games once
+    there are more than max_games, and games left alone for idle_ttl seconds.
+    A game whose store is shared is simply dropped and attached again when it
+    is next asked for. Any other game is written to a SpillStore first and read
+    back, version included, on its next lookup, so clients do not notice.
+    Evictions happen during lookups and creations; there is no background
+    thread.
+
+    Attributes:
+        max_games (int): Games kept in memory before the least recently used are evicted; 0 for no limit.
+        idle_ttl (float): Seconds after their last lookup at which games are evicted; 0 to never.
+        spill (Optional[SpillStore]): Where evicted games are written; None while eviction is off.
+        evictions (Dict[str, int]): Games evicted so far, by reason ("capacity" or "idle").
+        reloads (int): Evicted games read back so far.
+        spilled (int): Games in the spill store.
+        shared (bool): Whether the DAO's store is shared between processes, so that unknown games are looked up in it.
+    """
+
+    def __init__(self, dao_identifier: str = "passthrough", *args: Any, **kwargs: Any):
+        """
+        Initialize the registry.
+
+        Args:
+            dao_identifier (str): Identifier for the data access object every game uses.
+            dao_args (Any): Arguments for the data access object.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.dao_identifier = dao_identifier
+        self.dao_args = args
+        self.dao_kwargs = kwargs
+        self.shared = DAO.get(dao_identifier, PassthroughDAO).shared
+        self.games: "OrderedDict[str, ChopstickModel]" = OrderedDict()
+        self.last_used: Dict[str, float] = {}
+        self.lock = threading.RLock()
+        self.max_games = 0
+        self.idle_ttl = 0.0
+        self.spill: Optional[SpillStore] = None
+        self.lock_for: Optional[Callable[[str], Any]] = None
+        self.clock: Callable[[], float] = time.monotonic
+        self.evictions: Dict[str, int] = dict.fromkeys(EVICTION_REASONS, 0)
+        self.reloads = 0
+        self.spilled = 0
+
+    def configure_eviction(self, max_games: int = 0, idle_ttl: float = 0.0, spill_path: str = DEFAULT_SPILL_PATH,
+                           lock_for: Optional[Callable[[str], Any]] = None,
+                           clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Bound the games kept in memory, spilling the others to disk.
+
+        The spill store belongs to this registry: anything left in it, e.g. by an
+        earlier run, is cleared. Give every worker process its own spill_path.
+
+        Args:
+            max_games (int): Games kept in memory; 0 for no limit.
+            idle_ttl (float): Seconds after their last lookup at which games are evicted; 0 to never.
+            spill_path (str): The SQLite database evicted games are written to.
+            lock_for (Optional[Callable[[str], Any]]): The lock held while acting on a game. A game whose
+                lock is taken is in use and is not evicted.
+            clock (Callable[[], float]): Source of the current time in seconds.
+        """
+        with self.lock:
+            self.max_games = max_games
+            self.idle_ttl = idle_ttl
+            self.lock_for = lock_for
+            self.clock = clock
+            if not max_games and not idle_ttl:
+                self.spill = None
+                return
+            self.spill = SpillStore(spill_path)
+            self.spill.clear()
+            self.spilled = 0
+            now = clock()
+            self.last_used = dict.fromkeys(self.games, now)
+            self._sweep(None, now)
+        self.logger.info("Evicting games to %s: at most %s in memory, idle for at most %ss (0 for no limit).",
+                         spill_path, max_games, idle_ttl)
+
+    def create(self, game_id: str) -> ChopstickModel:
+        """
+        Create a new game, replacing any existing game with the same id.
+
+        Args:
+            game_id (str): The id of the game to create.
+
+        Returns:
+            ChopstickModel: The model for the new game.
+        """
+        model = ChopstickModel(self.dao_identifier, *self.dao_args, game_id=game_id, **self.dao_kwargs)
+        with self.lock:
+            if self.spill is None:
+                self.games[game_id] = model
+            else:
+                if game_id not in self.games and self.spill.delete(game_id):
+                    self.spilled -= 1
+                self._admit(game_id, model)
+        self._count_games()
+        self.logger.info("Created game %s.", game_id)
+        return model
+
+    def get(self, game_id: str) -> ChopstickModel:
+        """
+        Look up a game, reading it back if it was evicted.
+
+        Args:
+            game_id (str): The id of the game.
+
+        Returns:
+            ChopstickModel: The model for the game.
+
+        Raises:
+            GameNotFoundError: If there is no game with the given id.
+        """
+        if self.spill is None:
+            try:
+                return self.games[game_id]
+            except KeyError:
+                pass
+            model = self._attach(game_id)
+            with self.lock:
+                model = self.games.setdefault(game_id, model)
+            self._count_games()
+            return model
+        with self.lock:
+            model = self.games.get(game_id)
+            if model is not None:
+                now = self.clock()
+                self.games.move_to_end(game_id)
+                self.last_used[game_id] = now
+                self._sweep(game_id, now)
+                return model
+            model = self._reload(game_id) or self._attach(game_id)
+            self._admit(game_id, model)
+        self._count_games()
+        return model
+
+    def get_or_create(self, game_id: str) -> ChopstickModel:
+        """
+        Look up a game, creating it if it does not exist yet.
+
+        Args:
+            game_id (str): The id of the game.
+
+        Returns:
+            ChopstickModel: The model for the game.
+        """
+        try:
+            return self.get(game_id)
+        except GameNotFoundError:
+            return self.create(game_id)
+
+    def remove(self, game_id: str) -> None:
+        """
+        Tear down a game and delete its stored state.
+
+        Args:
+            game_id (str): The id of the game.
+
+        Raises:
+            GameNotFoundError: If there is no game with the given id.
+        """
+        with self.lock:
+            if self.spill is not None and game_id not in self.games:
+                model = self._reload(game_id)
+                if model is not None:
+                    self.games[game_id] = model
+            try:
+                model = self.games.pop(game_id)
+            except KeyError:
+                raise GameNotFoundError(game_id) from None
+            self.last_used.pop(game_id, None)
+        model.dao.delete_game()
+        self._count_games()
+        self.logger.info("Removed game %s.", game_id)
+
+    def discard(self, game_id: str) -> None:
+        """
+        Drop a game another process deleted from the shared store, leaving the store alone.
+
+        Its model reads the game as missing (GameNotFoundError); without this it
+        would stay in memory. A game whose store is not shared lives only in its
+        model, so it is never dropped here.
+
+        Args:
+            game_id (str): The id of the game.
+        """
+        if not self.shared:
+            return
+        with self.lock:
+            if self.games.pop(game_id, None) is None:
+                return
+            self.last_used.pop(game_id, None)
+        self._count_games()
+        self.logger.info("Discarded game %s, deleted by another process.", game_id)
+
+    def _attach(self, game_id: str) -> ChopstickModel:
+        """Attach a game another process created in a shared store."""
+        if not self.shared:
+            raise GameNotFoundError(game_id)
+        model = ChopstickModel(self.dao_identifier, *self.dao_args, game_id=game_id, new_game=False,
+                               **self.dao_kwargs)
+        model.get_state()
+        self.logger.info("Attached game %s.", game_id)
+        return model
+
+    def _admit(self, game_id: str, model: ChopstickModel) -> None:
+        """Hold a game in memory as the most recently used, evicting others if needed."""
+        now = self.clock()
+        self.games[game_id] = model
+        self.games.move_to_end(game_id)
+        self.last_used[game_id] = now
+        self._sweep(game_id, now)
+
+    def _sweep(self, keep: Optional[str], now: float) -> None:
+        """Evict from the least recently used end while over capacity or idle for too long.
+
+        Games that are in use are passed over and count as just used. The game
+        named keep, which the caller is about to return, is never evicted.
+        """
+        passed = 0
+        while passed < len(self.games):
+            game_id = next(iter(self.games))
+            if self.max_games and len(self.games) > self.max_games:
+                reason = "capacity"
+            elif self.idle_ttl and now - self.last_used[game_id] >= self.idle_ttl:
+                reason = "idle"
+            else:
+                return
+            if game_id == keep or not self._evict(game_id, reason):
+                self.games.move_to_end(game_id)
+                self.last_used[game_id] = now
+                passed += 1
+
+    def _evict(self, game_id: str, reason: str) -> bool:
+        """
+        Drop a game from memory, spilling it first unless its store is shared.
+
+        Returns:
+            bool: Whether the game was evicted; False if it is in use or could not be spilled.
+        """
+        lock = self.lock_for(game_id) if self.lock_for is not None else None
+        if lock is not None and not lock.acquire(blocking=False):
+            return False
+        try:
+            model = self.games[game_id]
+            if not model.dao.shared:
+                model.dao.release()
+                state = model.dao.get_state()
+                if state is not None:
+                    try:
+                        self.spill.save(game_id, state)
+                    except Exception:
+                        self.logger.exception("Could not spill game %s; keeping it in memory.", game_id)
+                        return False
+                    self.spilled += 1
+            del self.games[game_id]
+            del self.last_used[game_id]
+        finally:
+            if lock is not None:
+                lock.release()
+        self.evictions[reason] += 1
+        if METRICS.enabled:
+            GAME_EVICTIONS.inc(reason)
+        self._count_games()
+        self.logger.debug("Evicted game %s (%s).", game_id, reason)
+        return True
+
+    def _reload(self, game_id: str) -> Optional[ChopstickModel]:
+        """Read an evicted game back from the spill store, or return None if it is not there."""
+        state = self.spill.load(game_id)
+        if state is None:
+            return None
+        model = ChopstickModel(self.dao_identifier, *self.dao_args, game_id=game_id, new_game=False,
+                               **self.dao_kwargs)
+        if model.get_state() != state:
+            model.dao.load(state)
+        self.spill.delete(game_id)
+        self.spilled -= 1
+        self.reloads += 1
+        if METRICS.enabled:
+            GAME_RELOADS.inc()
+        self.logger.debug("Reloaded game %s at version %s.", game_id, state.version)
+        return model
+
+    def _count_games(self) -> None:
+        if METRICS.enabled:
+            GAMES_RESIDENT.set(len(self.games))
+            GAMES_SPILLED.set(self.spilled)
+
+    def __contains__(self, game_id: str) -> bool:
+        if game_id in self.games:
+            return True
+        return self.spill is not None and self.spill.load(game_id) is not None
+
+    def __len__(self) -> int:
+        """The number of games in memory."""
+        return len(self.games)
+
+    def __iter__(self) -> Iterator[str]:
+        """The ids of the games in memory, least recently used first."""
+        return iter(list(self.games))
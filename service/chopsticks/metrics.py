@@ -0,0 +1,245 @@
+"""In-process metrics, rendered in the Prometheus text exposition format.
+
+Counters, gauges, summaries and histograms are kept per label set in plain dicts
+behind one lock per metric, so recording a value costs a lock and a dict
+update. Every worker process keeps its own metrics; scrape each worker.
+
+The metrics of the service are defined here:
+
+    chopsticks_http_requests_total           requests by route template, method and status
+    chopsticks_http_request_duration_seconds histogram of request latency by route and method
+    chopsticks_dao_call_duration_seconds     count and total time of DAO calls by DAO class and method
+    chopsticks_game_events_total             moves, swaps, resets and wins
+    chopsticks_games_resident                games held in memory by the registry
+    chopsticks_games_spilled                 games evicted to the spill store and not yet reloaded
+    chopsticks_game_evictions_total          games evicted from memory, by reason (capacity or idle)
+    chopsticks_game_reloads_total            evicted games read back from the spill store
+"""
+from bisect import bisect_left
+from functools import wraps
+import threading
+import time
+from typing import Callable, Dict, List, Sequence, Tuple, Type
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# The AbstractDAO methods whose calls are timed.
+DAO_METHODS = ("init", "get_player", "set_player_hand", "get_board", "set_hands", "get_state",
+               "compare_and_set", "get_version", "load", "release", "delete_game")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A named family of values, one per label set.
+
+    Attributes:
+        name (str): The metric name.
+        help (str): One line describing it.
+        labels (Tuple[str, ...]): The label names; values are passed positionally.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple[str, ...], object] = {}
+
+    def render(self) -> List[str]:
+        """Render the family in the text exposition format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            values = sorted(self.values.items())
+        for label_values, value in values:
+            lines.extend(self._render_value(label_values, value))
+        return lines
+
+    def _render_value(self, label_values: Tuple[str, ...], value: object) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"]
+
+    def reset(self) -> None:
+        """Forget every value."""
+        with self.lock:
+            self.values.clear()
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    kind = "counter"
+
+    def inc(self, *label_values: str, amount: int = 1) -> None:
+        """Add amount to the counter of a label set."""
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    """A value that goes up and down, set to its latest reading."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *label_values: str) -> None:
+        """Set the value of a label set."""
+        with self.lock:
+            self.values[label_values] = value
+
+
+class Summary(Metric):
+    """The count and sum of observed values, without quantiles."""
+
+    kind = "summary"
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one value for a label set."""
+        with self.lock:
+            count, total = self.values.get(label_values, (0, 0.0))
+            self.values[label_values] = (count + 1, total + value)
+
+    def _render_value(self, label_values: Tuple[str, ...], value: object) -> List[str]:
+        count, total = value
+        labels = _format_labels(self.labels, label_values)
+        return [f"{self.name}_count{labels} {count}", f"{self.name}_sum{labels} {_format_value(total)}"]
+
+
+class Histogram(Metric):
+    """Observed values counted in cumulative buckets, with their count and sum.
+
+    Attributes:
+        buckets (Tuple[float, ...]): Upper bounds of the buckets, ascending; +Inf is implied.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one value for a label set."""
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(label_values)
+            if entry is None:
+                entry = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def _render_value(self, label_values: Tuple[str, ...], value: object) -> List[str]:
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            labels = _format_labels(self.labels + ("le",), label_values + (le,))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels, label_values)
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics of a process.
+
+    Attributes:
+        enabled (bool): Whether values are recorded. Instrumented code checks it first,
+                        so a disabled registry costs one attribute read per call.
+        metrics (List[Metric]): Every registered family, in registration order.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric family and return it."""
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every family in the text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Forget every recorded value."""
+        for metric in self.metrics:
+            metric.reset()
+
+
+METRICS = MetricsRegistry()
+
+HTTP_REQUESTS = METRICS.register(Counter(
+    "chopsticks_http_requests_total", "Requests served, by route template, method and status.",
+    ("route", "method", "status")))
+HTTP_REQUEST_SECONDS = METRICS.register(Histogram(
+    "chopsticks_http_request_duration_seconds", "Time to build the response, by route template and method.",
+    ("route", "method")))
+DAO_CALL_SECONDS = METRICS.register(Summary(
+    "chopsticks_dao_call_duration_seconds", "DAO calls and the time spent in them, by DAO class and method.",
+    ("dao", "method")))
+GAME_EVENTS = METRICS.register(Counter(
+    "chopsticks_game_events_total", "Moves, swaps, resets and wins.", ("event",)))
+GAMES_RESIDENT = METRICS.register(Gauge(
+    "chopsticks_games_resident", "Games held in memory by the registry."))
+GAMES_SPILLED = METRICS.register(Gauge(
+    "chopsticks_games_spilled", "Games evicted to the spill store and not yet reloaded."))
+GAME_EVICTIONS = METRICS.register(Counter(
+    "chopsticks_game_evictions_total", "Games evicted from memory, by reason.", ("reason",)))
+GAME_RELOADS = METRICS.register(Counter(
+    "chopsticks_game_reloads_total", "Evicted games read back from the spill store."))
+
+
+def _timed(dao_name: str, method_name: str, method: Callable) -> Callable:
+    @wraps(method)
+    def timed(*args, **kwargs):
+        if not METRICS.enabled:
+            return method(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            DAO_CALL_SECONDS.observe(time.perf_counter() - start, dao_name, method_name)
+
+    timed.instrumented = True
+    return timed
+
+
+def instrument_dao(dao_class: Type) -> Type:
+    """
+    Time every AbstractDAO method of a DAO class, inherited ones included.
+
+    Args:
+        dao_class (Type): The class to instrument in place; instrumenting twice is a no-op.
+
+    Returns:
+        Type: The same class.
+    """
+    for method_name in DAO_METHODS:
+        method = getattr(dao_class, method_name, None)
+        if method is None or getattr(method, "instrumented", False):
+            continue
+        setattr(dao_class, method_name, _timed(dao_class.__name__, method_name, method))
+    return dao_class
@@ -0,0 +1,158 @@
+"""Whole-game state packed into one small integer.
+
+A game is four hands of 0 to FINGERS - 1 fingers, the player to move and the
+winner. They are packed in mixed radix, least significant digit first:
+
+    player 1 right, player 1 left, player 0 right, player 0 left  (base FINGERS each)
+    current player                                              (base 2)
+    winner + 1                                                  (base 3)
+
+so every state is a dense index below 6 * FINGERS ** 4 (3750 for five
+fingers) and ``state % position_count(fingers)`` is the position without the
+winner, which is what the solver and rules tables are indexed by.
+
+Packed states are what PassthroughDAO keeps for a live game, and what the
+packed and event-log SQLite DAOs, the spill store and the archive store.
+"""
+from typing import List, Sequence, Tuple
+
+from chopsticks import FINGERS, Player
+
+
+def hand_weight(player: int, hand: str, fingers: int = FINGERS) -> int:
+    """
+    Get the place value of one hand in a packed state.
+
+    Args:
+        player (int): Player index (0 or 1).
+        hand (str): "left" or "right".
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        int: The multiplier of the hand's digit.
+    """
+    return fingers ** (2 * (1 - player) + (hand == "left"))
+
+
+def position_count(fingers: int = FINGERS) -> int:
+    """Number of distinct (hands, current player) positions."""
+    return 2 * fingers ** 4
+
+
+def state_count(fingers: int = FINGERS) -> int:
+    """Number of distinct packed states, winner included."""
+    return 3 * position_count(fingers)
+
+
+def pack_hands(p0_left: int, p0_right: int, p1_left: int, p1_right: int, fingers: int = FINGERS) -> int:
+    """Pack the four hands into the low digits of a state."""
+    return ((p0_left * fingers + p0_right) * fingers + p1_left) * fingers + p1_right
+
+
+def pack(players: Sequence[Player], current_player: int = 0, winner: int = -1, fingers: int = FINGERS) -> int:
+    """
+    Pack a whole game into one integer.
+
+    Args:
+        players (Sequence[Player]): Both players, indexed by player ID.
+        current_player (int): The player to move (0 or 1).
+        winner (int): The winner (0 or 1) or -1 if no one has won.
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        int: The packed state.
+    """
+    player0, player1 = players
+    hands = pack_hands(player0.left, player0.right, player1.left, player1.right, fingers)
+    return hands + fingers ** 4 * (current_player + 2 * (winner + 1))
+
+
+def _unpack_digits(state: int, fingers: int) -> Tuple[int, int, int, int, int, int]:
+    state, p1_right = divmod(state, fingers)
+    state, p1_left = divmod(state, fingers)
+    state, p0_right = divmod(state, fingers)
+    state, p0_left = divmod(state, fingers)
+    winner, current_player = divmod(state, 2)
+    return p0_left, p0_right, p1_left, p1_right, current_player, winner - 1
+
+
+# Decoding is a tuple lookup for the default number of fingers.
+_DIGITS = tuple(_unpack_digits(state, FINGERS) for state in range(state_count(FINGERS)))
+
+
+def unpack_digits(state: int, fingers: int = FINGERS) -> Tuple[int, int, int, int, int, int]:
+    """
+    Unpack a state into plain integers.
+
+    Args:
+        state (int): The packed state.
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        Tuple[int, int, int, int, int, int]: Player 0 left and right, player 1 left
+        and right, the current player and the winner.
+    """
+    if fingers == FINGERS:
+        return _DIGITS[state]
+    return _unpack_digits(state, fingers)
+
+
+def unpack(state: int, fingers: int = FINGERS) -> Tuple[List[Player], int, int]:
+    """
+    Unpack a state into Player objects.
+
+    Args:
+        state (int): The packed state.
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        Tuple[List[Player], int, int]: The players, the current player and the winner.
+    """
+    p0_left, p0_right, p1_left, p1_right, current_player, winner = unpack_digits(state, fingers)
+    return [Player(p0_left, p0_right), Player(p1_left, p1_right)], current_player, winner
+
+
+class PackedState(int):
+    """An int holding a packed game, with named accessors.
+
+    Instances are plain ints to the interpreter (no per-instance dict), so they
+    can be stored, hashed and compared like any other small integer.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_game(cls, players: Sequence[Player], current_player: int = 0, winner: int = -1) -> "PackedState":
+        """Pack a game; see pack()."""
+        return cls(pack(players, current_player, winner))
+
+    @property
+    def players(self) -> List[Player]:
+        """The players, indexed by player ID."""
+        return unpack(self)[0]
+
+    @property
+    def current_player(self) -> int:
+        """The player to move."""
+        return _DIGITS[self][4]
+
+    @property
+    def winner(self) -> int:
+        """The winner (0 or 1) or -1 if no one has won."""
+        return _DIGITS[self][5]
+
+    @property
+    def position(self) -> int:
+        """The state without its winner digit."""
+        return self % position_count()
+
+    def with_hand(self, player: int, hand: str, fingers: int) -> "PackedState":
+        """Return a copy with one hand replaced."""
+        digits = _DIGITS[self]
+        weight = hand_weight(player, hand)
+        old = digits[2 * player + (hand == "right")]
+        return PackedState(self + (fingers - old) * weight)
+
+    def __repr__(self) -> str:
+        players, current_player, winner = unpack(self)
+        return f"PackedState(players={players}, current_player={current_player}, winner={winner})"
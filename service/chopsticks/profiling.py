@@ -0,0 +1,157 @@
+"""Opt-in cProfile profiling of requests.
+
+ProfilingMiddleware wraps a WSGI application and runs selected requests under
+cProfile: every request whose path matches a pattern (mode "always"), or only
+those that also carry the PROFILE_HEADER header (mode "header"). Each profile
+is dumped to its own file in a stats directory, ready for pstats or snakeviz,
+and merged into an in-memory aggregate whose hottest functions summary()
+reports. The middleware is only installed when profiling is on, so a server
+running without it pays nothing.
+
+The stats files of a directory can also be summarized offline:
+
+    python -m chopsticks.profiling profiles/ --top 20
+"""
+import cProfile
+import glob
+import itertools
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import click
+
+PROFILE_MODES = ["off", "header", "always"]
+PROFILE_HEADER = "X-Chopsticks-Profile"
+DEFAULT_PATTERN = r"^/chopsticks/"
+DEFAULT_TOP = 20
+SORT_KEYS = {"tottime": 2, "cumtime": 3}
+
+logger = logging.getLogger(__name__)
+
+
+def top_functions(stats: pstats.Stats, top: int = DEFAULT_TOP, sort: str = "tottime") -> List[Dict[str, Any]]:
+    """
+    List the hottest functions of a profile.
+
+    Args:
+        stats (pstats.Stats): The profile, possibly merged from many requests.
+        top (int): Number of functions listed.
+        sort (str): "tottime" for time spent in the function itself, "cumtime" to include its callees.
+
+    Returns:
+        List[Dict[str, Any]]: One entry per function, hottest first.
+    """
+    column = SORT_KEYS[sort]
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)[:top]
+    return [{
+        "function": function,
+        "file": file,
+        "line": line,
+        "calls": calls,
+        "tottime": round(tottime, 6),
+        "cumtime": round(cumtime, 6),
+    } for (file, line, function), (_, calls, tottime, cumtime, _) in rows]
+
+
+class ProfilingMiddleware:
+    """WSGI middleware that profiles selected requests with cProfile.
+
+    Only the call that builds the response is profiled, not the iteration of
+    a streamed body. On Python versions where only one profiler may run at a
+    time, a request that arrives while another is profiled is served unprofiled.
+
+    Attributes:
+        wsgi_app (Callable): The wrapped application.
+        mode (str): "header" or "always"; see PROFILE_MODES.
+        stats_dir (str): Directory the stats files are written to.
+        pattern (re.Pattern): Paths that may be profiled.
+        requests (int): Number of requests profiled so far.
+    """
+
+    def __init__(self, wsgi_app: Callable, mode: str = "header", stats_dir: str = "profiles",
+                 pattern: str = DEFAULT_PATTERN):
+        self.wsgi_app = wsgi_app
+        self.mode = mode
+        self.stats_dir = stats_dir
+        self.pattern = re.compile(pattern)
+        self.header_key = "HTTP_" + PROFILE_HEADER.upper().replace("-", "_")
+        self.lock = threading.Lock()
+        self.aggregate: Optional[pstats.Stats] = None
+        self.requests = 0
+        self.sequence = itertools.count()
+        os.makedirs(stats_dir, exist_ok=True)
+        logger.info("Profiling %s requests matching %s into %s.", mode, pattern, stats_dir)
+
+    def selected(self, environ: Dict[str, Any]) -> bool:
+        """Whether a request is to be profiled."""
+        if self.mode == "header" and environ.get(self.header_key, "").lower() not in ("1", "true", "yes"):
+            return False
+        return self.pattern.search(environ.get("PATH_INFO", "")) is not None
+
+    def __call__(self, environ: Dict[str, Any], start_response: Callable) -> Iterable[bytes]:
+        if not self.selected(environ):
+            return self.wsgi_app(environ, start_response)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active in this interpreter.
+            return self.wsgi_app(environ, start_response)
+        try:
+            return self.wsgi_app(environ, start_response)
+        finally:
+            profiler.disable()
+            self._record(profiler, environ)
+
+    def _record(self, profiler: cProfile.Profile, environ: Dict[str, Any]) -> None:
+        path = re.sub(r"[^A-Za-z0-9_.-]+", "_", environ.get("PATH_INFO", "")).strip("_")
+        name = f"{time.time_ns()}-{next(self.sequence)}-{environ.get('REQUEST_METHOD', 'GET')}-{path}.prof"
+        profiler.dump_stats(os.path.join(self.stats_dir, name))
+        with self.lock:
+            if self.aggregate is None:
+                self.aggregate = pstats.Stats(profiler)
+            else:
+                self.aggregate.add(profiler)
+            self.requests += 1
+        logger.debug("Profiled %s into %s.", environ.get("PATH_INFO"), name)
+
+    def summary(self, top: int = DEFAULT_TOP, sort: str = "tottime") -> Dict[str, Any]:
+        """
+        Summarize every request profiled by this process.
+
+        Args:
+            top (int): Number of functions listed.
+            sort (str): "tottime" or "cumtime"; see top_functions().
+
+        Returns:
+            Dict[str, Any]: The number of requests profiled and their hottest functions.
+        """
+        with self.lock:
+            functions = top_functions(self.aggregate, top, sort) if self.aggregate is not None else []
+            return {"requests": self.requests, "stats_dir": self.stats_dir, "functions": functions}
+
+
+@click.command()
+@click.argument('stats_dir')
+@click.option('--top', default=DEFAULT_TOP, help='Number of functions listed')
+@click.option('--sort', default='tottime', type=click.Choice(list(SORT_KEYS)), help='Column to rank functions by')
+def main(stats_dir: str, top: int, sort: str) -> None:
+    """Print the hottest functions over every stats file of a directory."""
+    paths = sorted(glob.glob(os.path.join(stats_dir, "*.prof")))
+    if not paths:
+        raise click.ClickException(f"No stats files in {stats_dir}.")
+    stats = pstats.Stats(*paths)
+    click.echo(f"{len(paths)} profiled requests")
+    click.echo(f"{'tottime':>10} {'cumtime':>10} {'calls':>8}  function")
+    for row in top_functions(stats, top, sort):
+        click.echo(f"{row['tottime']:>10.4f} {row['cumtime']:>10.4f} {row['calls']:>8}  "
+                   f"{row['function']} ({row['file']}:{row['line']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""Move generation over the whole position space, vectorized with NumPy.
+
+A position is a packed state without its winner digit (see
+chopsticks.packed_state): the four hands plus the player to move. A move adds
+one of the mover's non-empty hands to one of the opponent's hands modulo
+FINGERS, and a swap moves 1 to n fingers from a hand holding n to the mover's
+other hand, again modulo FINGERS. The player to move loses when both of their
+hands are empty. ChopstickModel validates and plays actions through the tables
+built here, so they are the rules of the service.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from chopsticks import FINGERS, GameState, Player
+from chopsticks.packed_state import pack, position_count, unpack_digits
+
+HANDS = ("left", "right")
+
+
+class Action(NamedTuple):
+    """A move or a swap.
+
+    For a move, hand is the mover's hand and to_hand the opponent's hand.
+    For a swap, hand is the starting hand and fingers the number moved.
+    """
+    kind: str
+    hand: str
+    to_hand: Optional[str] = None
+    fingers: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Describe the action with the same names the move and swap routes use."""
+        if self.kind == "move":
+            return {"action": "move", "from_hand": self.hand, "to_hand": self.to_hand}
+        return {"action": "swap", "hand": self.hand, "fingers": self.fingers}
+
+
+@lru_cache(maxsize=None)
+def actions(fingers: int = FINGERS) -> List[Action]:
+    """
+    List every action, in the order used for the columns of successor_table().
+
+    Args:
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        List[Action]: The four moves followed by the swaps.
+    """
+    moves = [Action("move", hand, to_hand=to_hand) for hand in HANDS for to_hand in HANDS]
+    swaps = [Action("swap", hand, fingers=count) for hand in HANDS for count in range(1, fingers)]
+    return moves + swaps
+
+
+@lru_cache(maxsize=None)
+def action_codes(fingers: int = FINGERS) -> Dict[Action, int]:
+    """
+    Map every action to its index in actions().
+
+    Args:
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        Dict[Action, int]: The index of each action.
+    """
+    return {action: index for index, action in enumerate(actions(fingers))}
+
+
+def play(state: GameState, action: Action, fingers: int = FINGERS) -> None:
+    """
+    Play an action for the player to move, changing the state in place.
+
+    The action is not checked for legality; ChopstickModel does that before
+    calling this. The turn passes, unless the opponent has no fingers left:
+    then the mover has won and keeps the turn.
+
+    Args:
+        state (GameState): The game; its version is left alone.
+        action (Action): The move or swap.
+        fingers (int): Number of fingers per hand.
+    """
+    mover = state.current_player
+    player = state.players[mover]
+    opponent = state.players[1 - mover]
+    if action.kind == "move":
+        added = getattr(player, action.hand)
+        setattr(opponent, action.to_hand, (getattr(opponent, action.to_hand) + added) % fingers)
+    else:
+        other_hand = HANDS[1 - HANDS.index(action.hand)]
+        setattr(player, action.hand, getattr(player, action.hand) - action.fingers)
+        setattr(player, other_hand, (getattr(player, other_hand) + action.fingers) % fingers)
+    if opponent.left + opponent.right == 0:
+        state.winner = mover
+    else:
+        state.current_player = 1 - mover
+
+
+def position_of(players: Sequence[Player], current_player: int, fingers: int = FINGERS) -> int:
+    """
+    Get the position index of a board.
+
+    Args:
+        players (Sequence[Player]): Both players, indexed by player ID.
+        current_player (int): The player to move.
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        int: The position, an index into the tables of this module and chopsticks.solver.
+    """
+    return pack(players, current_player, -1, fingers) % position_count(fingers)
+
+
+def position_digits(fingers: int = FINGERS) -> np.ndarray:
+    """
+    Unpack every position at once.
+
+    Args:
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        np.ndarray: Shape (positions, 5): player 0 left and right, player 1 left
+        and right and the player to move.
+    """
+    index = np.arange(position_count(fingers), dtype=np.int64)
+    p1_right = index % fingers
+    p1_left = index // fingers % fingers
+    p0_right = index // fingers ** 2 % fingers
+    p0_left = index // fingers ** 3 % fingers
+    current_player = index // fingers ** 4
+    return np.stack([p0_left, p0_right, p1_left, p1_right, current_player], axis=1)
+
+
+def _pack_positions(hands: np.ndarray, current_player: np.ndarray, fingers: int) -> np.ndarray:
+    packed = ((hands[:, 0] * fingers + hands[:, 1]) * fingers + hands[:, 2]) * fingers + hands[:, 3]
+    return packed + fingers ** 4 * current_player
+
+
+@lru_cache(maxsize=None)
+def successor_table(fingers: int = FINGERS) -> np.ndarray:
+    """
+    Build the successor of every position under every action.
+
+    Args:
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        np.ndarray: Shape (positions, actions), int32. Entry [p, a] is the position
+        reached by playing actions()[a] in position p, or -1 if the action is
+        illegal there. Positions whose mover has no fingers left have no legal actions.
+    """
+    digits = position_digits(fingers)
+    mover = digits[:, 4]
+    rows = np.arange(len(digits))
+    # Columns of the mover's and opponent's hands (left, right) in digits.
+    own = np.stack([2 * mover, 2 * mover + 1], axis=1)
+    opponent = np.stack([2 - 2 * mover, 3 - 2 * mover], axis=1)
+    alive = (digits[rows, own[:, 0]] + digits[rows, own[:, 1]]) > 0
+
+    table = np.full((len(digits), len(actions(fingers))), -1, dtype=np.int32)
+    for column, action in enumerate(actions(fingers)):
+        hands = digits[:, :4].copy()
+        source = own[:, HANDS.index(action.hand)]
+        count = digits[rows, source]
+        if action.kind == "move":
+            target = opponent[:, HANDS.index(action.to_hand)]
+            hands[rows, target] = (hands[rows, target] + count) % fingers
+            legal = alive & (count > 0)
+        else:
+            other = own[:, 1 - HANDS.index(action.hand)]
+            hands[rows, source] = count - action.fingers
+            hands[rows, other] = (hands[rows, other] + action.fingers) % fingers
+            legal = alive & (count >= action.fingers)
+        successors = _pack_positions(hands, 1 - mover, fingers)
+        table[:, column] = np.where(legal, successors, -1)
+    return table
+
+
+@lru_cache(maxsize=None)
+def legal_table(fingers: int = FINGERS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    List the legal actions of every position and their successors as flat arrays.
+
+    The legal actions of position p are codes[offsets[p]:offsets[p + 1]], in the
+    order of actions(), and successors holds the position each of them leads to.
+
+    Args:
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: offsets, shape (positions + 1,),
+        then codes and successors, one int32 entry per legal (position, action) pair.
+    """
+    table = successor_table(fingers)
+    positions, codes = np.nonzero(table >= 0)
+    offsets = np.zeros(len(table) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(positions, minlength=len(table)), out=offsets[1:])
+    return offsets, codes.astype(np.int32), table[positions, codes]
+
+
+@lru_cache(maxsize=None)
+def transitions(fingers: int = FINGERS) -> List[Dict[Action, int]]:
+    """
+    Map each position's legal actions to their successors, for lookups one position at a time.
+
+    Args:
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        List[Dict[Action, int]]: Indexed by position, built from legal_table(); each
+        dict lists the legal actions in the order of actions().
+    """
+    offsets, codes, successors = (array.tolist() for array in legal_table(fingers))
+    action_list = actions(fingers)
+    return [{action_list[code]: successor for code, successor in zip(codes[start:end], successors[start:end])}
+            for start, end in zip(offsets, offsets[1:])]
+
+
+def legal_moves(players: Sequence[Player], current_player: int,
+                fingers: int = FINGERS) -> Dict[Action, int]:
+    """
+    Get the legal actions of the player to move and the positions they lead to.
+
+    Args:
+        players (Sequence[Player]): Both players, indexed by player ID.
+        current_player (int): The player to move.
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        Dict[Action, int]: The successor position of every legal action; empty
+        when the player to move has no fingers left.
+    """
+    # position_of(), inlined: this runs for every action the model plays.
+    player0, player1 = players
+    hands = ((player0.left * fingers + player0.right) * fingers + player1.left) * fingers + player1.right
+    return transitions(fingers)[hands + fingers ** 4 * current_player]
+
+
+def advance(state: GameState, successor: int, fingers: int = FINGERS) -> None:
+    """
+    Move a state to the successor of one of its legal actions, changing it in place.
+
+    The result is the one play() gives for the same action: the turn passes,
+    unless the opponent has no fingers left and the mover has won.
+
+    Args:
+        state (GameState): The game; its version is left alone.
+        successor (int): A successor position from legal_moves().
+        fingers (int): Number of fingers per hand.
+    """
+    mover = state.current_player
+    player0, player1 = state.players
+    player0.left, player0.right, player1.left, player1.right, _, _ = unpack_digits(successor, fingers)
+    opponent = state.players[1 - mover]
+    if opponent.left + opponent.right == 0:
+        state.winner = mover
+    else:
+        state.current_player = 1 - mover
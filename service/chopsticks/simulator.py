@@ -0,0 +1,100 @@
+"""Vectorized batch simulation of random games.
+
+All games advance together: positions are a NumPy array indexed into
+chopsticks.rules' successor table, so one step of N games is a handful of
+array operations instead of N ChopstickModel calls. The rules are the model's
+rules, including the modulo-FINGERS wraparound and the swap constraints, and a
+game ends as in the controller: when the player to move has no fingers left,
+the other player wins.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from chopsticks import FINGERS, Player
+from chopsticks.rules import position_of, successor_table
+
+DEFAULT_MAX_PLIES = 200
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of a batch of games.
+
+    Attributes:
+        winners (np.ndarray): Winner of every game (0 or 1), -1 if it was still running after max_plies.
+        lengths (np.ndarray): Plies played in every game.
+        positions (np.ndarray): Final position of every game.
+        actions (Optional[np.ndarray]): Shape (games, max_plies); index into rules.actions()
+                                        of every ply played, -1 after the game ended.
+                                        Only kept when requested.
+    """
+    winners: np.ndarray
+    lengths: np.ndarray
+    positions: np.ndarray
+    actions: Optional[np.ndarray] = None
+
+    def outcome_distribution(self) -> Dict[str, float]:
+        """
+        Summarize the batch.
+
+        Returns:
+            Dict[str, float]: Share of games won by each player or unfinished, and the
+                              mean length of finished games.
+        """
+        finished = self.winners >= 0
+        return {
+            "games": int(len(self.winners)),
+            "player1_wins": float(np.mean(self.winners == 0)),
+            "player2_wins": float(np.mean(self.winners == 1)),
+            "unfinished": float(np.mean(~finished)),
+            "mean_plies": float(self.lengths[finished].mean()) if finished.any() else 0.0,
+        }
+
+
+def simulate(n_games: int, max_plies: int = DEFAULT_MAX_PLIES, seed: Optional[int] = None,
+             fingers: int = FINGERS, record_actions: bool = False) -> SimulationResult:
+    """
+    Play n_games games in which both players pick uniformly among their legal actions.
+
+    Args:
+        n_games (int): Number of games to play.
+        max_plies (int): Plies after which an unfinished game is abandoned.
+        seed (Optional[int]): Seed for the random generator.
+        fingers (int): Number of fingers per hand.
+        record_actions (bool): Keep every action played, e.g. to replay the games.
+
+    Returns:
+        SimulationResult: Winners, lengths and final positions of the games.
+    """
+    rng = np.random.default_rng(seed)
+    table = successor_table(fingers)
+    lost = (table < 0).all(axis=1)
+    start = position_of([Player(1, 1), Player(1, 1)], 0, fingers)
+
+    positions = np.full(n_games, start, dtype=np.int64)
+    winners = np.full(n_games, -1, dtype=np.int8)
+    lengths = np.zeros(n_games, dtype=np.int32)
+    played = np.full((n_games, max_plies), -1, dtype=np.int8) if record_actions else None
+    active = np.arange(n_games)
+
+    for ply in range(max_plies):
+        if len(active) == 0:
+            break
+        successors = table[positions[active]]
+        # A random key per legal action; the largest key is the uniformly chosen action.
+        keys = np.where(successors >= 0, rng.random(successors.shape), -1.0)
+        chosen = keys.argmax(axis=1)
+        positions[active] = successors[np.arange(len(active)), chosen]
+        lengths[active] += 1
+        if played is not None:
+            played[active, ply] = chosen
+
+        # The new mover has lost if they have no legal action left.
+        over = lost[positions[active]]
+        mover = positions[active] // fingers ** 4
+        winners[active[over]] = 1 - mover[over]
+        active = active[~over]
+
+    return SimulationResult(winners, lengths, positions, played)
@@ -0,0 +1,135 @@
+"""Retrograde analysis of the complete game.
+
+Every position is labelled as a win, loss or draw for the player to move,
+together with the number of plies to the end of the game under perfect play
+(winners finish as fast as possible, losers hold out as long as possible).
+The table is built with whole-array NumPy passes over chopsticks.rules'
+successor table and cached per finger count, so lookups are O(1).
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+import logging
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+from chopsticks import FINGERS, Player
+from chopsticks.rules import Action, actions, position_of, successor_table
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+OUTCOME_NAMES = {WIN: "win", DRAW: "draw", LOSS: "loss"}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Solution:
+    """The solved game for one finger count.
+
+    Attributes:
+        fingers (int): Number of fingers per hand.
+        outcome (np.ndarray): WIN, DRAW or LOSS for the player to move, per position.
+        distance (np.ndarray): Plies to the end of the game under perfect play; -1 for draws.
+        best_action (np.ndarray): Index into rules.actions() of the best action; -1 if there is none.
+    """
+    fingers: int
+    outcome: np.ndarray
+    distance: np.ndarray
+    best_action: np.ndarray
+
+
+def solve(fingers: int = FINGERS) -> Solution:
+    """
+    Solve the game by retrograde analysis.
+
+    Positions whose mover has no fingers left are losses at distance 0. Each
+    pass then marks, all at once, every unsolved position with a successor lost
+    for the opponent as a win, and every unsolved position whose successors are
+    all won for the opponent as a loss. Whatever is left when a pass changes
+    nothing is a draw.
+
+    Args:
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        Solution: The outcome table.
+    """
+    start = time.perf_counter()
+    successors = successor_table(fingers)
+    legal = successors >= 0
+    safe_successors = np.where(legal, successors, 0)
+    has_action = legal.any(axis=1)
+
+    outcome = np.zeros(len(successors), dtype=np.int8)
+    distance = np.full(len(successors), -1, dtype=np.int16)
+    solved = ~has_action
+    outcome[solved] = LOSS
+    distance[solved] = 0
+
+    plies = 0
+    while True:
+        plies += 1
+        next_outcome = np.where(legal, outcome[safe_successors], DRAW)
+        next_solved = np.where(legal, solved[safe_successors], False)
+        wins = ~solved & (next_solved & (next_outcome == LOSS)).any(axis=1)
+        losses = ~solved & has_action & ~wins & (~legal | (next_solved & (next_outcome == WIN))).all(axis=1)
+        if not wins.any() and not losses.any():
+            break
+        outcome[wins] = WIN
+        outcome[losses] = LOSS
+        distance[wins | losses] = plies
+        solved |= wins | losses
+
+    next_outcome = np.where(legal, outcome[safe_successors], WIN + 1)
+    next_distance = np.where(legal, distance[safe_successors], 0).astype(np.int32)
+    # Score each action from the mover's point of view: beating the opponent
+    # quickly first, then drawing, then losing as slowly as possible.
+    score = np.select(
+        [next_outcome == LOSS, next_outcome == DRAW, next_outcome == WIN],
+        [2 * 2 ** 15 - next_distance, np.full_like(next_distance, 2 ** 15), next_distance],
+        default=-1,
+    )
+    best_action = np.where(has_action, score.argmax(axis=1), -1).astype(np.int8)
+
+    logger.info("Solved %s positions for %s fingers in %s passes, %.3fs.",
+                len(outcome), fingers, plies, time.perf_counter() - start)
+    return Solution(fingers, outcome, distance, best_action)
+
+
+@lru_cache(maxsize=None)
+def get_solution(fingers: int = FINGERS) -> Solution:
+    """
+    Get the solution for a finger count, solving it on first use.
+
+    Args:
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        Solution: The cached outcome table.
+    """
+    return solve(fingers)
+
+
+def lookup(players: Sequence[Player], current_player: int, fingers: int = FINGERS):
+    """
+    Look up a board in the solution.
+
+    Args:
+        players (Sequence[Player]): Both players, indexed by player ID.
+        current_player (int): The player to move.
+        fingers (int): Number of fingers per hand.
+
+    Returns:
+        Tuple[Optional[Action], str, int]: The best action (None if the mover cannot
+        act), the outcome for the mover ("win", "loss" or "draw") and the plies to
+        the end of the game (-1 for a draw).
+    """
+    solution = get_solution(fingers)
+    position = position_of(players, current_player, fingers)
+    action_index = int(solution.best_action[position])
+    action: Optional[Action] = actions(fingers)[action_index] if action_index >= 0 else None
+    return action, OUTCOME_NAMES[int(solution.outcome[position])], int(solution.distance[position])
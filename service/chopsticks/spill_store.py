@@ -0,0 +1,92 @@
+"""On-disk store for games evicted from memory.
+
+A game that lives only in the process (PassthroughDAO) is written here when
+the registry evicts it, and read back on its next request. Each game is one
+row of a WITHOUT ROWID table: its id, the whole game packed into one small
+integer by chopsticks.packed_state, and its version, so that ETags stay
+valid across an eviction.
+"""
+import logging
+from typing import Optional
+
+from chopsticks import GameState
+from chopsticks.dao.sqlite_pool import get_pool
+from chopsticks.packed_state import pack, unpack
+
+DEFAULT_SPILL_PATH = "chopsticks-spill.db"
+
+logger = logging.getLogger(__name__)
+
+
+class SpillStore:
+    """Evicted games, keyed by game id, in an SQLite database.
+
+    Attributes:
+        db_path (str): The file path to the SQLite database.
+        pool (SQLiteConnectionPool): The connection pool for db_path.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_SPILL_PATH, pragma_profile: str = "performance"):
+        self.db_path = db_path
+        self.pool = get_pool(db_path, pragma_profile)
+        with self.pool.connection() as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS spilled_games (
+                            game_id TEXT PRIMARY KEY,
+                            state INTEGER NOT NULL,
+                            version INTEGER NOT NULL) WITHOUT ROWID''')
+            conn.commit()
+        logger.debug("Spill store opened at %s.", db_path)
+
+    def save(self, game_id: str, state: GameState) -> None:
+        """Store a game, replacing any earlier copy."""
+        with self.pool.connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO spilled_games (game_id, state, version) VALUES (?, ?, ?)',
+                         (game_id, pack(state.players, state.current_player, state.winner), state.version))
+            conn.commit()
+
+    def load(self, game_id: str) -> Optional[GameState]:
+        """
+        Read a stored game.
+
+        Args:
+            game_id (str): The id of the game.
+
+        Returns:
+            Optional[GameState]: The game as it was saved, or None if it is not stored.
+        """
+        with self.pool.connection() as conn:
+            row = conn.execute('SELECT state, version FROM spilled_games WHERE game_id = ?', (game_id,)).fetchone()
+        if row is None:
+            return None
+        players, current_player, winner = unpack(row[0])
+        return GameState(players, current_player, winner, row[1])
+
+    def delete(self, game_id: str) -> bool:
+        """
+        Forget a stored game.
+
+        Args:
+            game_id (str): The id of the game.
+
+        Returns:
+            bool: Whether the game was stored.
+        """
+        with self.pool.connection() as conn:
+            deleted = conn.execute('DELETE FROM spilled_games WHERE game_id = ?', (game_id,)).rowcount
+            conn.commit()
+        return deleted > 0
+
+    def clear(self) -> int:
+        """Forget every stored game.
+
+        Returns:
+            int: The number of games forgotten.
+        """
+        with self.pool.connection() as conn:
+            count = conn.execute('DELETE FROM spilled_games').rowcount
+            conn.commit()
+        return count
+
+    def __len__(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM spilled_games').fetchone()[0]
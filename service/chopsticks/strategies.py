@@ -0,0 +1,132 @@
+"""Policies that pick an action for the player to move.
+
+Used by the tournament runner to compare playing strength. Every strategy
+only chooses among the legal actions of chopsticks.rules.
+"""
+from abc import ABC, abstractmethod
+import random
+from typing import Any, List, Sequence, Tuple
+
+from chopsticks import FINGERS, Player, solver
+from chopsticks.engine import SearchEngine
+from chopsticks.rules import Action, actions, position_of, successor_table
+
+
+class Strategy(ABC):
+    """Base class for strategies."""
+
+    name = "strategy"
+
+    def __init__(self, fingers: int = FINGERS):
+        self.fingers = fingers
+        self.actions = actions(fingers)
+        self.moves: List[List[Tuple[int, int]]] = [
+            [(action, successor) for action, successor in enumerate(row) if successor >= 0]
+            for row in successor_table(fingers).tolist()
+        ]
+
+    @abstractmethod
+    def choose_action(self, players: Sequence[Player], current_player: int, rng: random.Random) -> Action:
+        """
+        Pick an action.
+
+        Args:
+            players (Sequence[Player]): Both players, indexed by player ID.
+            current_player (int): The player to move. They must have a legal action.
+            rng (random.Random): Source of randomness for ties and random play.
+
+        Returns:
+            Action: The chosen action.
+        """
+        raise NotImplementedError
+
+
+class RandomStrategy(Strategy):
+    """Picks uniformly among the legal actions."""
+
+    name = "random"
+
+    def choose_action(self, players: Sequence[Player], current_player: int, rng: random.Random) -> Action:
+        action, _ = rng.choice(self.moves[position_of(players, current_player, self.fingers)])
+        return self.actions[action]
+
+
+class GreedyStrategy(Strategy):
+    """Looks one move ahead: wins at once if it can, and avoids handing the opponent
+    an immediate win or an empty hand if it can't."""
+
+    name = "greedy"
+
+    def choose_action(self, players: Sequence[Player], current_player: int, rng: random.Random) -> Action:
+        moves = self.moves[position_of(players, current_player, self.fingers)]
+
+        def score(move: Tuple[int, int]) -> Tuple[int, int, float]:
+            successor = move[1]
+            replies = self.moves[successor]
+            if not replies:
+                return (2, 0, rng.random())
+            opponent_wins = any(not self.moves[reply] for _, reply in replies)
+            opponent_empty = sum(digit == 0 for digit in self._opponent_hands(successor))
+            return (0 if opponent_wins else 1, opponent_empty, rng.random())
+
+        action, _ = max(moves, key=score)
+        return self.actions[action]
+
+    def _opponent_hands(self, successor: int) -> Tuple[int, int]:
+        # In the successor the opponent is the player to move.
+        hands = successor % self.fingers ** 4
+        mover = successor // self.fingers ** 4
+        if mover == 0:
+            return hands // self.fingers ** 3, hands // self.fingers ** 2 % self.fingers
+        return hands // self.fingers % self.fingers, hands % self.fingers
+
+
+class SearchStrategy(Strategy):
+    """Plays the computer opponent's alpha-beta search."""
+
+    name = "search"
+
+    def __init__(self, fingers: int = FINGERS, time_budget: float = 0.005, max_depth: int = 8):
+        super().__init__(fingers)
+        self.engine = SearchEngine(time_budget=time_budget, max_depth=max_depth, fingers=fingers)
+
+    def choose_action(self, players: Sequence[Player], current_player: int, rng: random.Random) -> Action:
+        return self.engine.choose_action(players, current_player)
+
+
+class PerfectStrategy(Strategy):
+    """Plays the solver's best action."""
+
+    name = "perfect"
+
+    def choose_action(self, players: Sequence[Player], current_player: int, rng: random.Random) -> Action:
+        action, _, _ = solver.lookup(players, current_player, self.fingers)
+        return action
+
+
+STRATEGIES = {
+    "random": RandomStrategy,
+    "greedy": GreedyStrategy,
+    "search": SearchStrategy,
+    "perfect": PerfectStrategy,
+}
+
+
+def get_strategy(name: str, *args: Any, **kwargs: Any) -> Strategy:
+    """
+    Build a strategy by name.
+
+    Args:
+        name (str): A key of STRATEGIES.
+
+    Returns:
+        Strategy: The strategy.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    try:
+        strategy_class = STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown strategy {name}. Expected one of: {', '.join(STRATEGIES)}.") from None
+    return strategy_class(*args, **kwargs)
@@ -0,0 +1,176 @@
+"""Round-robin self-play tournaments.
+
+Games are split into shards that run in a process pool. Every shard is played
+on a game of its own, a ChopstickModel over an in-memory PassthroughDAO, so the
+rules are the service's own and nothing is shared with the controller or other
+shards. Workers return win counts that are merged into one table.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import itertools
+import logging
+import random
+import time
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from chopsticks.chopstick_model import ChopstickModel
+from chopsticks.strategies import Strategy, get_strategy
+
+DEFAULT_MAX_PLIES = 200
+
+FIRST_WINS = 0
+SECOND_WINS = 1
+UNFINISHED = 2
+
+
+class Shard(NamedTuple):
+    """A batch of games between two strategies, first seat moving first."""
+    first: str
+    second: str
+    games: int
+    seed: int
+    max_plies: int
+
+
+@dataclass
+class TournamentResult:
+    """Merged results of a tournament.
+
+    Attributes:
+        counts (Dict[Tuple[str, str], List[int]]): Per (first, second) pairing: first-seat wins,
+                                                   second-seat wins and unfinished games.
+        elapsed (float): Wall-clock seconds.
+        workers (int): Number of worker processes.
+    """
+    counts: Dict[Tuple[str, str], List[int]] = field(default_factory=dict)
+    elapsed: float = 0.0
+    workers: int = 1
+
+    @property
+    def games(self) -> int:
+        return sum(sum(count) for count in self.counts.values())
+
+    def merge(self, counts: Dict[Tuple[str, str], List[int]]) -> None:
+        """Add the counts of one shard."""
+        for pairing, count in counts.items():
+            total = self.counts.setdefault(pairing, [0, 0, 0])
+            for index, value in enumerate(count):
+                total[index] += value
+
+    def win_rates(self) -> Dict[str, Dict[str, float]]:
+        """
+        Win rate of every strategy against every other, over both seats.
+
+        Returns:
+            Dict[str, Dict[str, float]]: rates[a][b] is the share of a-versus-b games that a won.
+        """
+        wins: Dict[Tuple[str, str], int] = {}
+        played: Dict[Tuple[str, str], int] = {}
+        for (first, second), (first_wins, second_wins, unfinished) in self.counts.items():
+            total = first_wins + second_wins + unfinished
+            for a, b, a_wins in ((first, second, first_wins), (second, first, second_wins)):
+                wins[a, b] = wins.get((a, b), 0) + a_wins
+                played[a, b] = played.get((a, b), 0) + total
+        rates: Dict[str, Dict[str, float]] = {}
+        for (a, b), total in played.items():
+            rates.setdefault(a, {})[b] = wins[a, b] / total if total else 0.0
+        return rates
+
+
+def _init_worker() -> None:
+    # Only in pool processes: per-move logging would dominate the games.
+    logging.getLogger("chopsticks").setLevel(logging.WARNING)
+
+
+def play_game(model: ChopstickModel, first: Strategy, second: Strategy, rng: random.Random,
+              max_plies: int = DEFAULT_MAX_PLIES) -> int:
+    """
+    Play one game, resetting the model's game first.
+
+    Args:
+        model (ChopstickModel): The game to play on.
+        first (Strategy): Strategy for player 0, who moves first.
+        second (Strategy): Strategy for player 1.
+        rng (random.Random): Source of randomness for the strategies.
+        max_plies (int): Plies after which the game is abandoned.
+
+    Returns:
+        int: FIRST_WINS, SECOND_WINS or UNFINISHED.
+    """
+    model.init_game()
+    state = model.get_state()
+    seats = (first, second)
+    for _ in range(max_plies):
+        player = state.current_player
+        action = seats[player].choose_action(state.players, player, rng)
+        if action.kind == "move":
+            state = model.move(player, action.hand, action.to_hand)
+        else:
+            state = model.swap(player, action.hand, action.fingers)
+        if state.winner != -1:
+            return state.winner
+    return UNFINISHED
+
+
+def play_shard(shard: Shard) -> Dict[Tuple[str, str], List[int]]:
+    """
+    Play a shard of games on a game of its own. Runs inside a worker process,
+    or in the calling process, whose state it leaves alone.
+
+    Args:
+        shard (Shard): The games to play.
+
+    Returns:
+        Dict[Tuple[str, str], List[int]]: The shard's counts, keyed by (first, second).
+    """
+    model = ChopstickModel("passthrough", new_game=False)
+    rng = random.Random(shard.seed)
+    first, second = get_strategy(shard.first), get_strategy(shard.second)
+    counts = [0, 0, 0]
+    for _ in range(shard.games):
+        counts[play_game(model, first, second, rng, shard.max_plies)] += 1
+    return {(shard.first, shard.second): counts}
+
+
+def make_shards(strategies: Sequence[str], games_per_pairing: int, shard_size: int, seed: int,
+                max_plies: int = DEFAULT_MAX_PLIES) -> List[Shard]:
+    """
+    Split a round robin into shards. Every ordered pair of distinct strategies
+    plays games_per_pairing games, so each pairing is played from both seats.
+
+    Args:
+        strategies (Sequence[str]): Strategy names.
+        games_per_pairing (int): Games per ordered pairing.
+        shard_size (int): Maximum games per shard.
+        seed (int): Base seed; every shard gets its own derived seed.
+        max_plies (int): Plies after which a game is abandoned.
+
+    Returns:
+        List[Shard]: The shards.
+    """
+    shards = []
+    for first, second in itertools.permutations(strategies, 2):
+        for start in range(0, games_per_pairing, shard_size):
+            games = min(shard_size, games_per_pairing - start)
+            shards.append(Shard(first, second, games, seed + len(shards), max_plies))
+    return shards
+
+
+def run_tournament(shards: Sequence[Shard], workers: int) -> TournamentResult:
+    """
+    Play every shard in a pool of worker processes and merge the results.
+
+    Args:
+        shards (Sequence[Shard]): The shards to play.
+        workers (int): Number of worker processes.
+
+    Returns:
+        TournamentResult: The merged counts and timing.
+    """
+    result = TournamentResult(workers=workers)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for counts in pool.map(play_shard, shards):
+            result.merge(counts)
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from chopsticks import GameState, Player
+from chopsticks.chopstick_model import ChopstickModel
+from chopsticks.dao.caching_dao import CachingDAO, close_flushers
+from chopsticks.dao.sqlite_dao import SQLiteDAO
+from chopsticks.dao.sqlite_pool import close_pools
+
+
+@pytest.fixture(autouse=True)
+def cleanup():
+    yield
+    close_flushers()
+    close_pools()
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "chopsticks.db")
+
+def make_dao(db_path, **kwargs):
+    """A caching DAO over SQLite whose background flusher never fires during a test."""
+    kwargs.setdefault("flush_interval", 3600)
+    dao = CachingDAO(sqlite_db_path=db_path, **kwargs)
+    dao.init()
+    return dao
+
+def test_reads_come_from_memory(db_path, mocker):
+    dao = make_dao(db_path)
+    backend_reads = mocker.spy(dao.backend, "get_state")
+    assert dao.get_board() == [Player(1, 1), Player(1, 1)]
+    assert dao.get_player(1) == Player(1, 1)
+    assert dao.get_state().version == 1
+    backend_reads.assert_not_called()
+
+def test_writes_are_coalesced(db_path, mocker):
+    dao = make_dao(db_path)
+    backend_writes = mocker.spy(dao.backend, "compare_and_set")
+    for version in range(1, 11):
+        assert dao.compare_and_set(version, GameState([Player(version % 5, 1), Player(1, 1)], version % 2))
+    dao.set_player_hand(1, "right", 3)
+    assert SQLiteDAO(db_path).get_board() == [Player(1, 1), Player(1, 1)]
+
+    assert dao.flush()
+    assert backend_writes.call_count == 1
+    assert SQLiteDAO(db_path).get_state() == GameState([Player(0, 1), Player(1, 3)], 0, -1, 2)
+    assert not dao.flush()
+
+def test_compare_and_set_conflict(db_path):
+    dao = make_dao(db_path)
+    assert dao.compare_and_set(1, GameState([Player(2, 1), Player(1, 1)], 1))
+    assert not dao.compare_and_set(1, GameState([Player(3, 1), Player(1, 1)], 1))
+    assert dao.get_state() == GameState([Player(2, 1), Player(1, 1)], 1, -1, 2)
+
+def test_background_flush(db_path):
+    dao = make_dao(db_path, flush_interval=0.01)
+    dao.set_hands([(0, "left", 4)])
+    deadline = time.monotonic() + 5
+    while SQLiteDAO(db_path).get_player(0) != Player(4, 1):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def test_durability_bound(db_path):
+    dao = make_dao(db_path, max_unflushed=3)
+    dao.set_player_hand(0, "left", 2)
+    dao.set_player_hand(0, "left", 3)
+    assert SQLiteDAO(db_path).get_player(0) == Player(1, 1)
+    dao.set_player_hand(0, "left", 4)
+    assert SQLiteDAO(db_path).get_player(0) == Player(4, 1)
+
+def test_flush_on_shutdown(db_path):
+    dao = make_dao(db_path)
+    dao.set_player_hand(1, "left", 0)
+    close_flushers()
+    assert SQLiteDAO(db_path).get_player(1) == Player(0, 1)
+
+def test_failed_flush_is_retried(db_path, mocker):
+    dao = make_dao(db_path)
+    dao.set_player_hand(0, "right", 2)
+    mocker.patch.object(dao.backend, "compare_and_set", side_effect=OSError("disk full"))
+    assert not dao.flush()
+    mocker.stopall()
+    assert dao.flush()
+    assert SQLiteDAO(db_path).get_player(0) == Player(1, 2)
+
+def test_reset_and_delete_write_through(db_path):
+    dao = make_dao(db_path)
+    dao.set_player_hand(0, "left", 3)
+    dao.init()
+    assert not dao.flush()
+    assert SQLiteDAO(db_path).get_state().version == 2
+    dao.delete_game()
+    assert dao.get_state() is None
+    assert SQLiteDAO(db_path).get_state() is None
+
+def test_invalid_hand(db_path):
+    dao = make_dao(db_path)
+    with pytest.raises(ValueError):
+        dao.set_hands([(0, "left", 0), (0, "middle", 2)])
+    assert dao.get_board() == [Player(1, 1), Player(1, 1)]
+
+def test_model_over_cache(db_path):
+    model = ChopstickModel("caching", sqlite_db_path=db_path, flush_interval=3600)
+    model.move(0, "left", "left")
+    model.swap(1, "left", 1)
+    close_flushers()
+    assert SQLiteDAO(db_path).get_state() == GameState([Player(1, 1), Player(1, 2)], 0, -1, 2)
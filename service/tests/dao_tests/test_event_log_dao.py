@@ -0,0 +1,97 @@
+import pytest
+
+from chopsticks import GameState, Player
+from chopsticks.chopstick_model import MAX_UPDATE_ATTEMPTS, ChopstickModel, ConcurrentUpdateError
+from chopsticks.dao.event_log_dao import EventLogDAO
+from chopsticks.dao.sqlite_pool import close_pools
+from chopsticks.rules import Action
+
+
+@pytest.fixture
+def log_dao(tmp_path):
+    """Fixture to create an initialized EventLogDAO that snapshots every 4 versions."""
+    dao = EventLogDAO(str(tmp_path / "chopsticks.db"), snapshot_interval=4)
+    dao.init()
+    yield dao
+    close_pools()
+
+def rows(dao, table):
+    with dao.pool.connection() as conn:
+        return conn.execute(f'SELECT version FROM {table} WHERE game_id = ? ORDER BY version',
+                            (dao.game_id,)).fetchall()
+
+def test_init(log_dao):
+    assert log_dao.get_state() == GameState([Player(1, 1), Player(1, 1)], 0, -1, 1)
+    assert rows(log_dao, "game_snapshots") == [(1,)]
+
+def test_writes_are_appended(log_dao):
+    state = log_dao.get_state()
+    state.players[1].left = 2
+    state.current_player = 1
+    state.actions.append(Action("move", "left", to_hand="left"))
+    assert log_dao.compare_and_set(1, state)
+    log_dao.set_player_hand(0, "right", 3)
+    assert log_dao.get_state() == GameState([Player(1, 3), Player(2, 1)], 1, -1, 3)
+    with log_dao.pool.connection() as conn:
+        events = conn.execute('SELECT version, actions IS NULL, state IS NULL FROM game_events').fetchall()
+    # The move is logged as an action, the hand set by hand as a whole state.
+    assert events == [(1, 1, 0), (2, 0, 1), (3, 1, 0)]
+
+def test_compare_and_set_conflict(log_dao):
+    assert log_dao.compare_and_set(1, GameState([Player(2, 1), Player(1, 1)], 1))
+    assert not log_dao.compare_and_set(1, GameState([Player(3, 1), Player(1, 1)], 1))
+    assert not log_dao.compare_and_set(5, GameState([Player(3, 1), Player(1, 1)], 1))
+    assert log_dao.get_state() == GameState([Player(2, 1), Player(1, 1)], 1, -1, 2)
+    assert log_dao.get_version() == 2
+
+def test_load_replays_only_the_tail(log_dao):
+    model = ChopstickModel("sqlite_log", sqlite_db_path=log_dao.db_path, snapshot_interval=4, new_game=False)
+    for _ in range(3):
+        model.move(0, "left", "right")
+        model.move(1, "left", "right")
+    assert rows(log_dao, "game_snapshots") == [(1,), (4,)]
+    assert [state.version for state in log_dao.replay()] == [4, 5, 6, 7]
+    assert log_dao.get_state() == model.get_state()
+
+def test_full_replay_matches_the_game(log_dao):
+    model = ChopstickModel("sqlite_log", sqlite_db_path=log_dao.db_path, new_game=False)
+    history = [model.get_state()]
+    history.append(model.move(0, "left", "right"))
+    history.append(model.swap(1, "right", 2))
+    model.restore_state([Player(0, 4), Player(1, 1)], 1, -1)
+    history.append(model.get_state())
+    history.append(model.move(1, "right", "right"))
+    replayed = [GameState([Player(p.left, p.right) for p in state.players], state.current_player,
+                          state.winner, state.version) for state in log_dao.replay(from_snapshot=False)]
+    assert replayed == history
+    assert history[-1].winner == 1
+
+def test_reset_keeps_history(log_dao):
+    log_dao.set_player_hand(0, "left", 3)
+    log_dao.init()
+    assert log_dao.get_state() == GameState([Player(1, 1), Player(1, 1)], 0, -1, 3)
+    assert [state.version for state in log_dao.replay(from_snapshot=False)] == [1, 2, 3]
+
+def test_games_are_isolated(log_dao):
+    other = EventLogDAO(log_dao.db_path, game_id="other")
+    other.init()
+    other.set_player_hand(0, "left", 3)
+    assert log_dao.get_player(0) == Player(1, 1)
+    other.delete_game()
+    assert other.get_board() is None
+    assert rows(other, "game_events") == []
+
+def test_set_hands_invalid_hand(log_dao):
+    with pytest.raises(ValueError):
+        log_dao.set_hands([(0, "left", 0), (0, "middle", 2)])
+    assert log_dao.get_version() == 1
+
+def test_set_hands_gives_up_under_contention(log_dao, mocker):
+    compare_and_set = mocker.patch.object(log_dao, "compare_and_set", return_value=False)
+    with pytest.raises(ConcurrentUpdateError):
+        log_dao.set_hands([(0, "left", 2)])
+    assert compare_and_set.call_count == MAX_UPDATE_ATTEMPTS
+
+def test_uninitialized_database(tmp_path):
+    assert EventLogDAO(str(tmp_path / "empty.db")).get_state() is None
+    close_pools()
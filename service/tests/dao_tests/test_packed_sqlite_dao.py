@@ -0,0 +1,49 @@
+import pytest
+
+from chopsticks import GameState, Player
+from chopsticks.dao.packed_sqlite_dao import PackedSQLiteDAO
+from chopsticks.dao.sqlite_pool import close_pools
+from chopsticks.packed_state import pack
+
+
+@pytest.fixture
+def packed_dao(tmp_path):
+    """Fixture to create an initialized PackedSQLiteDAO backed by a temporary database."""
+    dao = PackedSQLiteDAO(str(tmp_path / "chopsticks.db"))
+    dao.init()
+    yield dao
+    close_pools()
+
+def test_init(packed_dao):
+    assert packed_dao.get_board() == [Player(1, 1), Player(1, 1)]
+    with packed_dao.pool.connection() as conn:
+        assert conn.execute('SELECT state FROM packed_games').fetchall() == [(pack([Player(1, 1), Player(1, 1)]),)]
+
+def test_set_hands(packed_dao):
+    packed_dao.set_hands([(0, "left", 0), (0, "right", 2), (1, "left", 4)])
+    assert packed_dao.get_board() == [Player(0, 2), Player(4, 1)]
+    packed_dao.set_player_hand(1, "right", 3)
+    assert packed_dao.get_player(1) == Player(4, 3)
+
+def test_set_hands_invalid_hand(packed_dao):
+    with pytest.raises(ValueError):
+        packed_dao.set_hands([(0, "left", 0), (0, "middle", 2)])
+    assert packed_dao.get_board() == [Player(1, 1), Player(1, 1)]
+
+def test_games_are_isolated(packed_dao):
+    other = PackedSQLiteDAO(packed_dao.db_path, game_id="other")
+    other.init()
+    other.set_player_hand(0, "left", 3)
+    assert packed_dao.get_player(0) == Player(1, 1)
+    other.delete_game()
+    assert other.get_board() is None
+
+def test_state(packed_dao):
+    assert packed_dao.get_state() == GameState([Player(1, 1), Player(1, 1)], 0, -1, 1)
+    assert packed_dao.compare_and_set(1, GameState([Player(1, 1), Player(2, 1)], 1, -1))
+    assert not packed_dao.compare_and_set(1, GameState([Player(0, 0), Player(2, 1)], 1, 1))
+    assert packed_dao.get_state() == GameState([Player(1, 1), Player(2, 1)], 1, -1, 2)
+    packed_dao.set_player_hand(0, "left", 4)
+    assert packed_dao.get_version() == 3
+    packed_dao.init()
+    assert packed_dao.get_state() == GameState([Player(1, 1), Player(1, 1)], 0, -1, 4)
@@ -1,7 +1,8 @@
 import pytest
 
 from chopsticks.dao.passthrough_dao import PassthroughDAO
-from chopsticks import Player
+from chopsticks import GameState, Player
+from chopsticks.packed_state import pack
 
 
 @pytest.fixture
@@ -17,12 +18,59 @@ def test_init_players(passthrough_dao):
 # Test getting player hands
 def test_get_player(passthrough_dao):
     assert passthrough_dao.get_player(0) == Player(1, 1)
-    passthrough_dao.players[1].right = 3
+    passthrough_dao.set_player_hand(1, "right", 3)
     assert passthrough_dao.get_player(1) == Player(1, 3)
 
 # Test setting player hands
 def test_set_player(passthrough_dao):
     passthrough_dao.set_player_hand(0, "left", 2)
-    assert passthrough_dao.players[0].left == 2
+    assert passthrough_dao.get_player(0).left == 2
     passthrough_dao.set_player_hand(1, "right", 4)
-    assert passthrough_dao.players[1].right == 4
\ No newline at end of file
+    assert passthrough_dao.get_player(1).right == 4
+    assert passthrough_dao.get_board() == [Player(2, 1), Player(1, 4)]
+
+def test_get_board(passthrough_dao):
+    passthrough_dao.set_player_hand(1, "right", 3)
+    board = passthrough_dao.get_board()
+    assert board == [Player(1, 1), Player(1, 3)]
+    board[0].left = 4
+    assert passthrough_dao.get_player(0) == Player(1, 1)
+
+def test_set_hands(passthrough_dao):
+    passthrough_dao.set_hands([(0, "left", 0), (0, "right", 2)])
+    assert passthrough_dao.get_board() == [Player(0, 2), Player(1, 1)]
+
+def test_set_hands_is_atomic(passthrough_dao):
+    with pytest.raises(ValueError):
+        passthrough_dao.set_hands([(0, "left", 0), (0, "middle", 2)])
+    assert passthrough_dao.get_board() == [Player(1, 1), Player(1, 1)]
+
+def test_compare_and_set(passthrough_dao):
+    state = passthrough_dao.get_state()
+    version = state.version
+    assert state == GameState([Player(1, 1), Player(1, 1)], 0, -1, version)
+    state.players[1].left = 2
+    state.current_player = 1
+    assert passthrough_dao.compare_and_set(version, state)
+    assert not passthrough_dao.compare_and_set(version, GameState([Player(0, 0), Player(0, 0)], 0, 1))
+    assert passthrough_dao.get_state() == GameState([Player(1, 1), Player(2, 1)], 1, -1, version + 1)
+    state.players[0].left = 4
+    assert passthrough_dao.get_player(0) == Player(1, 1)
+
+def test_load_keeps_version(passthrough_dao):
+    passthrough_dao.load(GameState([Player(2, 0), Player(1, 3)], 1, -1, 42))
+    assert passthrough_dao.get_state() == GameState([Player(2, 0), Player(1, 3)], 1, -1, 42)
+
+def test_new_games_start_above_earlier_ones(passthrough_dao):
+    # Nothing is kept for deleted games; a later incarnation starts above every earlier one.
+    passthrough_dao.set_hands([(0, "left", 2)] * 3)
+    passthrough_dao.delete_game()
+    assert PassthroughDAO().get_version() > passthrough_dao.version
+
+def test_state_is_one_packed_int(passthrough_dao):
+    passthrough_dao.compare_and_set(passthrough_dao.version, GameState([Player(0, 2), Player(3, 4)], 1, 1))
+    assert passthrough_dao.state == pack([Player(0, 2), Player(3, 4)], 1, 1)
+    assert not hasattr(passthrough_dao, "__dict__")
+    passthrough_dao.delete_game()
+    assert passthrough_dao.get_state() is None
+    assert passthrough_dao.get_board() is None
@@ -2,9 +2,17 @@ import sqlite3
 import pytest
 
 from chopsticks.dao.sqlite_dao import SQLiteDAO
-from chopsticks import Player
+from chopsticks.dao.sqlite_pool import close_pools
+from chopsticks import GameState, Player
 
 
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    """Fixture to make sure no pooled connection leaks between tests."""
+    close_pools()
+    yield
+    close_pools()
+
 @pytest.fixture
 def sqlite_dao():
     """Fixture to create a SQLiteDAO instance with a mocked database path."""
@@ -39,20 +47,35 @@ def test_init_creates_tables(sqlite_dao, mocked_conn):
     sqlite_dao.init()
 
     # Ensure connect was called correctly
-    sqlite3.connect.assert_called_once_with('dummy_path.db')
+    sqlite3.connect.assert_called_once_with('dummy_path.db', check_same_thread=False)
 
     # Check if cursor.execute was called correctly
     normalized_executed_sql_queries = [normalize_sql(call[0][0]) for call in cursor.execute.call_args_list]
 
     normalized_expected_sql_queries = [normalize_sql(sql) for sql in [
-        '''DROP TABLE IF EXISTS players''',
-        '''CREATE TABLE players (
-                          player_id INTEGER PRIMARY KEY,
+        '''CREATE TABLE IF NOT EXISTS game_players (
+                          game_id TEXT NOT NULL,
+                          player_id INTEGER NOT NULL,
                           left_hand INTEGER,
-                          right_hand INTEGER)''',
-        '''Insert into players (player_id, left_hand, right_hand) values
-                          (0, 1, 1),
-                          (1, 1, 1)'''
+                          right_hand INTEGER,
+                          PRIMARY KEY (game_id, player_id))''',
+        '''CREATE TABLE IF NOT EXISTS games (
+                          game_id TEXT PRIMARY KEY,
+                          current_player INTEGER NOT NULL,
+                          winner INTEGER NOT NULL,
+                          version INTEGER NOT NULL)''',
+        '''CREATE TABLE IF NOT EXISTS game_tombstones (
+                          game_id TEXT PRIMARY KEY,
+                          version INTEGER NOT NULL)''',
+        '''DELETE FROM game_players WHERE game_id = ?''',
+        '''Insert into game_players (game_id, player_id, left_hand, right_hand) values
+                          (?, 0, 1, 1),
+                          (?, 1, 1, 1)''',
+        '''INSERT INTO games (game_id, current_player, winner, version) VALUES (?, 0, -1,
+                          COALESCE((SELECT version FROM game_tombstones WHERE game_id = ?), 0) + 1)
+                          ON CONFLICT (game_id) DO UPDATE SET current_player = 0, winner = -1,
+                          version = version + 1''',
+        '''DELETE FROM game_tombstones WHERE game_id = ?'''
     ]]
 
     # Check if the expected and executed SQL queries match in both content and order
@@ -80,7 +103,7 @@ def test_get_player(sqlite_dao, mocked_conn):
 
     # Ensure the SQL query was executed correctly
     cursor_mock.execute.assert_called_once_with(
-        'SELECT left_hand, right_hand FROM players WHERE player_id = ?', (1,))
+        'SELECT left_hand, right_hand FROM game_players WHERE game_id = ? AND player_id = ?', ('default', 1))
 
 def test_set_player_hands(sqlite_dao, mocked_conn):
     conn_mock, cursor_mock = mocked_conn
@@ -92,8 +115,10 @@ def test_set_player_hands(sqlite_dao, mocked_conn):
 
     # Check if the correct SQL update commands were executed in the correct order
     expected_calls = [
-        (('UPDATE players SET left_hand = ? WHERE player_id = ?', (4, 1)),),
-        (('UPDATE players SET right_hand = ? WHERE player_id = ?', (2, 0)),)
+        (('UPDATE game_players SET left_hand = ? WHERE game_id = ? AND player_id = ?', (4, 'default', 1)),),
+        (('UPDATE games SET version = version + 1 WHERE game_id = ?', ('default',)),),
+        (('UPDATE game_players SET right_hand = ? WHERE game_id = ? AND player_id = ?', (2, 'default', 0)),),
+        (('UPDATE games SET version = version + 1 WHERE game_id = ?', ('default',)),)
     ]
 
     # Retrieve the actual calls made to cursor.execute()
@@ -104,3 +129,102 @@ def test_set_player_hands(sqlite_dao, mocked_conn):
 
     # Ensure the transaction was committed to the database twice
     assert conn_mock.commit.call_count == 2, "Database commit was not called twice as expected"
+
+
+def test_games_are_isolated(tmp_path):
+    db_path = str(tmp_path / "chopsticks.db")
+    first = SQLiteDAO(db_path, game_id="first")
+    second = SQLiteDAO(db_path, game_id="second")
+    first.init()
+    second.init()
+
+    first.set_player_hand(0, "left", 3)
+    assert first.get_player(0) == Player(3, 1)
+    assert second.get_player(0) == Player(1, 1)
+
+    second.init()
+    assert first.get_player(0) == Player(3, 1)
+
+    first.delete_game()
+    assert first.get_player(0) is None
+    assert second.get_player(0) == Player(1, 1)
+
+
+def test_connections_are_reused(sqlite_dao, mocked_conn):
+    _, cursor_mock = mocked_conn
+    cursor_mock.fetchone.return_value = (1, 1)
+    sqlite_dao.init()
+    sqlite_dao.get_player(0)
+    sqlite_dao.set_player_hand(0, "left", 2)
+    sqlite_dao.get_player(0)
+
+    sqlite3.connect.assert_called_once_with('dummy_path.db', check_same_thread=False)
+
+def test_pragma_profile(tmp_path):
+    dao = SQLiteDAO(str(tmp_path / "chopsticks.db"), sqlite_pragma_profile="performance")
+    dao.init()
+    with dao.pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        assert conn.execute("PRAGMA synchronous").fetchone() == (1,)
+
+def test_unknown_pragma_profile():
+    with pytest.raises(ValueError, match="Unknown PRAGMA profile"):
+        SQLiteDAO("dummy_path.db", sqlite_pragma_profile="turbo")
+
+
+def test_get_board(sqlite_dao, mocked_conn):
+    _, cursor_mock = mocked_conn
+    cursor_mock.fetchall.return_value = [(1, 2), (3, 4)]
+
+    assert sqlite_dao.get_board() == [Player(1, 2), Player(3, 4)]
+    cursor_mock.execute.assert_called_once_with(
+        'SELECT left_hand, right_hand FROM game_players WHERE game_id = ? ORDER BY player_id', ('default',))
+
+def test_set_hands_commits_once(sqlite_dao, mocked_conn):
+    conn_mock, cursor_mock = mocked_conn
+
+    sqlite_dao.set_hands([(0, "left", 1), (0, "right", 3)])
+
+    assert cursor_mock.execute.call_args_list == [
+        (('UPDATE game_players SET left_hand = ? WHERE game_id = ? AND player_id = ?', (1, 'default', 0)),),
+        (('UPDATE game_players SET right_hand = ? WHERE game_id = ? AND player_id = ?', (3, 'default', 0)),),
+        (('UPDATE games SET version = version + 1 WHERE game_id = ?', ('default',)),)
+    ]
+    assert conn_mock.commit.call_count == 1
+
+def test_failed_transaction_is_rolled_back(tmp_path):
+    dao = SQLiteDAO(str(tmp_path / "chopsticks.db"))
+    dao.init()
+    with pytest.raises(sqlite3.OperationalError):
+        with dao.pool.connection() as conn:
+            conn.execute('UPDATE game_players SET left_hand = 0 WHERE game_id = ?', ('default',))
+            raise sqlite3.OperationalError("disk I/O error")
+    assert dao.get_board() == [Player(1, 1), Player(1, 1)]
+
+def test_get_state(tmp_path):
+    dao = SQLiteDAO(str(tmp_path / "chopsticks.db"))
+    dao.init()
+    assert dao.get_state() == GameState([Player(1, 1), Player(1, 1)], 0, -1, 1)
+    dao.set_player_hand(1, "left", 3)
+    assert dao.get_state() == GameState([Player(1, 1), Player(3, 1)], 0, -1, 2)
+    assert dao.get_version() == 2
+    dao.init()
+    assert dao.get_state() == GameState([Player(1, 1), Player(1, 1)], 0, -1, 3)
+
+def test_compare_and_set(tmp_path):
+    db_path = str(tmp_path / "chopsticks.db")
+    dao = SQLiteDAO(db_path)
+    dao.init()
+    # A second DAO stands in for another worker process.
+    other = SQLiteDAO(db_path)
+    state = dao.get_state()
+    assert dao.compare_and_set(state.version, GameState([Player(0, 2), Player(4, 1)], 1, -1))
+    assert not other.compare_and_set(state.version, GameState([Player(3, 3), Player(3, 3)], 1, 0))
+    assert other.get_state() == GameState([Player(0, 2), Player(4, 1)], 1, -1, state.version + 1)
+
+def test_get_state_of_missing_game(tmp_path):
+    dao = SQLiteDAO(str(tmp_path / "chopsticks.db"))
+    dao.init()
+    dao.delete_game()
+    assert dao.get_state() is None
+    assert dao.get_version() is None
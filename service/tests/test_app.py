@@ -0,0 +1,181 @@
+import json
+
+import pytest
+
+from app import app, VIEW
+from chopsticks import Player, chopstick_controller
+from chopsticks.chopstick_controller import init_model_and_view
+from chopsticks.dao.passthrough_dao import PassthroughDAO
+from chopsticks.game_registry import GameRegistry
+
+
+@pytest.fixture
+def client():
+    init_model_and_view(VIEW, dao_identifier="passthrough")
+    with app.test_client() as client:
+        yield client
+
+def test_default_game_routes(client):
+    assert client.get("/chopsticks/move/0/left/left").status_code == 200
+    response = client.get("/chopsticks/get_board_state")
+    assert response.get_json() == {
+        "player1_left": 1,
+        "player1_right": 1,
+        "player2_left": 2,
+        "player2_right": 1,
+        "winner": -1
+    }
+    assert client.get("/chopsticks/get_current_player").get_json() == {"player": 1}
+
+def test_game_scoped_routes(client):
+    assert client.get("/chopsticks/table-1/reset").status_code == 200
+    assert client.get("/chopsticks/table-1/move/0/left/right").status_code == 200
+    assert client.get("/chopsticks/table-1/get_player_hand/1/right").get_json() == {"hand": 2}
+    assert client.get("/chopsticks/get_player_hand/1/right").get_json() == {"hand": 1}
+    assert client.get("/chopsticks/table-1/get_current_player").get_json() == {"player": 1}
+
+def test_unknown_game(client):
+    response = client.get("/chopsticks/missing/get_board_state")
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Game missing does not exist."}
+
+def test_delete_game(client):
+    client.get("/chopsticks/table-1/reset")
+    assert client.delete("/chopsticks/table-1").status_code == 200
+    assert client.get("/chopsticks/table-1/get_board_state").status_code == 404
+    assert client.delete("/chopsticks/table-1").status_code == 404
+
+def test_game_deleted_by_another_worker(tmp_path):
+    db_path = str(tmp_path / "chopsticks.db")
+    init_model_and_view(VIEW, "sqlite", sqlite_db_path=db_path)
+    other_worker = GameRegistry("sqlite", sqlite_db_path=db_path)
+    with app.test_client() as client:
+        client.get("/chopsticks/table-1/reset")
+        assert client.get("/chopsticks/table-1/get_board_state").status_code == 200
+        other_worker.get("table-1")
+        other_worker.remove("table-1")
+        assert client.get("/chopsticks/table-1/move/0/left/left").status_code == 404
+        assert "table-1" not in chopstick_controller.REGISTRY
+        assert client.get("/chopsticks/table-1/get_board_state").status_code == 404
+        assert client.get("/chopsticks/table-1/reset").status_code == 200
+        assert client.get("/chopsticks/table-1/get_board_state").status_code == 200
+
+def test_best_move(client):
+    response = client.get("/chopsticks/best_move")
+    assert response.status_code == 200
+    assert response.get_json()["outcome"] == "draw"
+    assert client.get("/chopsticks/missing/best_move").status_code == 404
+
+@pytest.mark.parametrize("current_player, outcome", [(0, "win"), (1, "loss")])
+def test_best_move_once_won(client, current_player, outcome):
+    chopstick_controller.REGISTRY.get("default").restore_state([Player(0, 2), Player(0, 0)], current_player, 0)
+    body = client.get("/chopsticks/best_move").get_json()
+    assert (body["outcome"], body["distance"]) == (outcome, 0)
+    assert body["best_move"] is None
+
+def test_legal_moves(client):
+    chopstick_controller.REGISTRY.get("default").restore_state([Player(0, 2), Player(1, 4)], 0, -1)
+    response = client.get("/chopsticks/legal_moves")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["player"], body["winner"]) == (0, -1)
+    assert [{key: value for key, value in option.items() if key != "result"} for option in body["legal_moves"]] == [
+        {"action": "move", "from_hand": "right", "to_hand": "left"},
+        {"action": "move", "from_hand": "right", "to_hand": "right"},
+        {"action": "swap", "hand": "right", "fingers": 1},
+        {"action": "swap", "hand": "right", "fingers": 2},
+    ]
+    assert body["legal_moves"][1]["result"] == {"player1_left": 0, "player1_right": 2, "player2_left": 1,
+                                                "player2_right": 1, "player": 1, "winner": -1}
+    chopstick_controller.REGISTRY.get("default").restore_state([Player(0, 2), Player(0, 0)], 0, 0)
+    assert client.get("/chopsticks/legal_moves").get_json()["legal_moves"] == []
+    assert client.get("/chopsticks/missing/legal_moves").status_code == 404
+
+def test_engine_move(client):
+    assert client.get("/chopsticks/engine_move").status_code == 400
+    client.get("/chopsticks/move/0/left/left")
+    response = client.get("/chopsticks/engine_move")
+    assert response.status_code == 200
+    assert response.get_json()["engine_move"]["action"] in ("move", "swap")
+    assert client.get("/chopsticks/get_current_player").get_json() == {"player": 0}
+
+def test_events_stream(client):
+    response = client.get("/chopsticks/events", buffered=False)
+    assert response.mimetype == "text/event-stream"
+    stream = iter(response.response)
+    assert next(stream).startswith(b"event: board_state\ndata: ")
+
+    client.get("/chopsticks/move/0/left/left")
+    assert json.loads(next(stream).split(b"data: ")[1]) == {
+        "player1_left": 1,
+        "player1_right": 1,
+        "player2_left": 2,
+        "player2_right": 1,
+        "player": 1,
+        "winner": -1
+    }
+    response.close()
+    assert not chopstick_controller.EVENTS.has_subscribers("default")
+
+def test_conditional_get(client, mocker):
+    response = client.get("/chopsticks/get_board_state")
+    etag = response.headers["ETag"]
+    # The DAO keeps its state in slots, so spy on its class.
+    get_state = mocker.spy(PassthroughDAO, "get_state")
+
+    cached = client.get("/chopsticks/get_board_state", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+    get_state.assert_not_called()
+
+    client.get("/chopsticks/move/0/left/left")
+    fresh = client.get("/chopsticks/get_board_state", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+
+def test_conditional_get_per_route(client):
+    board_etag = client.get("/chopsticks/get_board_state").headers["ETag"]
+    response = client.get("/chopsticks/get_current_player", headers={"If-None-Match": board_etag})
+    assert response.status_code == 200
+    player_etag = response.headers["ETag"]
+    assert client.get("/chopsticks/get_current_player", headers={"If-None-Match": player_etag}).status_code == 304
+
+def test_batch_actions(client):
+    response = client.post("/chopsticks/actions", json={"actions": [
+        {"action": "move", "player": 0, "from_hand": "left", "to_hand": "left"},
+        {"action": "swap", "player": 1, "hand": "left", "fingers": 1},
+    ]})
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "player1_left": 1,
+        "player1_right": 1,
+        "player2_left": 1,
+        "player2_right": 2,
+        "player": 0,
+        "winner": -1
+    }
+
+def test_batch_actions_roll_back(client):
+    client.get("/chopsticks/move/0/left/left")
+    etag = client.get("/chopsticks/get_board_state").headers["ETag"]
+    response = client.post("/chopsticks/actions", json={"actions": [
+        {"action": "move", "player": 1, "from_hand": "left", "to_hand": "right"},
+        {"action": "swap", "player": 0, "hand": "left", "fingers": 3},
+    ]})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Action 1 failed: Cannot swap more fingers than you have."}
+    # Nothing was written, so the cached state is still current.
+    assert client.get("/chopsticks/get_board_state", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/chopsticks/get_board_state").get_json()["player1_right"] == 1
+    assert client.get("/chopsticks/get_current_player").get_json() == {"player": 1}
+
+def test_empty_batch_is_rejected(client):
+    etag = client.get("/chopsticks/get_board_state").headers["ETag"]
+    response = client.post("/chopsticks/actions", json={"actions": []})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "At least one action is required."}
+    assert client.get("/chopsticks/get_board_state", headers={"If-None-Match": etag}).status_code == 304
+
+@pytest.mark.parametrize("body", [None, {"moves": []}, {"actions": [{"action": "jump"}]}])
+def test_batch_actions_invalid(client, body):
+    assert client.post("/chopsticks/actions", json=body).status_code == 400
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from chopsticks import GameState, Player
+from chopsticks.archive import GROWTH_RECORDS, GameArchive
+from chopsticks.packed_state import position_count
+from chopsticks.rules import Action
+from chopsticks.simulator import simulate
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    return str(tmp_path / "games.bin")
+
+def test_append_and_get(archive_path):
+    moves = [Action("move", "left", to_hand="right"), Action("swap", "right", fingers=2)]
+    state = GameState([Player(0, 0), Player(3, 1)], 0, 1)
+    with GameArchive(archive_path) as archive:
+        assert archive.append("first", GameState([Player(1, 1), Player(1, 1)]), []) == 0
+        assert archive.append("second", state, moves) == 1
+        assert archive.get(1) == ("second", state, moves)
+        assert len(archive.record(1)) == archive.dtype.itemsize
+        with pytest.raises(IndexError):
+            archive.get(2)
+
+def test_reopen(archive_path):
+    with GameArchive(archive_path, max_moves=8) as archive:
+        archive.append("game", GameState([Player(0, 0), Player(1, 1)], 0, 1), [])
+    with GameArchive(archive_path, max_moves=8) as archive:
+        assert len(archive) == 1
+        assert archive.get(0)[0] == "game"
+    with pytest.raises(ValueError):
+        GameArchive(archive_path, max_moves=16)
+
+def test_limits(archive_path):
+    with GameArchive(archive_path, max_moves=1) as archive:
+        with pytest.raises(ValueError):
+            archive.append("x" * 33, GameState([Player(1, 1), Player(1, 1)]), [])
+        with pytest.raises(ValueError):
+            archive.append("game", GameState([Player(1, 1), Player(1, 1)]), [Action("move", "left", to_hand="left")] * 2)
+        assert len(archive) == 0
+
+def test_extend_and_scan(archive_path):
+    result = simulate(GROWTH_RECORDS + 10, max_plies=32, seed=0, record_actions=True)
+    states = result.positions + position_count() * (result.winners.astype(np.int64) + 1)
+    with GameArchive(archive_path) as archive:
+        early = archive.records()
+        ids = archive.extend([f"game-{i}" for i in range(len(states))], states, result.actions)
+        assert ids == range(0, len(states))
+        records = archive.records()
+        assert len(early) == 0
+        assert not records.flags.writeable
+        assert np.array_equal(records["state"], states)
+        assert np.array_equal(records["n_moves"], result.lengths)
+        assert sum(len(chunk) for chunk in archive.scan(1000)) == len(states)
+        game_id, state, moves = archive.get(7)
+        assert game_id == "game-7"
+        assert len(moves) == result.lengths[7]
+        assert state.winner == result.winners[7]
+
+def test_get_by_game_id(archive_path):
+    won = GameState([Player(0, 0), Player(1, 1)], 0, 1)
+    with GameArchive(archive_path) as archive:
+        archive.extend(["a", "b"], np.array([1, 2]), np.full((2, 1), -1))
+        assert archive.find("b") == 1
+        archive.append("a", won, [])
+        assert archive.get_by_game_id("a") == ("a", won, [])
+        archive.extend(["c"], np.array([3]), np.full((1, 1), -1))
+        assert archive.find("c") == 3
+        assert archive.find("a") == 2
+        with pytest.raises(KeyError):
+            archive.find("missing")
+    with GameArchive(archive_path) as archive:
+        assert archive.find("a") == 2
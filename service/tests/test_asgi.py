@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+from app import VIEW
+from asgi import ChopsticksASGI, wsgi_environ
+from chopsticks import chopstick_controller
+from chopsticks.chopstick_controller import init_model_and_view, move
+
+
+@pytest.fixture
+def asgi_app():
+    init_model_and_view(VIEW, dao_identifier="passthrough")
+    asgi_app = ChopsticksASGI(max_workers=2, keepalive=0.05)
+    yield asgi_app
+    asgi_app.executor.shutdown()
+
+def make_scope(path, method="GET", headers=()):
+    return {"type": "http", "method": method, "path": path, "query_string": b"", "headers": list(headers),
+            "http_version": "1.1", "server": ("testserver", 80), "client": ("127.0.0.1", 1234)}
+
+async def request(asgi_app, path, method="GET", body=b"", headers=()):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi_app(make_scope(path, method, headers), receive, send)
+    return sent[0]["status"], dict(sent[0]["headers"]), b"".join(message.get("body", b"") for message in sent[1:])
+
+def test_routes_are_served_by_the_flask_app(asgi_app):
+    async def play():
+        assert (await request(asgi_app, "/chopsticks/move/0/left/left"))[0] == 200
+        return await request(asgi_app, "/chopsticks/get_board_state")
+
+    status, headers, body = asyncio.run(play())
+    assert status == 200
+    assert headers[b"access-control-allow-origin"] == b"*"
+    assert json.loads(body)["player2_left"] == 2
+
+def test_post_body_reaches_the_flask_app(asgi_app):
+    body = json.dumps({"actions": [{"action": "move", "player": 0, "from_hand": "left", "to_hand": "left"}]}).encode()
+    status, _, _ = asyncio.run(request(asgi_app, "/chopsticks/actions", "POST", body,
+                                       [(b"content-type", b"application/json")]))
+    assert status == 200
+    assert chopstick_controller.REGISTRY.get("default").get_current_player() == 1
+
+def test_unknown_game(asgi_app):
+    status, _, body = asyncio.run(request(asgi_app, "/chopsticks/missing/get_board_state"))
+    assert status == 404
+    assert json.loads(body) == {"error": "Game missing does not exist."}
+
+def test_unknown_game_events(asgi_app):
+    status, _, _ = asyncio.run(request(asgi_app, "/chopsticks/missing/events"))
+    assert status == 404
+
+def test_events_stream(asgi_app):
+    async def stream():
+        sent = []
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if message["type"] != "http.response.body":
+                return
+            bodies = [m for m in sent if m["type"] == "http.response.body"]
+            if len(bodies) == 1:
+                await asyncio.get_running_loop().run_in_executor(None, move, "0", "left", "left")
+            elif b"keepalive" in message["body"]:
+                disconnect.set()
+
+        await asyncio.wait_for(asgi_app(make_scope("/chopsticks/events"), receive, send), timeout=5)
+        return sent
+
+    sent = asyncio.run(stream())
+    assert dict(sent[0]["headers"])[b"content-type"].startswith(b"text/event-stream")
+    events = [message["body"] for message in sent[1:]]
+    assert json.loads(events[0].split(b"data: ")[1])["player2_left"] == 1
+    assert json.loads(events[1].split(b"data: ")[1])["player2_left"] == 2
+    assert not chopstick_controller.EVENTS.has_subscribers("default")
+
+def test_wsgi_environ_headers():
+    environ = wsgi_environ(make_scope("/chopsticks/get_board_state", headers=[
+        (b"content-type", b"application/json"), (b"if-none-match", b'"a"'), (b"accept", b"a"), (b"accept", b"b")
+    ]), b"")
+    assert environ["CONTENT_TYPE"] == "application/json"
+    assert environ["HTTP_IF_NONE_MATCH"] == '"a"'
+    assert environ["HTTP_ACCEPT"] == "a,b"
+    assert environ["PATH_INFO"] == "/chopsticks/get_board_state"
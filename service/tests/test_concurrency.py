@@ -0,0 +1,189 @@
+from collections import defaultdict
+import multiprocessing
+import random
+import threading
+
+import pytest
+
+from chopsticks import FINGERS, GameState, Player, chopstick_controller
+from chopsticks.chopstick_controller import configure_locks, init_game, init_model_and_view, move, swap
+from chopsticks.chopstick_model import ChopstickModel, ConcurrentUpdateError
+from chopsticks.chopstick_view import ChopstickView
+from chopsticks.dao.sqlite_pool import close_pools
+from chopsticks.game_locks import DEFAULT_STRIPES
+from chopsticks.rules import advance, legal_moves
+
+WRITERS = 4
+THREADS = 2
+UPDATES = 50
+
+
+def counter(state: GameState) -> int:
+    # The four hands read as one base-FINGERS number.
+    value = 0
+    for player in state.players:
+        value = (value * FINGERS + player.left) * FINGERS + player.right
+    return value
+
+def increment(state: GameState) -> None:
+    value = counter(state) + 1
+    for player in reversed(state.players):
+        value, player.right = divmod(value, FINGERS)
+        value, player.left = divmod(value, FINGERS)
+
+def write(dao_id: str, db_path: str) -> int:
+    """Run UPDATES increments on THREADS threads of a fresh model; return how many were stored."""
+    model = ChopstickModel(dao_id, sqlite_db_path=db_path, new_game=False)
+    stored = [0] * THREADS
+
+    def run(index: int) -> None:
+        for _ in range(UPDATES):
+            try:
+                model.update(increment)
+                stored[index] += 1
+            except ConcurrentUpdateError:
+                pass
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(stored)
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    close_pools()
+    yield
+    close_pools()
+
+@pytest.mark.parametrize("dao_id", ["sqlite", "sqlite_packed", "sqlite_log"])
+def test_no_lost_updates_across_processes(tmp_path, dao_id):
+    db_path = str(tmp_path / "chopsticks.db")
+    model = ChopstickModel(dao_id, sqlite_db_path=db_path)
+    before = model.get_state()
+
+    # Every writer process has its own model, DAO and connections, like a server worker.
+    with multiprocessing.get_context("spawn").Pool(WRITERS) as pool:
+        stored = sum(pool.starmap(write, [(dao_id, db_path)] * WRITERS))
+
+    after = model.get_state()
+    assert stored > 0
+    assert stored + counter(before) < FINGERS ** 4
+    assert counter(after) == counter(before) + stored
+    assert after.version == before.version + stored
+
+def test_no_lost_moves_between_models():
+    model = ChopstickModel()
+    # A second model over the same store, as another worker would have.
+    other = ChopstickModel(new_game=False)
+    other.dao = model.dao
+    model.move(0, "left", "left")
+    with pytest.raises(ValueError, match="player 2's turn"):
+        other.move(0, "left", "left")
+    assert other.move(1, "left", "left").players == model.get_board()
+    assert model.get_current_player() == 0
+
+def successors(players, current_player, winner):
+    if winner != -1:
+        return []
+    result = []
+    for successor in legal_moves(players, current_player).values():
+        state = GameState([Player(p.left, p.right) for p in players], current_player)
+        advance(state, successor)
+        result.append((state.players, state.current_player, state.winner))
+    return result
+
+@pytest.fixture
+def controller():
+    init_model_and_view(ChopstickView(), dao_identifier="passthrough")
+    yield chopstick_controller
+    configure_locks(DEFAULT_STRIPES)
+
+def test_games_do_not_wait_for_each_other(controller):
+    configure_locks(8)
+    game_a = "table-a"
+    game_b = next(game_id for game_id in (f"table-{index}" for index in range(100))
+                  if controller.GAME_LOCKS.stripe(game_id) != controller.GAME_LOCKS.stripe(game_a))
+    init_game(game_a)
+    init_game(game_b)
+    held, release = threading.Event(), threading.Event()
+
+    def hold() -> None:
+        with controller.GAME_LOCKS.lock_for(game_a):
+            held.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold, daemon=True)
+    holder.start()
+    held.wait()
+    try:
+        # Game b is free while game a is locked...
+        move("0", "left", "left", game_b)
+        blocked = threading.Thread(target=move, args=("0", "left", "left", game_a), daemon=True)
+        blocked.start()
+        blocked.join(timeout=0.2)
+        # ...and an action on game a waits for its lock.
+        assert blocked.is_alive()
+    finally:
+        release.set()
+    holder.join()
+    blocked.join()
+    assert controller.REGISTRY.get(game_a).get_current_player() == 1
+
+@pytest.mark.parametrize("stripes", [1, 4, 64])
+def test_threads_keep_every_game_consistent(controller, mocker, stripes):
+    configure_locks(stripes)
+    games = [f"stress-{index}" for index in range(6)]
+    for game_id in games:
+        init_game(game_id)
+    published = defaultdict(list)
+
+    def record(game_id: str, state: GameState = None) -> None:
+        # Runs under the game's lock, so each game's states are recorded in the order they were written.
+        state = state or controller.REGISTRY.get(game_id).get_state()
+        published[game_id].append(([Player(p.left, p.right) for p in state.players], state.current_player,
+                                   state.winner, state.version))
+
+    mocker.patch.object(controller, "publish_board_state", side_effect=record)
+    update = mocker.spy(ChopstickModel, "update")
+    errors = []
+
+    def play(seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(150):
+            game_id = rng.choice(games)
+            state = controller.REGISTRY.get(game_id).get_state()
+            options = list(legal_moves(state.players, state.current_player)) if state.winner == -1 else []
+            try:
+                if not options:
+                    init_game(game_id)
+                    continue
+                action = rng.choice(options)
+                if action.kind == "move":
+                    move(str(state.current_player), action.hand, action.to_hand, game_id)
+                else:
+                    swap(str(state.current_player), action.hand, str(action.fingers), game_id)
+            except ValueError:
+                # Another thread played first; the stale move was refused, not applied.
+                pass
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=play, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert update.call_count > 0
+    for game_id in games:
+        states = published[game_id]
+        assert len(states) > 1
+        for before, after in zip(states, states[1:]):
+            # Every write is one reset or one legal action on the state written before it.
+            assert after[3] == before[3] + 1
+            assert after[:3] == ([Player(1, 1), Player(1, 1)], 0, -1) or after[:3] in successors(*before[:3])
+        final = controller.REGISTRY.get(game_id).get_state()
+        assert (final.players, final.current_player, final.winner, final.version) == states[-1]
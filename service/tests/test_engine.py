@@ -0,0 +1,67 @@
+import threading
+import time
+
+from chopsticks import Player
+from chopsticks.engine import MATE, SearchEngine
+from chopsticks.rules import Action, position_of
+from chopsticks.solver import LOSS, get_solution
+
+
+def test_takes_the_win():
+    engine = SearchEngine()
+    assert engine.choose_action([Player(1, 0), Player(4, 0)], 0) == Action("move", "left", to_hand="left")
+
+def test_no_action_without_fingers():
+    engine = SearchEngine()
+    assert engine.choose_action([Player(0, 0), Player(1, 1)], 0) is None
+
+def test_avoids_losing_moves():
+    engine = SearchEngine(time_budget=0.2)
+    solution = get_solution()
+    board = [Player(1, 1), Player(1, 1)]
+    current_player = 0
+    for _ in range(20):
+        action = engine.choose_action(board, current_player)
+        mover, opponent = board[current_player], board[1 - current_player]
+        if action.kind == "move":
+            count = getattr(mover, action.hand)
+            setattr(opponent, action.to_hand, (getattr(opponent, action.to_hand) + count) % 5)
+        else:
+            other = "right" if action.hand == "left" else "left"
+            setattr(mover, action.hand, getattr(mover, action.hand) - action.fingers)
+            setattr(mover, other, (getattr(mover, other) + action.fingers) % 5)
+        current_player = 1 - current_player
+        # The opening is a draw, so perfect play never hands the opponent a win.
+        assert solution.outcome[position_of(board, current_player)] != -LOSS
+
+def test_respects_deadline():
+    # The opening is a draw, so no depth proves a result and the search runs until the deadline.
+    engine = SearchEngine(time_budget=0.01, max_depth=10_000)
+    start = time.perf_counter()
+    assert engine.choose_action([Player(1, 1), Player(1, 1)], 0) is not None
+    assert 0.01 <= time.perf_counter() - start < 0.1
+
+def test_concurrent_searches_keep_their_own_deadline():
+    engine = SearchEngine(time_budget=0.05, max_depth=10_000)
+    durations = []
+
+    def search():
+        start = time.perf_counter()
+        engine.choose_action([Player(1, 1), Player(1, 1)], 0)
+        durations.append(time.perf_counter() - start)
+
+    first = threading.Thread(target=search)
+    first.start()
+    time.sleep(0.03)
+    search()
+    first.join()
+    assert max(durations) < 0.075
+
+def test_mate_scores_survive_the_table():
+    # Player 0 wins in three plies; the reply position is stored one ply below the root.
+    engine = SearchEngine()
+    engine.choose_action([Player(4, 4), Player(0, 2)], 0)
+    reply = position_of([Player(4, 4), Player(0, 1)], 1)
+    fresh = SearchEngine()
+    fresh.choose_action([Player(4, 4), Player(0, 1)], 1)
+    assert engine.table[reply].value == fresh.table[reply].value == -MATE + 2
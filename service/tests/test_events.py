@@ -0,0 +1,55 @@
+import pytest
+
+from app import VIEW
+from chopsticks import chopstick_controller
+from chopsticks.chopstick_controller import init_model_and_view, subscribe_events, unsubscribe_events
+from chopsticks.events import EventBroker, Subscription
+from chopsticks.game_registry import GameNotFoundError
+
+
+def test_publish_fans_out_same_bytes():
+    broker = EventBroker()
+    first = broker.subscribe("game")
+    second = broker.subscribe("game")
+    other = broker.subscribe("other")
+    message = b"event: board_state\ndata: {}\n\n"
+
+    assert broker.publish("game", message) == 2
+    assert first.get(timeout=0) is message
+    assert second.get(timeout=0) is message
+    assert other.get(timeout=0) is None
+
+def test_unsubscribe():
+    broker = EventBroker()
+    subscription = broker.subscribe("game")
+    broker.unsubscribe("game", subscription)
+    assert not broker.has_subscribers("game")
+    assert broker.publish("game", b"data") == 0
+
+def test_slow_subscriber_keeps_latest_messages():
+    subscription = Subscription(max_pending=2)
+    for message in (b"1", b"2", b"3"):
+        subscription.deliver(message)
+    assert subscription.get(timeout=0) == b"2"
+    assert subscription.get(timeout=0) == b"3"
+    assert subscription.get(timeout=0) is None
+
+def test_subscribe_events_misses_no_change(mocker):
+    init_model_and_view(VIEW, dao_identifier="passthrough")
+    read_board = chopstick_controller.get_board_event
+
+    def read_after_a_move(game_id):
+        # A change published while the current state is read still reaches the subscriber.
+        chopstick_controller.EVENTS.publish(game_id, b"moved")
+        return read_board(game_id)
+
+    mocker.patch.object(chopstick_controller, "get_board_event", side_effect=read_after_a_move)
+    subscription, _ = subscribe_events()
+    assert subscription.get(timeout=0) == b"moved"
+    unsubscribe_events(subscription)
+
+def test_subscribe_events_to_missing_game():
+    init_model_and_view(VIEW, dao_identifier="passthrough")
+    with pytest.raises(GameNotFoundError):
+        subscribe_events("missing")
+    assert not chopstick_controller.EVENTS.has_subscribers("missing")
@@ -0,0 +1,194 @@
+import threading
+
+import pytest
+
+from chopsticks import Player
+from chopsticks.dao.caching_dao import close_flushers
+from chopsticks.dao.passthrough_dao import PassthroughDAO
+from chopsticks.dao.sqlite_pool import close_pools
+from chopsticks.game_registry import GameNotFoundError, GameRegistry
+from chopsticks.metrics import METRICS
+
+
+@pytest.fixture
+def registry():
+    return GameRegistry()
+
+def test_create_and_get(registry):
+    model = registry.create("table-1")
+    assert registry.get("table-1") is model
+    assert "table-1" in registry
+    assert len(registry) == 1
+
+def test_games_are_independent(registry):
+    first = registry.create("first")
+    second = registry.create("second")
+    first.move(0, "left", "left")
+    assert first.get_player_hands(1) == Player(2, 1)
+    assert second.get_player_hands(1) == Player(1, 1)
+
+def test_get_missing_game(registry):
+    with pytest.raises(GameNotFoundError, match="Game missing does not exist."):
+        registry.get("missing")
+
+def test_get_or_create(registry):
+    model = registry.get_or_create("table-1")
+    assert registry.get_or_create("table-1") is model
+    assert len(registry) == 1
+
+def test_remove(registry, mocker):
+    model = registry.create("table-1")
+    delete_game = mocker.spy(PassthroughDAO, "delete_game")
+    registry.remove("table-1")
+    delete_game.assert_called_once_with(model.dao)
+    assert "table-1" not in registry
+    with pytest.raises(GameNotFoundError):
+        registry.remove("table-1")
+
+def test_missing_game_builds_nothing(registry, mocker):
+    # A passthrough store is private to its model, so there is nothing to attach.
+    get_dao = mocker.patch("chopsticks.chopstick_model.get_dao")
+    with pytest.raises(GameNotFoundError):
+        registry.get("missing")
+    get_dao.assert_not_called()
+
+def test_shared_games_are_attached(tmp_path):
+    db_path = str(tmp_path / "chopsticks.db")
+    # Two registries over one database, as two worker processes would have.
+    first = GameRegistry("sqlite", sqlite_db_path=db_path)
+    second = GameRegistry("sqlite", sqlite_db_path=db_path)
+    first.create("table-1").move(0, "left", "left")
+    attached = second.get("table-1")
+    assert attached.get_player_hands(1) == Player(2, 1)
+    assert attached.get_current_player() == 1
+    with pytest.raises(GameNotFoundError):
+        second.get("missing")
+
+def test_game_deleted_by_another_registry(tmp_path):
+    db_path = str(tmp_path / "chopsticks.db")
+    first = GameRegistry("sqlite", sqlite_db_path=db_path)
+    second = GameRegistry("sqlite", sqlite_db_path=db_path)
+    first.create("table-1")
+    stale = second.get("table-1")
+    first.remove("table-1")
+    for read in (stale.get_state, stale.get_version, stale.get_winner, stale.get_board,
+                 lambda: stale.get_player_hands(0), lambda: stale.move(0, "left", "left")):
+        with pytest.raises(GameNotFoundError):
+            read()
+    second.discard("table-1")
+    assert "table-1" not in second
+    with pytest.raises(GameNotFoundError):
+        second.get("table-1")
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def evicting(tmp_path):
+    """Make registries that evict to a spill store in tmp_path."""
+    def make(dao_id="passthrough", dao_kwargs=None, **kwargs):
+        registry = GameRegistry(dao_id, sqlite_db_path=str(tmp_path / "chopsticks.db"), **(dao_kwargs or {}))
+        registry.configure_eviction(spill_path=str(tmp_path / "spill.db"), **kwargs)
+        return registry
+    yield make
+    close_flushers()
+    close_pools()
+
+def test_capacity_evicts_least_recently_used(evicting):
+    registry = evicting(max_games=2)
+    registry.create("first").move(0, "left", "left")
+    registry.create("second")
+    registry.get("first")
+    registry.create("third")
+    assert list(registry) == ["first", "third"]
+    assert registry.evictions == {"capacity": 1, "idle": 0}
+    assert "second" in registry
+
+def test_evicted_game_is_reloaded(evicting):
+    registry = evicting(max_games=1)
+    model = registry.create("first")
+    model.move(0, "left", "left")
+    state = model.get_state()
+    registry.create("second")
+    assert list(registry) == ["second"] and registry.spilled == 1
+    reloaded = registry.get("first")
+    assert reloaded is not model
+    # The version is kept, so ETags handed out before the eviction stay valid.
+    assert reloaded.get_state() == state
+    assert reloaded.get_current_player() == 1
+    assert registry.reloads == 1
+    assert list(registry) == ["first"] and registry.spilled == 1
+
+def test_idle_games_are_evicted(evicting):
+    clock = FakeClock()
+    registry = evicting(idle_ttl=60, clock=clock)
+    registry.create("idle")
+    clock.now = 30
+    registry.create("active")
+    clock.now = 70
+    registry.get("active")
+    assert list(registry) == ["active"]
+    assert registry.evictions == {"capacity": 0, "idle": 1}
+    assert registry.get("idle").get_player_hands(0) == Player(1, 1)
+
+def test_games_in_use_are_not_evicted(evicting):
+    locks = {"busy": threading.RLock(), "other": threading.RLock()}
+    registry = evicting(max_games=1, lock_for=locks.get)
+    registry.create("busy")
+    holder = threading.Thread(target=locks["busy"].acquire)
+    holder.start()
+    holder.join()
+    registry.create("other")
+    assert set(registry) == {"busy", "other"}
+    assert registry.evictions["capacity"] == 0
+
+def test_remove_evicted_game(evicting):
+    registry = evicting(max_games=1)
+    registry.create("first")
+    registry.create("second")
+    registry.remove("first")
+    assert "first" not in registry and registry.spilled == 0
+    with pytest.raises(GameNotFoundError):
+        registry.get("first")
+
+def test_cached_games_are_flushed_on_eviction(evicting):
+    registry = evicting("caching", {"flush_interval": 3600}, max_games=1)
+    registry.create("first").move(0, "left", "left")
+    registry.create("second")
+    assert registry.get("first").get_player_hands(1) == Player(2, 1)
+
+def test_shared_games_are_not_spilled(evicting):
+    registry = evicting("sqlite", max_games=1)
+    registry.create("first").move(0, "left", "left")
+    registry.create("second")
+    assert registry.spilled == 0
+    assert registry.get("first").get_player_hands(1) == Player(2, 1)
+    assert registry.reloads == 0
+
+def test_eviction_metrics(evicting):
+    METRICS.reset()
+    registry = evicting(max_games=1)
+    registry.create("first")
+    registry.create("second")
+    registry.get("first")
+    rendered = METRICS.render()
+    assert 'chopsticks_game_evictions_total{reason="capacity"} 2' in rendered
+    assert "chopsticks_game_reloads_total 1" in rendered
+    assert "chopsticks_games_resident 1" in rendered
+    assert "chopsticks_games_spilled 1" in rendered
+
+@pytest.mark.parametrize("dao_id", ["passthrough", "sqlite", "sqlite_packed", "sqlite_log", "caching"])
+def test_recreated_game_continues_versions(tmp_path, dao_id):
+    # Versions are the ETags of the game's reads, so a recreated game must not repeat them.
+    registry = GameRegistry(dao_id, sqlite_db_path=str(tmp_path / "chopsticks.db"))
+    model = registry.create("table-1")
+    model.move(0, "left", "left")
+    last_version = model.get_version()
+    registry.remove("table-1")
+    assert registry.create("table-1").get_version() > last_version
+    close_flushers()
+    close_pools()
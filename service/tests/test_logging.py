@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+
+import chopsticks
+from chopsticks import DebugSampler, configure_logging, stop_logging
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture(autouse=True)
+def restore_logging():
+    yield
+    configure_logging()
+
+def test_debug_sampler():
+    sampler = DebugSampler(0.25)
+    debug = logging.LogRecord("chopsticks", logging.DEBUG, __file__, 1, "debug", None, None)
+    info = logging.LogRecord("chopsticks", logging.INFO, __file__, 1, "info", None, None)
+    assert [sampler.filter(debug) for _ in range(8)].count(True) == 2
+    assert all(sampler.filter(info) for _ in range(8))
+    assert not DebugSampler(0).filter(debug)
+
+def test_configure_logging_replaces_handlers():
+    target = ListHandler()
+    configure_logging("INFO", target=target)
+    configure_logging("INFO", debug_sample_rate=0.5, target=target)
+    logger = logging.getLogger("chopsticks.test")
+    logger.debug("dropped %s", "by level")
+    logger.info("kept %s", 1)
+    assert chopsticks.logger.handlers == [target]
+    assert len(target.filters) == 1
+    assert target.messages == ["kept 1"]
+
+def test_queue_logging():
+    target = ListHandler()
+    configure_logging("DEBUG", debug_sample_rate=0.5, use_queue=True, target=target)
+    logger = logging.getLogger("chopsticks.test")
+    for index in range(4):
+        logger.debug("debug %d", index)
+    logger.warning("warning")
+    stop_logging()
+    assert target.messages == ["debug 0", "debug 2", "warning"]
+
+def test_configure_logger_adds_app_handlers_once():
+    from app import app
+
+    app_handler = ListHandler()
+    app.logger.addHandler(app_handler)
+    try:
+        with app.test_request_context():
+            chopsticks.configure_logger()
+            chopsticks.configure_logger()
+        assert chopsticks.logger.handlers.count(app_handler) == 1
+    finally:
+        app.logger.removeHandler(app_handler)
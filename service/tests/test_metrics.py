@@ -0,0 +1,78 @@
+import pytest
+
+from app import app, VIEW
+from chopsticks import Player, chopstick_controller
+from chopsticks.chopstick_controller import init_model_and_view
+from chopsticks.metrics import Counter, Histogram, METRICS, Summary, instrument_dao
+
+
+@pytest.fixture
+def client():
+    init_model_and_view(VIEW, dao_identifier="passthrough")
+    METRICS.reset()
+    with app.test_client() as client:
+        yield client
+    METRICS.enabled = True
+
+def test_counter_and_summary():
+    counter = Counter("moves_total", "Moves.", ("player",))
+    counter.inc("0")
+    counter.inc("0", amount=2)
+    summary = Summary("call_seconds", "Calls.")
+    summary.observe(0.5)
+    summary.observe(0.25)
+    assert counter.render() == ["# HELP moves_total Moves.", "# TYPE moves_total counter", 'moves_total{player="0"} 3']
+    assert summary.render()[2:] == ["call_seconds_count 2", "call_seconds_sum 0.75"]
+
+def test_histogram():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, '/a"b')
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/a\\"b",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a\\"b",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'latency_seconds_count{route="/a\\"b"} 4',
+        'latency_seconds_sum{route="/a\\"b"} 2.65',
+    ]
+
+def test_instrument_dao_is_idempotent():
+    class FakeDAO:
+        def get_state(self):
+            return "state"
+
+    instrument_dao(FakeDAO)
+    method = FakeDAO.get_state
+    assert instrument_dao(FakeDAO).get_state is method
+    assert FakeDAO().get_state() == "state"
+
+def test_metrics_endpoint(client):
+    client.get("/chopsticks/reset")
+    client.get("/chopsticks/move/0/left/left")
+    client.get("/chopsticks/swap/1/left/1")
+    client.get("/chopsticks/move/3/left/left")
+    response = client.get("/chopsticks/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+    assert ('chopsticks_http_requests_total{route="/chopsticks/move/<player>/<from_hand>/<to_hand>",'
+            'method="GET",status="200"} 1') in text
+    assert ('chopsticks_http_requests_total{route="/chopsticks/move/<player>/<from_hand>/<to_hand>",'
+            'method="GET",status="400"} 1') in text
+    assert 'chopsticks_http_request_duration_seconds_count{route="/chopsticks/reset",method="GET"} 1' in text
+    assert 'chopsticks_dao_call_duration_seconds_count{dao="PassthroughDAO",method="compare_and_set"} 2' in text
+    assert 'chopsticks_game_events_total{event="move"} 1' in text
+    assert 'chopsticks_game_events_total{event="swap"} 1' in text
+    assert 'chopsticks_game_events_total{event="reset"} 1' in text
+
+def test_wins_are_counted(client):
+    chopstick_controller.REGISTRY.get("default").restore_state([Player(1, 1), Player(0, 4)], 0, -1)
+    client.get("/chopsticks/move/0/left/right")
+    assert 'chopsticks_game_events_total{event="win"} 1' in METRICS.render()
+
+def test_disabled(client):
+    METRICS.enabled = False
+    client.get("/chopsticks/move/0/left/left")
+    text = client.get("/chopsticks/metrics").get_data(as_text=True)
+    assert "chopsticks_http_requests_total{" not in text
+    assert "chopsticks_dao_call_duration_seconds_count{" not in text
@@ -1,7 +1,8 @@
 import pytest
 
-from chopsticks import Player
-from chopsticks.chopstick_model import ChopstickModel, EMPTY_HAND_ERROR_MSG, SWAP_ERROR_MSG
+from chopsticks import GameState, Player
+from chopsticks.chopstick_model import ChopstickModel, ConcurrentUpdateError, EMPTY_HAND_ERROR_MSG, \
+    MAX_UPDATE_ATTEMPTS, SWAP_COUNT_ERROR_MSG, SWAP_ERROR_MSG, WRONG_PLAYER_ERROR_MSG
 
 @pytest.fixture
 def mock_dao(mocker):
@@ -19,31 +20,31 @@ def test_chopstick_model_init_game(mock_dao):
 def test_get_winner():
     model = ChopstickModel()
     assert model.get_winner() == -1
-    model.winner = 0
+    model.set_winner(0)
     assert model.get_winner() == 0
-    model.winner = 1
+    model.set_winner(1)
     assert model.get_winner() == 1
 
 def test_set_winner():
     model = ChopstickModel()
     model.set_winner(0)
-    assert model.winner == 0
+    assert model.get_state().winner == 0
     model.set_winner(1)
-    assert model.winner == 1
+    assert model.get_state().winner == 1
 
 def test_get_current_player():
     model = ChopstickModel()
     assert model.get_current_player() == 0
-    model.current_player = 1
+    model.change_player()
     assert model.get_current_player() == 1
 
 def test_change_player_player():
     model = ChopstickModel()
-    assert model.current_player == 0
+    assert model.get_state().current_player == 0
     model.change_player()
-    assert model.current_player == 1
+    assert model.get_state().current_player == 1
     model.change_player()
-    assert model.current_player == 0
+    assert model.get_state().current_player == 0
 
 def test_get_player_hands(mock_dao):
     model = ChopstickModel()
@@ -54,117 +55,175 @@ def test_get_player_hands(mock_dao):
     assert model.get_player_hands(0) == Player(1, 3)
     assert model.get_player_hands(1) == Player(1, 2)
 
+def test_get_board(mock_dao):
+    model = ChopstickModel()
+    mock_dao.get_board.return_value = [Player(1, 3), Player(1, 2)]
+    assert model.get_board() == [Player(1, 3), Player(1, 2)]
+
+def stored(mock_dao):
+    """The state last written with compare-and-swap."""
+    return mock_dao.compare_and_set.call_args[0][1]
+
 def test_move(mock_dao):
     model = ChopstickModel()
 
-    mock_dao.get_player.side_effect = [
-        Player(1, 3),
-        Player(1, 2),
-        Player(2, 3),
-        Player(4, 1),
+    mock_dao.get_state.side_effect = [
+        GameState([Player(1, 3), Player(1, 2)], 0, -1, 1),
+        GameState([Player(4, 1), Player(2, 3)], 1, -1, 2),
     ]
 
-    model.move(0, "left", "left")
-    mock_dao.set_player_hand.assert_called_with(1, "left", 2)
+    assert model.move(0, "left", "left").players == [Player(1, 3), Player(2, 2)]
+    mock_dao.compare_and_set.assert_called_once()
+    assert mock_dao.compare_and_set.call_args[0][0] == 1
+    assert stored(mock_dao) == GameState([Player(1, 3), Player(2, 2)], 1, -1, 2)
 
     mock_dao.reset_mock()
 
-    model.move(1, "left", "right")
-    mock_dao.set_player_hand.assert_called_with(0, "right", 3)
+    assert model.move(1, "left", "right").players == [Player(4, 3), Player(2, 3)]
+    assert stored(mock_dao) == GameState([Player(4, 3), Player(2, 3)], 0, -1, 3)
 
 def test_mod_move(mock_dao):
     model = ChopstickModel()
-    mock_dao.get_player.side_effect = [
-        Player(4, 3),
-        Player(2, 2),
-        Player(2, 3),
-        Player(3, 1),
+    mock_dao.get_state.side_effect = [
+        GameState([Player(4, 3), Player(2, 2)], 0),
+        GameState([Player(2, 3), Player(3, 1)], 1),
     ]
     model.move(0, "left", "left")
-    mock_dao.set_player_hand.assert_called_with(1, "left", 1)
+    assert stored(mock_dao).players == [Player(4, 3), Player(1, 2)]
 
     mock_dao.reset_mock()
 
     model.move(1, "left", "left")
-    mock_dao.set_player_hand.assert_called_with(0, "left", 0)
+    assert stored(mock_dao).players == [Player(0, 3), Player(3, 1)]
 
 def test_move_from_zero(mock_dao):
     model = ChopstickModel()
-    mock_dao.get_player.return_value = Player(0, 3)
+    mock_dao.get_state.return_value = GameState([Player(0, 3), Player(1, 1)], 0)
     with pytest.raises(ValueError,
                        match=EMPTY_HAND_ERROR_MSG):
         model.move(0, "left", "left")
+    mock_dao.compare_and_set.assert_not_called()
+
+def test_move_out_of_turn(mock_dao):
+    model = ChopstickModel()
+    mock_dao.get_state.return_value = GameState([Player(1, 1), Player(1, 1)], 1)
+    with pytest.raises(ValueError, match=WRONG_PLAYER_ERROR_MSG.format(current_player=2)):
+        model.move(0, "left", "left")
+    mock_dao.compare_and_set.assert_not_called()
+
+def test_winning_move(mock_dao):
+    model = ChopstickModel()
+    mock_dao.get_state.return_value = GameState([Player(0, 1), Player(0, 4)], 0)
+    state = model.move(0, "right", "right")
+    assert (state.players, state.current_player, state.winner) == ([Player(0, 1), Player(0, 0)], 0, 0)
 
 def test_swap_move(mock_dao):
     model = ChopstickModel()
-    mock_dao.get_player.side_effect = [
-        Player(2, 2),
-        Player(1, 4),
-    ]
-    model.swap(0, "left", 1)
-    expected_calls = [
-        (0, "left", 1),
-        (0, "right", 3)
+    mock_dao.get_state.side_effect = [
+        GameState([Player(2, 2), Player(1, 1)], 0),
+        GameState([Player(1, 1), Player(1, 4)], 1),
     ]
-    actual_calls = [args for args, _ in mock_dao.set_player_hand.call_args_list]
-    assert actual_calls == expected_calls
+    assert model.swap(0, "left", 1).players == [Player(1, 3), Player(1, 1)]
+    assert stored(mock_dao).current_player == 1
 
     mock_dao.reset_mock()
 
     model.swap(1, "right", 2)
-    expected_calls = [
-        (1, "right", 2),
-        (1, "left", 3)
-    ]
-    actual_calls = [args for args, _ in mock_dao.set_player_hand.call_args_list]
-    assert actual_calls == expected_calls
+    assert stored(mock_dao).players == [Player(1, 1), Player(3, 2)]
 
 def test_swap_mod_move(mock_dao):
     model = ChopstickModel()
 
-    mock_dao.get_player.side_effect = [
-        Player(4, 3),
-        Player(4, 4),
-        Player(1, 1)
+    mock_dao.get_state.side_effect = [
+        GameState([Player(4, 3), Player(1, 1)], 0),
+        GameState([Player(1, 1), Player(4, 4)], 1),
+        GameState([Player(1, 1), Player(1, 1)], 1),
     ]
 
     model.swap(0, "left", 3)
-    expected_calls = [
-        (0, "left", 1),
-        (0, "right", 1)
-    ]
-    actual_calls = [args for args, _ in mock_dao.set_player_hand.call_args_list]
-    assert actual_calls == expected_calls
+    assert stored(mock_dao).players[0] == Player(1, 1)
 
     mock_dao.reset_mock()
 
     model.swap(1, "right", 2)
-    expected_calls = [
-        (1, "right", 2),
-        (1, "left", 1)
-    ]
-    actual_calls = [args for args, _ in mock_dao.set_player_hand.call_args_list]
-    assert actual_calls == expected_calls
+    assert stored(mock_dao).players[1] == Player(1, 2)
 
     mock_dao.reset_mock()
 
     model.swap(1, "right", 1)
-    expected_calls = [
-        (1, "right", 0),
-        (1, "left", 2)
-    ]
-    actual_calls = [args for args, _ in mock_dao.set_player_hand.call_args_list]
-    assert actual_calls == expected_calls
+    assert stored(mock_dao).players[1] == Player(2, 0)
 
 def test_swap_from_zero(mock_dao):
     model = ChopstickModel()
-    mock_dao.get_player.return_value = Player(0, 3)
+    mock_dao.get_state.return_value = GameState([Player(0, 3), Player(1, 1)], 0)
     with pytest.raises(ValueError,
                        match=SWAP_ERROR_MSG):
         model.swap(0, "left", 1)
+    mock_dao.compare_and_set.assert_not_called()
+
+@pytest.mark.parametrize("fingers", [0, -1, 5])
+def test_swap_count_out_of_range(mock_dao, fingers):
+    model = ChopstickModel()
+    mock_dao.get_state.return_value = GameState([Player(4, 4), Player(1, 1)], 0)
+    with pytest.raises(ValueError, match=SWAP_COUNT_ERROR_MSG.format(max_fingers=4)):
+        model.swap(0, "left", fingers)
+    mock_dao.compare_and_set.assert_not_called()
+
+def test_update_retries_on_conflict(mock_dao):
+    model = ChopstickModel()
+    mock_dao.get_state.side_effect = [
+        GameState([Player(1, 1), Player(1, 1)], 0, -1, 1),
+        GameState([Player(1, 1), Player(1, 1)], 1, -1, 2),
+    ]
+    mock_dao.compare_and_set.side_effect = [False, True]
+    # The change of player that won the race is not lost.
+    assert model.update(lambda state: setattr(state, "winner", 0)) == GameState([Player(1, 1), Player(1, 1)], 1, 0, 3)
+    assert [call[0][0] for call in mock_dao.compare_and_set.call_args_list] == [1, 2]
+
+def test_update_gives_up(mock_dao):
+    model = ChopstickModel()
+    mock_dao.get_state.side_effect = lambda: GameState([Player(1, 1), Player(1, 1)])
+    mock_dao.compare_and_set.return_value = False
+    with pytest.raises(ConcurrentUpdateError):
+        model.change_player()
+    assert mock_dao.compare_and_set.call_count == MAX_UPDATE_ATTEMPTS
 
 def test_swap_too_many():
     model = ChopstickModel()
     with pytest.raises(ValueError,
                        match=SWAP_ERROR_MSG):
-        model.swap(0, "left", 2)
\ No newline at end of file
+        model.swap(0, "left", 2)
+
+def test_version_increases_on_every_change():
+    model = ChopstickModel()
+    versions = [model.get_version()]
+    model.move(0, "left", "left")
+    versions.append(model.get_version())
+    model.swap(1, "left", 1)
+    versions.append(model.get_version())
+    model.change_player()
+    versions.append(model.get_version())
+    model.set_winner(1)
+    versions.append(model.get_version())
+    model.init_game()
+    versions.append(model.get_version())
+    assert versions == sorted(set(versions))
+
+def test_failed_move_keeps_version():
+    model = ChopstickModel()
+    version = model.get_version()
+    with pytest.raises(ValueError):
+        model.swap(0, "left", 2)
+    assert model.get_version() == version
+
+def test_restore_state():
+    model = ChopstickModel()
+    board = model.get_board()
+    version = model.get_version()
+    model.move(0, "left", "left")
+    model.change_player()
+    model.set_winner(0)
+    model.restore_state(board, 0, -1)
+    assert model.get_board() == [Player(1, 1), Player(1, 1)]
+    assert (model.get_current_player(), model.get_winner()) == (0, -1)
+    assert model.get_version() > version
@@ -0,0 +1,35 @@
+import itertools
+
+from chopsticks import Player
+from chopsticks.packed_state import PackedState, pack, position_count, state_count, unpack, unpack_digits
+
+
+def test_round_trip_every_state():
+    seen = set()
+    for hands in itertools.product(range(5), repeat=4):
+        for current_player in (0, 1):
+            for winner in (-1, 0, 1):
+                players = [Player(hands[0], hands[1]), Player(hands[2], hands[3])]
+                state = pack(players, current_player, winner)
+                assert 0 <= state < state_count()
+                assert unpack(state) == (players, current_player, winner)
+                seen.add(state)
+    assert len(seen) == state_count() == 3750
+
+def test_position_drops_winner():
+    players = [Player(1, 2), Player(3, 4)]
+    assert pack(players, 1, 0) % position_count() == pack(players, 1, -1)
+
+def test_other_finger_counts():
+    players = [Player(6, 0), Player(2, 5)]
+    state = pack(players, 1, 1, fingers=7)
+    assert state < state_count(7)
+    assert unpack_digits(state, fingers=7) == (6, 0, 2, 5, 1, 1)
+
+def test_packed_state_accessors():
+    state = PackedState.from_game([Player(1, 2), Player(3, 4)], current_player=1, winner=0)
+    assert state.players == [Player(1, 2), Player(3, 4)]
+    assert state.current_player == 1
+    assert state.winner == 0
+    assert state.with_hand(1, "left", 0).players == [Player(1, 2), Player(0, 4)]
+    assert state.with_hand(0, "right", 4) == pack([Player(1, 4), Player(3, 4)], 1, 0)
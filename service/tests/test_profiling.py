@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from app import app, UNPROFILED_WSGI_APP, VIEW
+from chopsticks.chopstick_controller import init_model_and_view
+from chopsticks.profiling import PROFILE_HEADER, ProfilingMiddleware
+
+
+@pytest.fixture
+def stats_dir(tmp_path):
+    init_model_and_view(VIEW, dao_identifier="passthrough")
+    yield str(tmp_path / "profiles")
+    app.wsgi_app = UNPROFILED_WSGI_APP
+
+def test_header_mode(stats_dir):
+    app.wsgi_app = ProfilingMiddleware(UNPROFILED_WSGI_APP, "header", stats_dir)
+    client = app.test_client()
+    assert client.get("/chopsticks/move/0/left/left").status_code == 200
+    assert os.listdir(stats_dir) == []
+    assert client.get("/chopsticks/get_board_state", headers={PROFILE_HEADER: "1"}).status_code == 200
+    [name] = os.listdir(stats_dir)
+    assert name.endswith("-GET-chopsticks_get_board_state.prof")
+
+    summary = client.get("/chopsticks/profile?top=5&sort=cumtime").get_json()
+    assert summary["requests"] == 1
+    assert len(summary["functions"]) == 5
+    cumtimes = [row["cumtime"] for row in summary["functions"]]
+    assert cumtimes == sorted(cumtimes, reverse=True)
+    assert client.get("/chopsticks/profile?top=0").status_code == 400
+
+def test_always_mode_respects_pattern(stats_dir):
+    app.wsgi_app = ProfilingMiddleware(UNPROFILED_WSGI_APP, "always", stats_dir, pattern=r"/move/")
+    client = app.test_client()
+    client.get("/chopsticks/health")
+    client.get("/chopsticks/move/0/left/left")
+    assert len(os.listdir(stats_dir)) == 1
+    assert app.wsgi_app.summary()["requests"] == 1
+
+def test_off(stats_dir):
+    response = app.test_client().get("/chopsticks/profile")
+    assert response.status_code == 404
+    assert app.wsgi_app is UNPROFILED_WSGI_APP
@@ -0,0 +1,67 @@
+import random
+
+import numpy as np
+import pytest
+
+from chopsticks import GameState, Player
+from chopsticks.chopstick_model import ChopstickModel
+from chopsticks.packed_state import position_count, unpack
+from chopsticks.rules import Action, actions, advance, legal_moves, legal_table, play, position_of, successor_table
+
+
+def test_actions():
+    assert actions(5)[:4] == [
+        Action("move", "left", to_hand="left"),
+        Action("move", "left", to_hand="right"),
+        Action("move", "right", to_hand="left"),
+        Action("move", "right", to_hand="right"),
+    ]
+    assert len(actions(5)) == 4 + 2 * 4
+    assert Action("swap", "left", fingers=2).to_dict() == {"action": "swap", "hand": "left", "fingers": 2}
+
+def test_successors_match_model():
+    table = successor_table()
+    rng = random.Random(0)
+    model = ChopstickModel()
+    for position in rng.sample(range(position_count()), 300):
+        players, current_player, _ = unpack(position)
+        for action, successor in zip(actions(), table[position]):
+            model.restore_state(players, current_player, -1)
+            try:
+                if action.kind == "move":
+                    board = model.move(current_player, action.hand, action.to_hand).players
+                else:
+                    board = model.swap(current_player, action.hand, action.fingers).players
+            except ValueError:
+                assert successor == -1
+                continue
+            if players[current_player].left + players[current_player].right == 0:
+                assert successor == -1
+            else:
+                assert successor == position_of(board, 1 - current_player)
+
+@pytest.mark.parametrize("fingers", [3, 5, 7])
+def test_successor_table_shape(fingers):
+    table = successor_table(fingers)
+    assert table.shape == (2 * fingers ** 4, 4 + 2 * (fingers - 1))
+    assert table.max() < 2 * fingers ** 4
+
+@pytest.mark.parametrize("fingers", [3, 5])
+def test_legal_table_matches_successor_table(fingers):
+    table = successor_table(fingers)
+    offsets, codes, successors = legal_table(fingers)
+    assert offsets[0] == 0 and offsets[-1] == len(codes) == len(successors) == (table >= 0).sum()
+    for position in range(len(table)):
+        start, end = offsets[position], offsets[position + 1]
+        assert codes[start:end].tolist() == np.flatnonzero(table[position] >= 0).tolist()
+        assert successors[start:end].tolist() == table[position][table[position] >= 0].tolist()
+
+def test_advance_matches_play():
+    for position in range(position_count()):
+        players, current_player, _ = unpack(position)
+        for action, successor in legal_moves(players, current_player).items():
+            expected = GameState([Player(p.left, p.right) for p in players], current_player)
+            result = GameState([Player(p.left, p.right) for p in players], current_player)
+            play(expected, action)
+            advance(result, successor)
+            assert result == expected
@@ -0,0 +1,43 @@
+import pytest
+
+from chopsticks import chopstick_controller
+from chopsticks.chopstick_controller import get_winner, init_game, init_model_and_view, move, swap
+from chopsticks.chopstick_view import ChopstickView
+from chopsticks.packed_state import unpack
+from chopsticks.rules import actions
+from chopsticks.simulator import simulate
+
+
+@pytest.fixture
+def controller():
+    init_model_and_view(ChopstickView(), dao_identifier="passthrough")
+    return chopstick_controller.REGISTRY.get("default")
+
+def test_matches_scalar_model(controller):
+    result = simulate(200, max_plies=60, seed=7, record_actions=True)
+    for game in range(200):
+        init_game()
+        for ply in range(result.lengths[game]):
+            action = actions()[result.actions[game, ply]]
+            player = str(controller.get_current_player())
+            if action.kind == "move":
+                move(player, action.hand, action.to_hand)
+            else:
+                swap(player, action.hand, str(action.fingers))
+        players, current_player, _ = unpack(result.positions[game])
+        assert controller.get_board() == players
+        assert get_winner() == result.winners[game]
+        if result.winners[game] == -1:
+            assert controller.get_current_player() == current_player
+
+def test_outcome_distribution():
+    distribution = simulate(5000, seed=1).outcome_distribution()
+    assert distribution["games"] == 5000
+    assert distribution["player1_wins"] + distribution["player2_wins"] + distribution["unfinished"] == pytest.approx(1)
+    assert distribution["player1_wins"] > 0 and distribution["player2_wins"] > 0
+
+def test_seed_is_reproducible():
+    first = simulate(100, seed=3)
+    second = simulate(100, seed=3)
+    assert (first.winners == second.winners).all()
+    assert (first.lengths == second.lengths).all()
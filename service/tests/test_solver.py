@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from chopsticks import Player
+from chopsticks.rules import Action, position_of, successor_table
+from chopsticks.solver import DRAW, LOSS, WIN, lookup, solve
+
+
+def test_mover_without_fingers_has_lost():
+    assert lookup([Player(0, 0), Player(1, 1)], 0) == (None, "loss", 0)
+    assert lookup([Player(2, 3), Player(0, 0)], 1) == (None, "loss", 0)
+
+def test_finishing_move():
+    action, outcome, distance = lookup([Player(1, 0), Player(4, 0)], 0)
+    assert action == Action("move", "left", to_hand="left")
+    assert (outcome, distance) == ("win", 1)
+
+@pytest.mark.parametrize("fingers", [3, 5, 6])
+def test_solution_is_consistent(fingers):
+    solution = solve(fingers)
+    table = successor_table(fingers)
+    for position in range(len(table)):
+        successors = table[position][table[position] >= 0]
+        outcomes = solution.outcome[successors]
+        if solution.outcome[position] == WIN:
+            assert (outcomes == LOSS).any()
+        elif solution.outcome[position] == LOSS:
+            assert (outcomes == WIN).all()
+        else:
+            assert (outcomes == DRAW).any() and not (outcomes == LOSS).any()
+        best = solution.best_action[position]
+        if best >= 0:
+            assert solution.outcome[table[position][best]] == -solution.outcome[position]
+
+def test_opening_position():
+    solution = solve()
+    assert solution.outcome[position_of([Player(1, 1), Player(1, 1)], 0)] == DRAW
+    assert np.isin(solution.outcome, [WIN, DRAW, LOSS]).all()
@@ -0,0 +1,21 @@
+import random
+
+import pytest
+
+from chopsticks import Player
+from chopsticks.rules import Action
+from chopsticks.strategies import STRATEGIES, get_strategy
+
+
+@pytest.mark.parametrize("name", list(STRATEGIES))
+def test_strategies_take_the_win(name):
+    strategy = get_strategy(name)
+    action = strategy.choose_action([Player(1, 0), Player(4, 0)], 0, random.Random(0))
+    if name == "random":
+        assert action.kind in ("move", "swap")
+    else:
+        assert action == Action("move", "left", to_hand="left")
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError, match="Unknown strategy"):
+        get_strategy("psychic")
@@ -0,0 +1,44 @@
+import logging
+
+import pytest
+
+from chopsticks import chopstick_controller
+from chopsticks.strategies import Strategy
+from chopsticks.tournament import TournamentResult, make_shards, play_shard, run_tournament
+
+
+def test_make_shards():
+    shards = make_shards(["random", "greedy", "perfect"], games_per_pairing=250, shard_size=100, seed=0)
+    assert len(shards) == 6 * 3
+    assert sum(shard.games for shard in shards) == 6 * 250
+    assert len({shard.seed for shard in shards}) == len(shards)
+
+def test_play_shard_is_reproducible():
+    shard = make_shards(["random", "greedy"], games_per_pairing=50, shard_size=50, seed=4)[0]
+    counts = play_shard(shard)
+    assert counts == play_shard(shard)
+    assert sum(counts[("random", "greedy")]) == 50
+
+def test_run_tournament_merges_workers():
+    shards = make_shards(["random", "perfect"], games_per_pairing=40, shard_size=10, seed=0)
+    result = run_tournament(shards, workers=2)
+    assert result.games == 80
+    rates = result.win_rates()
+    assert rates["perfect"]["random"] > rates["random"]["perfect"]
+
+def test_win_rates_cover_both_seats():
+    result = TournamentResult()
+    result.merge({("a", "b"): [3, 1, 0]})
+    result.merge({("b", "a"): [2, 2, 0]})
+    assert result.win_rates() == {"a": {"b": 5 / 8}, "b": {"a": 3 / 8}}
+
+def test_play_shard_leaves_the_process_alone():
+    registry = chopstick_controller.REGISTRY
+    level = logging.getLogger("chopsticks").level
+    play_shard(make_shards(["random", "greedy"], games_per_pairing=5, shard_size=5, seed=0)[0])
+    assert chopstick_controller.REGISTRY is registry
+    assert logging.getLogger("chopsticks").level == level
+
+def test_strategy_is_abstract():
+    with pytest.raises(TypeError):
+        Strategy()
@@ -2,7 +2,7 @@ import pytest
 from flask import Flask
 
 from chopsticks import Player
-from chopsticks.chopstick_view import ChopstickView
+from chopsticks.chopstick_view import ChopstickView, PrecomputedView
 
 # Set up Flask app for testing
 app = Flask(__name__)
@@ -50,3 +50,34 @@ def test_error(app_context):
         assert response.get_json() == {
             "error": error_msg
         }
+
+def test_precomputed_view_matches_view(app_context):
+    view, precomputed = ChopstickView(), PrecomputedView()
+    player1 = Player(left=0, right=3)
+    player2 = Player(left=4, right=0)
+
+    with app.test_request_context():
+        for build in (lambda v: v.board_state(player1, player2, 0),
+                      lambda v: v.game_state(player1, player2, 1, -1),
+                      lambda v: v.get_player(1),
+                      lambda v: v.get_hand(player2, "left")):
+            expected, response = build(view), build(precomputed)
+            assert response.status_code == 200
+            assert response.mimetype == "application/json"
+            assert response.get_data() == expected.get_data()
+
+def test_precomputed_view_falls_back(app_context):
+    with app.test_request_context():
+        response = PrecomputedView().board_state(Player(left=7, right=1), Player(left=1, right=1), -1)
+        assert response.get_json()["player1_left"] == 7
+
+def test_precomputed_view_matches_view_in_debug_mode():
+    # jsonify() indents in debug mode; precomputed bodies must follow it.
+    debug_app = Flask(__name__)
+    debug_app.debug = True
+    view, precomputed = ChopstickView(), PrecomputedView()
+    with debug_app.test_request_context():
+        for board in ((Player(1, 2), Player(3, 4)), (Player(7, 1), Player(1, 1))):
+            expected, response = view.board_state(*board, -1), precomputed.board_state(*board, -1)
+            assert response.get_data() == expected.get_data()
+        assert b"\n  " in response.get_data()
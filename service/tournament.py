@@ -0,0 +1,41 @@
+import os
+
+import click
+
+from chopsticks.strategies import STRATEGIES
+from chopsticks.tournament import DEFAULT_MAX_PLIES, make_shards, run_tournament
+
+
+@click.command()
+@click.option('--strategy', '-s', 'strategies', multiple=True, type=click.Choice(list(STRATEGIES)),
+              default=list(STRATEGIES), help='Strategies to enter (repeat the option); defaults to all')
+@click.option('--games', default=10_000, help='Games per ordered pairing of strategies')
+@click.option('--workers', default=os.cpu_count(), help='Worker processes')
+@click.option('--shard-size', default=500, help='Games per unit of work sent to a worker')
+@click.option('--max-plies', default=DEFAULT_MAX_PLIES, help='Plies after which a game counts as unfinished')
+@click.option('--seed', default=0, help='Random seed')
+@click.option('--scaling/--no-scaling', default=False, help='Also run on one worker and report the speedup')
+def tournament(strategies: tuple, games: int, workers: int, shard_size: int, max_plies: int, seed: int,
+               scaling: bool) -> None:
+    shards = make_shards(strategies, games, shard_size, seed, max_plies)
+    result = run_tournament(shards, workers)
+
+    names = list(strategies)
+    rates = result.win_rates()
+    click.echo("Win rate of row strategy against column strategy:")
+    click.echo(" " * 10 + "".join(f"{name:>10}" for name in names))
+    for row in names:
+        cells = "".join(f"{rates[row][column]:>10.3f}" if column != row else f"{'-':>10}" for column in names)
+        click.echo(f"{row:<10}{cells}")
+
+    throughput = result.games / result.elapsed
+    click.echo(f"{result.games} games in {result.elapsed:.2f}s on {workers} workers: {throughput:.0f} games/s")
+    if scaling:
+        single = run_tournament(shards, 1)
+        speedup = single.elapsed / result.elapsed
+        click.echo(f"1 worker: {single.elapsed:.2f}s; speedup {speedup:.2f}x, "
+                   f"parallel efficiency {speedup / workers:.0%}")
+
+
+if __name__ == '__main__':
+    tournament()